@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+File: benchmark.py
+Description: Times every public analysis method on synthetic datasets of growing size
+and stores the timings as JSON, so the cost of a change can be compared across commits.
+"""
+
+import argparse
+import datetime
+import inspect
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_schema import SCHEMAS, read_table
+from src.delivery_store import DeliveryStore
+from src import (
+    process_dataset,
+    explore_batting,
+    explore_bowling,
+    explore_details,
+    explore_summary,
+    player_form,
+    season_simulator,
+    synthetic_data,
+    win_probability,
+)
+
+SYNTHETIC_DIR: str = "./input/synthetic"
+BENCHMARK_DIR: str = "./result/benchmarks"
+DEFAULT_SCALES: List[int] = [1, 10, 100]
+
+# arguments for the public methods that need more than self
+METHOD_ARGS: Dict[str, Callable[[object], tuple]] = {
+    "get_team_wins": lambda data: (data.summary_df["home_team"].iloc[0],),
+    "get_team_timeline": lambda data: (data.summary_df["home_team"].iloc[0],),
+    "calculate_balls": lambda data: (data.bowling_df,),
+    "get_match_score": lambda data: (data.summary_df["id"].iloc[0],),
+    "innings_extremes": lambda data: ("idxmax",),
+    "batsman_matchups": lambda data: (data.details_df["batsman1_name"].iloc[0],),
+    "bowler_matchups": lambda data: (data.details_df["bowler1_name"].iloc[0],),
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def synthetic_dataset(scale: int, seed: int) -> str:
+    """Generates the synthetic raw CSVs of a scale, reusing them if they already exist.
+
+    A scale of n is n seasons of the real 6 team, 30 match format.
+
+    Args:
+        scale (int): the number of seasons
+        seed (int): random seed of the generator
+
+    Returns:
+        str: the folder holding the raw CSVs
+    """
+    out_dir = f"{SYNTHETIC_DIR}/{scale}x-seed{seed}"
+    if not os.path.exists(f"{out_dir}/summary.csv"):
+        print(f"Generating {scale}x synthetic dataset in {out_dir}")
+        synthetic_data.generate_dataset(out_dir, seasons=scale, seed=seed)
+    return out_dir
+
+
+def time_call(
+    make_call: Callable[[], Callable[[], object]], repeat: int
+) -> Dict[str, object]:
+    """Times a call repeat times, building it fresh every time so no cached results are
+    reused, and returns the best and mean wall time. Errors are raised, so a broken
+    analysis fails the benchmark instead of being reported as a result."""
+    timings = []
+    for _ in range(repeat):
+        call = make_call()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return {"best_seconds": min(timings), "mean_seconds": float(np.mean(timings))}
+
+
+def public_methods(cls: type) -> List[str]:
+    return [
+        name
+        for name, _ in inspect.getmembers(cls, predicate=inspect.isfunction)
+        if not name.startswith("_")
+    ]
+
+
+def benchmark_scale(scale: int, repeat: int, seed: int) -> List[dict]:
+    """Times the loading and every public analysis method at one scale.
+
+    Args:
+        scale (int): the number of synthetic seasons
+        repeat (int): how many times every call is timed
+        seed (int): random seed of the generator
+
+    Returns:
+        List[dict]: one result per timed call
+    """
+    raw_dir = synthetic_dataset(scale, seed)
+    cleaner = process_dataset.DatasetCleaner(raw_input_dir=raw_dir)
+    cleaners = cleaner.table_cleaners()
+
+    results = []
+    frames = {}
+
+    def load(table: str) -> None:
+        raw_df = read_table(f"{raw_dir}/{table}.csv", SCHEMAS[table])
+        frames[table] = cleaners[table](raw_df)
+
+    for table in process_dataset.TABLES:
+        timing = time_call(lambda table=table: lambda: load(table), repeat)
+        results.append({"class": "DatasetCleaner", "method": f"load_{table}", **timing})
+
+    analyses = [
+        (explore_batting.BattingData, "batting_card"),
+        (explore_bowling.BowlingData, "bowling_card"),
+        (explore_details.DetailsData, "details"),
+        (explore_summary.SummaryData, "summary"),
+    ]
+    for cls, table in analyses:
+        for method in public_methods(cls):
+
+            def make_call(cls=cls, table=table, method=method):
+                # a fresh copy, some methods add columns to their dataframe
+                data = cls(frames[table].copy())
+                args = METHOD_ARGS.get(method, lambda data: ())(data)
+                return lambda: getattr(data, method)(*args)
+
+            results.append(
+                {
+                    "class": cls.__name__,
+                    "method": method,
+                    **time_call(make_call, repeat),
+                }
+            )
+
+    results.append(
+        {
+            "class": "DetailsData",
+            "method": "from_csv",
+            **time_call(
+                lambda: lambda: explore_details.DetailsData.from_csv(
+                    f"{raw_dir}/details.csv",
+                    store_dir=f"{raw_dir}/delivery_store",
+                    matrix_path=f"{raw_dir}/delivery_store/matchups.npz",
+                ),
+                repeat,
+            ),
+        }
+    )
+
+    for cls, table in [
+        (player_form.BattingForm, "batting_card"),
+        (player_form.BowlingForm, "bowling_card"),
+    ]:
+        results.append(
+            {
+                "class": cls.__name__,
+                "method": "from_card",
+                **time_call(
+                    lambda cls=cls, table=table: lambda: cls.from_card(
+                        frames[table], frames["summary"]
+                    ),
+                    repeat,
+                ),
+            }
+        )
+
+    store = DeliveryStore.open(
+        f"{raw_dir}/details.csv", store_dir=f"{raw_dir}/delivery_store"
+    )
+    scorecards = explore_summary.SummaryData(frames["summary"]).scorecards
+    results.append(
+        {
+            "class": "WinProbability",
+            "method": "build",
+            **time_call(
+                lambda: lambda: win_probability.WinProbability.build(
+                    store, scorecards
+                ).worms(),
+                repeat,
+            ),
+        }
+    )
+
+    results.append(
+        {
+            "class": "SeasonSimulator",
+            "method": "simulate",
+            **time_call(
+                lambda: lambda: season_simulator.SeasonSimulator(
+                    frames["summary"]
+                ).simulate(100_000, max_workers=1),
+                repeat,
+            ),
+        }
+    )
+
+    rows = {table: len(frames[table]) for table in frames}
+    for result in results:
+        result.update(scale=scale, rows=rows)
+        print(
+            f"{scale:>4}x {result['class']}.{result['method']}: "
+            f"{result['best_seconds']:.4f}s"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="seasons per run"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timings per call")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--output", default=BENCHMARK_DIR, help="folder for the JSON")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    report = {
+        "commit": commit,
+        "timestamp": timestamp.isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": [
+            result
+            for scale in args.scales
+            for result in benchmark_scale(scale, args.repeat, args.seed)
+        ],
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = f"{args.output}/{timestamp:%Y%m%dT%H%M%S}-{commit[:7]}.json"
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
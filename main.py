@@ -5,61 +5,312 @@
 File: main.py
 Author: Keyan de Klerk
 Email: keyan@deklerk.org.za
-Description: Brief description of what the script does.
+Description: Renders the SA20 charts, or prints a single stat table as JSON or CSV.
 """
 
-from src import (
-    process_dataset,
-    explore_batting,
-    explore_bowling,
-    explore_details,
-    explore_summary,
-    visualize_information,
-)
+import argparse
+import sys
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
+# matplotlib and the analysis modules are imported inside the commands that use them,
+# so a table query never pays for the charts
+OUTPUT_FORMATS: List[str] = ["json", "csv"]
 
-def main() -> None:
-    cleaner = process_dataset.DatasetCleaner()
-    batting_df, bowling_df, details_df, summary_df = cleaner.read_dataset()
-    batting_df, bowling_df, details_df, summary_df = cleaner.clean_dataframe(
-        batting_df, bowling_df, details_df, summary_df
+
+def main(
+    charts: Optional[List[str]] = None,
+    profile: Optional[str] = None,
+    profile_summary: bool = False,
+    incremental: bool = False,
+) -> None:
+    """Loads, cleans, explores and visualizes the dataset.
+
+    Only the tables and analyses the requested charts depend on are computed, and each
+    of them once, however many charts share it.
+
+    Args:
+        charts (List[str], optional): names of the charts to render, see
+        catalog.CHARTS. Defaults to all of them.
+        profile (str, optional): path to write a JSON report of the time, memory and rows
+        of every stage to. Profiling is off when None. Defaults to None.
+        profile_summary (bool, optional): also print the stages as a table. Defaults to False.
+        incremental (bool, optional): ingest only new or changed matches into the match
+        store and read the running totals from it. Defaults to False.
+    """
+    from src import analysis_graph, catalog, visualize_information
+
+    with profiling(profile, profile_summary):
+        graph = analysis_graph.build_pipeline(store=match_store(incremental))
+        visualizer = visualize_information.VisualizeInformation()
+        visualizer.render_all([graph.get(chart) for chart in charts or catalog.CHARTS])
+
+
+def query(
+    subject: str,
+    name: str,
+    args: List[str],
+    output_format: str = "json",
+    output: Optional[str] = None,
+    profile: Optional[str] = None,
+    profile_summary: bool = False,
+    incremental: bool = False,
+) -> None:
+    """Computes a single stat table and writes it as JSON records or CSV.
+
+    Only the tables the query needs are loaded and nothing is plotted.
+
+    Args:
+        subject (str): subject of the query, a key of catalog.QUERIES
+        name (str): name of the query, e.g. "team-wins"
+        args (List[str]): the arguments of the query, e.g. a team code
+        output_format (str, optional): "json" or "csv". Defaults to "json".
+        output (str, optional): path to write the table to. Defaults to stdout.
+        profile (str, optional): path of a JSON profile report. Defaults to None.
+        profile_summary (bool, optional): print the profiled stages. Defaults to False.
+        incremental (bool, optional): read the tables from the match store. Defaults to
+        False.
+    """
+    from src import analysis_graph, queries
+
+    with profiling(profile, profile_summary):
+        graph = analysis_graph.build_pipeline(store=match_store(incremental))
+        table = queries.run_query(graph, subject, name, *args)
+
+    write_table(table, output_format, output)
+
+
+def match_store(incremental: bool = False):
+    """The match store to ingest the dataset into, or None to use the dataset cache."""
+    if not incremental:
+        return None
+
+    from src.match_store import MatchStore
+
+    return MatchStore()
+
+
+def write_table(
+    table, output_format: str = "json", output: Optional[str] = None
+) -> None:
+    """Writes a table as JSON records or CSV to output, or to stdout."""
+    if output_format == "csv":
+        text = table.to_csv(index=False)
+    else:
+        text = table.to_json(orient="records", date_format="iso", indent=2) + "\n"
+
+    if output:
+        with open(output, "w") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def simulate(
+    seasons: int,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+    as_of: Optional[str] = None,
+    output_format: str = "json",
+    output: Optional[str] = None,
+) -> None:
+    """Simulates the rest of the season and writes the odds of every team, reporting
+    the throughput on stderr.
+
+    Args:
+        seasons (int): number of simulated seasons
+        max_workers (int, optional): number of processes. Defaults to the cores.
+        seed (int, optional): random seed. Defaults to 0.
+        as_of (str, optional): only count the league results before this date.
+        Defaults to None, every result.
+        output_format (str, optional): "json" or "csv". Defaults to "json".
+        output (str, optional): path to write the table to. Defaults to stdout.
+    """
+    from src.process_dataset import DatasetCleaner
+    from src.season_simulator import SeasonSimulator
+
+    simulator = SeasonSimulator(DatasetCleaner().load_table("summary"), as_of)
+    result = simulator.simulate(seasons, max_workers, seed)
+    write_table(result.table, output_format, output)
+    print(
+        f"Simulated {result.seasons} seasons in {result.seconds:.2f}s on "
+        f"{result.workers} workers: {result.seasons_per_second:,.0f} seasons/s",
+        file=sys.stderr,
+    )
+
+
+@contextmanager
+def profiling(profile: Optional[str], profile_summary: bool) -> Iterator[None]:
+    """Profiles the with block when a report path or summary is requested."""
+    from src.instrumentation import PROFILER
+
+    if profile or profile_summary:
+        PROFILER.enable()
+    try:
+        yield
+    finally:
+        if profile:
+            PROFILER.write_json(profile)
+        if profile_summary:
+            print(PROFILER.summary_table(), file=sys.stderr)
+        PROFILER.disable()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    # only the names of the charts and queries, the analyses load when they run
+    from src.catalog import CHARTS, DEFAULT_SEASONS, QUERIES
+
+    if argv is None:
+        argv = sys.argv[1:]
+    # without a command, e.g. "main.py top_10_batsmen", render charts like before
+    commands = ["charts", "serve", "simulate", *QUERIES]
+    if not argv or argv[0] not in commands + ["-h", "--help"]:
+        argv = ["charts", *argv]
+
+    profiling_options = argparse.ArgumentParser(add_help=False)
+    profiling_options.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="write the wall time, CPU time, peak memory and rows of every stage as JSON",
+    )
+    profiling_options.add_argument(
+        "--profile-summary",
+        action="store_true",
+        help="print the profiled stages as a table",
+    )
+    store_options = argparse.ArgumentParser(add_help=False)
+    store_options.add_argument(
+        "--incremental",
+        action="store_true",
+        help="ingest only new or changed matches into the match store and read the "
+        "running totals from it",
+    )
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument(
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="output format of the table. Defaults to json",
+    )
+    output_options.add_argument(
+        "--output", metavar="PATH", help="write the table to PATH instead of stdout"
     )
 
-    batsman = explore_batting.BattingData(batting_df)
-    bowler = explore_bowling.BowlingData(bowling_df)
-    details = explore_details.DetailsData(details_df)
-    probability_six_by_over, total_six_by_over = details.likelihood_of_six_per_over()
-    innings_1_density, innings_2_density = details.inning_density_of_runs()
-    summary = explore_summary.SummaryData(summary_df)
+    parser = argparse.ArgumentParser(description="Analyse and visualize the SA20 data")
+    commands_parser = parser.add_subparsers(dest="command", metavar="COMMAND")
 
-    visualizer = visualize_information.VisualizeInformation()
-    visualizer.show_top10_batsman(batsman.get_all_performances())
-    visualizer.show_best_batsman_per_game(batsman.best_batsman_per_game())
-    visualizer.show_best_home_away_batsmen(
-        batsman.compare_all_performances(),
-        "Home",
+    charts_parser = commands_parser.add_parser(
+        "charts",
+        parents=[profiling_options, store_options],
+        help="render charts, the default",
     )
-    visualizer.show_best_home_away_batsmen(
-        batsman.compare_all_performances(),
-        "Away",
+    charts_parser.add_argument(
+        "charts",
+        nargs="*",
+        metavar="CHART",
+        help=f"charts to render, any of {', '.join(CHARTS)}. "
+        "Defaults to all of them",
     )
-    visualizer.show_most_boundaries(batsman.get_all_performances())
 
-    visualizer.show_top10_bowlers(bowler.get_all_performances())
-    visualizer.show_best_bowler_per_game(bowler.best_bowler_per_game())
-    visualizer.show_best_home_away_bowler(bowler.compare_all_performances(), "Home")
-    visualizer.show_best_home_away_bowler(bowler.compare_all_performances(), "Away")
+    serve_parser = commands_parser.add_parser(
+        "serve", help="answer the queries over HTTP as JSON, from data kept in memory"
+    )
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="Defaults to 127.0.0.1"
+    )
+    serve_parser.add_argument("--port", type=int, default=8020, help="Defaults to 8020")
+    serve_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="responses kept in the LRU cache. Defaults to 256",
+    )
 
-    visualizer.show_probability_six_per_over(probability_six_by_over)
-    visualizer.show_total_sixes_per_over(total_six_by_over)
-    visualizer.show_team_run_count(innings_1_density, "1st")
-    visualizer.show_team_run_count(innings_2_density, "2nd")
+    simulate_parser = commands_parser.add_parser(
+        "simulate",
+        parents=[output_options],
+        help="simulate the rest of the season and the playoffs",
+    )
+    simulate_parser.add_argument(
+        "--seasons",
+        type=int,
+        default=DEFAULT_SEASONS,
+        help=f"number of simulated seasons. Defaults to {DEFAULT_SEASONS}",
+    )
+    simulate_parser.add_argument(
+        "--workers", type=int, help="number of processes. Defaults to the cores"
+    )
+    simulate_parser.add_argument(
+        "--seed", type=int, default=0, help="random seed. Defaults to 0"
+    )
+    simulate_parser.add_argument(
+        "--as-of",
+        metavar="DATE",
+        help="only count the league results before DATE, e.g. 2023-01-28",
+    )
+
+    for subject, subject_queries in QUERIES.items():
+        subject_parser = commands_parser.add_parser(
+            subject, help=f"print a {subject} table"
+        )
+        query_parser = subject_parser.add_subparsers(
+            dest="query", metavar="QUERY", required=True
+        )
+        for name, subject_query in subject_queries.items():
+            name_parser = query_parser.add_parser(
+                name,
+                parents=[output_options, profiling_options, store_options],
+                help=subject_query.description,
+            )
+            for param, _ in subject_query.params:
+                name_parser.add_argument(param)
 
-    visualizer.show_game_break_wins(summary.analyze_result_vs_days())
-    visualizer.toss_decisions(summary.get_toss_decisions())
-    visualizer.show_lowest_scores(summary.get_lowest_scores())
-    visualizer.show_highest_scores(summary.get_highest_scores())
+    args = parser.parse_args(argv)
+
+    if args.command == "charts":
+        # choices does not accept an empty list of positional arguments, so check here
+        unknown = [chart for chart in args.charts if chart not in CHARTS]
+        if unknown:
+            parser.error(f"unknown charts: {', '.join(unknown)}")
+    elif args.command not in ["serve", "simulate"]:
+        args.params = [
+            getattr(args, param)
+            for param, _ in QUERIES[args.command][args.query].params
+        ]
+    return args
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.command == "charts":
+        main(
+            charts=args.charts,
+            profile=args.profile,
+            profile_summary=args.profile_summary,
+            incremental=args.incremental,
+        )
+    elif args.command == "serve":
+        from src import stats_service
+
+        stats_service.serve(host=args.host, port=args.port, cache_size=args.cache_size)
+    elif args.command == "simulate":
+        simulate(
+            seasons=args.seasons,
+            max_workers=args.workers,
+            seed=args.seed,
+            as_of=args.as_of,
+            output_format=args.output_format,
+            output=args.output,
+        )
+    else:
+        query(
+            args.command,
+            args.query,
+            args.params,
+            output_format=args.output_format,
+            output=args.output,
+            profile=args.profile,
+            profile_summary=args.profile_summary,
+            incremental=args.incremental,
+        )
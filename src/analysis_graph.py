@@ -0,0 +1,428 @@
+import importlib
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from src.match_store import MatchStore
+    from src.process_dataset import DatasetCleaner
+
+
+@dataclass(frozen=True)
+class Node:
+    """A derived value of the analysis and the nodes it is computed from.
+
+    Attributes:
+        name (str): unique name of the node
+        compute (Callable[..., Any]): computes the value from the values of dependencies,
+            passed as positional arguments in order
+        dependencies (Tuple[str, ...]): names of the nodes the value is computed from
+    """
+
+    name: str
+    compute: Callable[..., Any]
+    dependencies: Tuple[str, ...] = ()
+
+
+class AnalysisGraph:
+    """A lazily evaluated graph of analysis nodes.
+
+    A node is only computed when it, or a node depending on it, is requested, and then
+    exactly once; every later request and every dependent node shares the same value.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = ()):
+        self.nodes: Dict[str, Node] = {}
+        self.values: Dict[str, Any] = {}
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Node) -> None:
+        if node.name in self.nodes:
+            raise ValueError(f"Node {node.name} is already in the graph")
+        self.nodes[node.name] = node
+
+    def set(self, name: str, value: Any) -> None:
+        """Provides the value of a node instead of computing it, e.g. a table that is
+        already in memory. Only set nodes before anything depending on them is computed.
+
+        Args:
+            name (str): name of the node
+            value (Any): its value
+        """
+        if name not in self.nodes:
+            raise KeyError(f"Unknown analysis node {name}")
+        self.values[name] = value
+
+    def get(self, name: str) -> Any:
+        """Returns the value of a node, computing it and its missing ancestors first.
+
+        Args:
+            name (str): name of the node
+
+        Returns:
+            Any: the memoized value of the node
+        """
+        if name not in self.values:
+            for ancestor in self.ancestors(name):
+                if ancestor not in self.values:
+                    node = self.nodes[ancestor]
+                    self.values[ancestor] = node.compute(
+                        *(self.values[dependency] for dependency in node.dependencies)
+                    )
+        return self.values[name]
+
+    def ancestors(self, name: str) -> List[str]:
+        """Returns name and every node it depends on, dependencies before dependents.
+
+        Args:
+            name (str): name of the node
+
+        Returns:
+            List[str]: the nodes in the order they have to be computed
+        """
+        order: List[str] = []
+        visiting: List[str] = []
+
+        def visit(current: str) -> None:
+            if current in order:
+                return
+            if current in visiting:
+                cycle = " -> ".join(visiting[visiting.index(current) :] + [current])
+                raise ValueError(f"Dependency cycle: {cycle}")
+            if current not in self.nodes:
+                raise KeyError(f"Unknown analysis node {current}")
+            visiting.append(current)
+            for dependency in self.nodes[current].dependencies:
+                visit(dependency)
+            visiting.pop()
+            order.append(current)
+
+        visit(name)
+        return order
+
+
+def deferred(path: str) -> Callable[..., Any]:
+    """Returns a function calling the class, function or method at path, e.g.
+    "src.explore_batting:BattingData.get_all_performances", that only imports its
+    module when it is first called, so a query never loads the analyses it skips."""
+    module_name, attribute = path.split(":")
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        target: Any = importlib.import_module(module_name)
+        for name in attribute.split("."):
+            target = getattr(target, name)
+        return target(*args, **kwargs)
+
+    return call
+
+
+# graph nodes of the cleaned tables, in the order of process_dataset.TABLES
+TABLE_NODES: Tuple[str, ...] = ("batting_df", "bowling_df", "details_df", "summary_df")
+
+# graph nodes of the running totals of a match store, see match_store.AGGREGATORS
+TOTALS: Tuple[str, ...] = ("batting_totals", "bowling_totals", "team_totals")
+
+
+def chart_node(name: str, method: str, dependency: str, *args: Any) -> Node:
+    """A node computing the (method, arguments) job of a chart from one dependency."""
+    return Node(name, lambda value: (method, (value, *args)), (dependency,))
+
+
+def table_nodes(
+    cleaner: "DatasetCleaner", store: Optional["MatchStore"] = None
+) -> List[Node]:
+    """Declares the cleaned tables, their dimensions and the running totals.
+
+    Without a store the tables are loaded through the dataset cache and there are no
+    running totals. With one, only the new or changed matches are ingested into it,
+    the tables are every stored match and the totals are those the store keeps.
+    """
+    if store is None:
+        return [
+            Node("batting_df", lambda: cleaner.load_table("batting_card")),
+            Node("bowling_df", lambda: cleaner.load_table("bowling_card")),
+            Node("details_df", lambda: cleaner.load_table("details")),
+            Node("summary_df", lambda: cleaner.load_table("summary")),
+            Node("dimensions", cleaner.load_dimensions),
+            *(Node(name, lambda: None) for name in TOTALS),
+        ]
+
+    return [
+        Node("ingested", lambda: cleaner.ingest_incremental(store)),
+        *(
+            Node(name, lambda tables, index=index: tables[index], ("ingested",))
+            for index, name in enumerate(TABLE_NODES)
+        ),
+        # ids are assigned in sorted name order, so these are the ids the ingested
+        # tables were keyed to
+        Node(
+            "dimensions",
+            lambda tables: deferred("src.dimensions:Dimensions.build")(*tables),
+            ("ingested",),
+        ),
+        *(
+            Node(name, lambda _, name=name: store.aggregates.get(name), ("ingested",))
+            for name in TOTALS
+        ),
+    ]
+
+
+def build_pipeline(
+    cleaner: Optional["DatasetCleaner"] = None, store: Optional["MatchStore"] = None
+) -> AnalysisGraph:
+    """Declares the tables, analyses and charts of main.py as an analysis graph.
+
+    Args:
+        cleaner (DatasetCleaner, optional): loads the cleaned tables. Defaults to
+        DatasetCleaner().
+        store (MatchStore, optional): ingest the tables incrementally into this store
+        and read the performances and team wins from its running totals. Defaults to
+        None, the dataset cache.
+
+    Returns:
+        AnalysisGraph: the graph, nothing has been computed yet
+    """
+    if cleaner is None:
+        from src.process_dataset import DatasetCleaner
+
+        cleaner = DatasetCleaner()
+
+    return AnalysisGraph(
+        [
+            # cleaned tables, every one keyed to the same player and team ids
+            *table_nodes(cleaner, store),
+            Node("players", lambda dimensions: dimensions.players, ("dimensions",)),
+            Node(
+                "delivery_store",
+                lambda: deferred("src.delivery_store:DeliveryStore.open")(
+                    f"{cleaner.raw_input_dir}/details.csv"
+                ),
+            ),
+            # explorers
+            Node(
+                "batting",
+                deferred("src.explore_batting:BattingData"),
+                ("batting_df", "players", "batting_totals"),
+            ),
+            Node(
+                "bowling",
+                deferred("src.explore_bowling:BowlingData"),
+                ("bowling_df", "players", "bowling_totals"),
+            ),
+            Node(
+                "matchups",
+                lambda: deferred("src.matchups:MatchupMatrix.open")(
+                    f"{cleaner.raw_input_dir}/details.csv"
+                ),
+            ),
+            # the delivery queries run on the compact store, not on details_df
+            Node(
+                "details",
+                lambda store: deferred("src.explore_details:DetailsData")(store=store),
+                ("delivery_store",),
+            ),
+            # only the matchup queries open the saved matchup matrix
+            Node(
+                "matchup_details",
+                lambda store, matchups: deferred("src.explore_details:DetailsData")(
+                    store=store, matchups=matchups
+                ),
+                ("delivery_store", "matchups"),
+            ),
+            Node(
+                "summary",
+                deferred("src.explore_summary:SummaryData"),
+                ("summary_df", "team_totals"),
+            ),
+            Node(
+                "batting_form",
+                deferred("src.player_form:BattingForm.from_card"),
+                ("batting_df", "summary_df", "players"),
+            ),
+            Node(
+                "bowling_form",
+                deferred("src.player_form:BowlingForm.from_card"),
+                ("bowling_df", "summary_df", "players"),
+            ),
+            Node(
+                "season_simulator",
+                deferred("src.season_simulator:SeasonSimulator"),
+                ("summary_df",),
+            ),
+            Node(
+                "win_probability",
+                lambda store, summary: deferred(
+                    "src.win_probability:WinProbability.build"
+                )(store, summary.scorecards),
+                ("delivery_store", "summary"),
+            ),
+            # the per player delivery counts still need the details frame
+            Node(
+                "details_frame",
+                lambda details_df, store: deferred("src.explore_details:DetailsData")(
+                    details_df, store=store
+                ),
+                ("details_df", "delivery_store"),
+            ),
+            # analyses
+            Node(
+                "batting_performances",
+                deferred("src.explore_batting:BattingData.get_all_performances"),
+                ("batting",),
+            ),
+            Node(
+                "best_batsmen_per_game",
+                deferred("src.explore_batting:BattingData.best_batsman_per_game"),
+                ("batting",),
+            ),
+            Node(
+                "batting_home_away",
+                deferred("src.explore_batting:BattingData.compare_all_performances"),
+                ("batting",),
+            ),
+            Node(
+                "bowling_performances",
+                deferred("src.explore_bowling:BowlingData.get_all_performances"),
+                ("bowling",),
+            ),
+            Node(
+                "best_bowlers_per_game",
+                deferred("src.explore_bowling:BowlingData.best_bowler_per_game"),
+                ("bowling",),
+            ),
+            Node(
+                "bowling_home_away",
+                deferred("src.explore_bowling:BowlingData.compare_all_performances"),
+                ("bowling",),
+            ),
+            Node(
+                "sixes_per_over",
+                deferred("src.explore_details:DetailsData.likelihood_of_six_per_over"),
+                ("details",),
+            ),
+            Node(
+                "innings_run_density",
+                deferred("src.explore_details:DetailsData.inning_density_of_runs"),
+                ("details",),
+            ),
+            Node(
+                "result_vs_days",
+                deferred("src.explore_summary:SummaryData.analyze_result_vs_days"),
+                ("summary",),
+            ),
+            Node(
+                "toss_decision_counts",
+                deferred("src.explore_summary:SummaryData.get_toss_decisions"),
+                ("summary",),
+            ),
+            Node(
+                "lowest_team_scores",
+                deferred("src.explore_summary:SummaryData.get_lowest_scores"),
+                ("summary",),
+            ),
+            Node(
+                "highest_team_scores",
+                deferred("src.explore_summary:SummaryData.get_highest_scores"),
+                ("summary",),
+            ),
+            Node(
+                "six_probability",
+                lambda sixes: sixes[0],
+                ("sixes_per_over",),
+            ),
+            Node("total_sixes", lambda sixes: sixes[1], ("sixes_per_over",)),
+            Node(
+                "win_probability_worm_data",
+                deferred("src.win_probability:WinProbability.worms"),
+                ("win_probability",),
+            ),
+            Node(
+                "first_innings_density",
+                lambda density: density[0],
+                ("innings_run_density",),
+            ),
+            Node(
+                "second_innings_density",
+                lambda density: density[1],
+                ("innings_run_density",),
+            ),
+            # charts
+            chart_node("top_10_batsmen", "show_top10_batsman", "batting_performances"),
+            chart_node(
+                "best_batsman_per_game",
+                "show_best_batsman_per_game",
+                "best_batsmen_per_game",
+            ),
+            chart_node(
+                "best_home_batsmen",
+                "show_best_home_away_batsmen",
+                "batting_home_away",
+                "Home",
+            ),
+            chart_node(
+                "best_away_batsmen",
+                "show_best_home_away_batsmen",
+                "batting_home_away",
+                "Away",
+            ),
+            chart_node(
+                "most_boundaries", "show_most_boundaries", "batting_performances"
+            ),
+            chart_node("top_10_bowlers", "show_top10_bowlers", "bowling_performances"),
+            chart_node(
+                "best_bowler_per_game",
+                "show_best_bowler_per_game",
+                "best_bowlers_per_game",
+            ),
+            chart_node(
+                "best_home_bowlers",
+                "show_best_home_away_bowler",
+                "bowling_home_away",
+                "Home",
+            ),
+            chart_node(
+                "best_away_bowlers",
+                "show_best_home_away_bowler",
+                "bowling_home_away",
+                "Away",
+            ),
+            chart_node(
+                "six_probability_per_over",
+                "show_probability_six_per_over",
+                "six_probability",
+            ),
+            chart_node(
+                "total_sixes_per_over", "show_total_sixes_per_over", "total_sixes"
+            ),
+            chart_node(
+                "first_innings_run_count",
+                "show_team_run_count",
+                "first_innings_density",
+                "1st",
+            ),
+            chart_node(
+                "second_innings_run_count",
+                "show_team_run_count",
+                "second_innings_density",
+                "2nd",
+            ),
+            chart_node("game_break_wins", "show_game_break_wins", "result_vs_days"),
+            chart_node("toss_decisions", "toss_decisions", "toss_decision_counts"),
+            chart_node("lowest_scores", "show_lowest_scores", "lowest_team_scores"),
+            chart_node("highest_scores", "show_highest_scores", "highest_team_scores"),
+            chart_node(
+                "win_probability_worms",
+                "show_win_probability_worms",
+                "win_probability_worm_data",
+            ),
+        ]
+    )
@@ -0,0 +1,241 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# only names, descriptions and command line defaults live here, so the command line
+# lists the charts and queries without importing pandas or any of the analyses
+
+# chart nodes of the analysis graph in the order main.py renders them, each computes
+# its chart job
+CHARTS: Tuple[str, ...] = (
+    "top_10_batsmen",
+    "best_batsman_per_game",
+    "best_home_batsmen",
+    "best_away_batsmen",
+    "most_boundaries",
+    "top_10_bowlers",
+    "best_bowler_per_game",
+    "best_home_bowlers",
+    "best_away_bowlers",
+    "six_probability_per_over",
+    "total_sixes_per_over",
+    "first_innings_run_count",
+    "second_innings_run_count",
+    "game_break_wins",
+    "toss_decisions",
+    "lowest_scores",
+    "highest_scores",
+    "win_probability_worms",
+)
+
+
+@dataclass(frozen=True)
+class Query:
+    """A stat table computed by a method of one of the explorers of the analysis graph.
+
+    Attributes:
+        node (str): graph node of the explorer, e.g. "batting"
+        method (str): name of the explorer method computing the result
+        description (str): one line description, shown in the command line help
+        params (Tuple[Tuple[str, Callable[[str], Any]], ...]): name and converter of
+            every argument of the method, in order
+        item (int, optional): index of the table to take when the method returns a
+            tuple of them
+        key (str, optional): column to put the keys in when the method returns a
+            dictionary keyed by e.g. team, rather than a single record
+        value (str, optional): column to put the values of such a dictionary in, when
+            they are not records themselves
+    """
+
+    node: str
+    method: str
+    description: str
+    params: Tuple[Tuple[str, Callable[[str], Any]], ...] = ()
+    item: Optional[int] = None
+    key: Optional[str] = None
+    value: Optional[str] = None
+
+
+# every query by subject and name, e.g. QUERIES["batting"]["performances"]
+QUERIES: Dict[str, Dict[str, Query]] = {
+    "batting": {
+        "performances": Query(
+            "batting", "get_all_performances", "totals of every batsman"
+        ),
+        "best-per-game": Query(
+            "batting", "best_batsman_per_game", "the top scorer of every game"
+        ),
+        "home-away": Query(
+            "batting",
+            "compare_all_performances",
+            "average batting of every batsman at home and away",
+        ),
+        "form": Query(
+            "batting_form",
+            "current_form",
+            "runs, strike rate and average of every batsman over their latest innings",
+        ),
+        "player-form": Query(
+            "batting_form",
+            "player_form",
+            "rolling form of a batsman after every innings",
+            params=(("batsman", str),),
+        ),
+    },
+    "bowling": {
+        "performances": Query(
+            "bowling", "get_all_performances", "totals of every bowler"
+        ),
+        "best-per-game": Query(
+            "bowling", "best_bowler_per_game", "the best bowler of every game"
+        ),
+        "home-away": Query(
+            "bowling",
+            "compare_all_performances",
+            "average bowling of every bowler at home and away",
+        ),
+        "form": Query(
+            "bowling_form",
+            "current_form",
+            "wickets, economy and average of every bowler over their latest innings",
+        ),
+        "player-form": Query(
+            "bowling_form",
+            "player_form",
+            "rolling form of a bowler after every innings",
+            params=(("bowler", str),),
+        ),
+    },
+    "details": {
+        "six-probability": Query(
+            "details",
+            "likelihood_of_six_per_over",
+            "percentage of all sixes hit in every over",
+            item=0,
+            key="over",
+            value="six_percentage",
+        ),
+        "sixes-per-over": Query(
+            "details",
+            "likelihood_of_six_per_over",
+            "runs scored from sixes in every over",
+            item=1,
+        ),
+        "run-density": Query(
+            "details",
+            "all_density_of_runs",
+            "deliveries per team and runs scored off them",
+        ),
+        "first-innings-density": Query(
+            "details",
+            "inning_density_of_runs",
+            "run density of the first innings",
+            item=0,
+        ),
+        "second-innings-density": Query(
+            "details",
+            "inning_density_of_runs",
+            "run density of the second innings",
+            item=1,
+        ),
+        "batsman-matchups": Query(
+            "matchup_details",
+            "batsman_matchups",
+            "balls, runs, dots, boundaries and dismissals of a batsman per bowler",
+            params=(("batsman", str),),
+        ),
+        "bowler-matchups": Query(
+            "matchup_details",
+            "bowler_matchups",
+            "balls, runs, dots, boundaries and dismissals of a bowler per batsman",
+            params=(("bowler", str),),
+        ),
+        "hardest-matchups": Query(
+            "matchup_details",
+            "hardest_matchups",
+            "the batsman and bowler pairs with the most dismissals per ball",
+            params=(("top_k", int),),
+        ),
+        "win-probability": Query(
+            "win_probability",
+            "match_worm",
+            "chance of the side batting first winning after every delivery of a match",
+            params=(("match_id", int),),
+        ),
+        "win-probability-table": Query(
+            "win_probability",
+            "lookup_table",
+            "deliveries, wins and smoothed win probability of every match state",
+        ),
+        "bowler-deliveries": Query(
+            "details_frame",
+            "bowler_deliveries",
+            "deliveries, runs, dots, fours and sixes of every bowler",
+        ),
+        "batsman-deliveries": Query(
+            "details_frame",
+            "batsman_deliveries",
+            "deliveries, runs, dots, fours and sixes of every batsman",
+        ),
+    },
+    "summary": {
+        "total-matches": Query(
+            "summary", "get_total_matches", "number of matches in the summary"
+        ),
+        "team-wins": Query(
+            "summary",
+            "get_team_wins",
+            "home, away and total wins of a team",
+            params=(("team", str),),
+        ),
+        "toss-decisions": Query(
+            "summary",
+            "get_toss_decisions",
+            "how often toss winners bat or bowl",
+            key="decision",
+            value="count",
+        ),
+        "lowest-scores": Query(
+            "summary",
+            "get_lowest_scores",
+            "lowest score of every innings",
+            key="innings",
+        ),
+        "highest-scores": Query(
+            "summary",
+            "get_highest_scores",
+            "highest score of every innings",
+            key="innings",
+        ),
+        "rest-days": Query(
+            "summary", "analyze_result_vs_days", "win rate by rest days before a game"
+        ),
+        "timeline": Query(
+            "summary",
+            "get_team_timeline",
+            "every fixture of a team with rest days and streaks",
+            params=(("team", str),),
+        ),
+        "streaks": Query(
+            "summary",
+            "get_current_streaks",
+            "current win or loss streak of every team",
+            key="team",
+            value="streak",
+        ),
+        "season-odds": Query(
+            "season_simulator",
+            "season_odds",
+            "qualification, top of table and title odds from simulated seasons",
+            params=(("seasons", int),),
+        ),
+        "match-score": Query(
+            "summary",
+            "get_match_score",
+            "parsed scorecard of a match",
+            params=(("match_id", int),),
+        ),
+    },
+}
+
+# seasons replayed by the season simulator unless told otherwise
+DEFAULT_SEASONS: int = 200_000
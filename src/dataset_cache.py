@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import os
+from typing import Optional
+
+import pandas as pd
+
+CACHE_DIR: str = "./input/cache"
+
+
+def hash_file(path: str, salt: str = "") -> str:
+    """Hashes the contents of a file, so that any change to it produces a new key.
+
+    Args:
+        path (str): path of the file to hash
+        salt (str, optional): extra text mixed into the hash, e.g. a version. Defaults to "".
+
+    Returns:
+        str: the hex SHA-256 digest of salt and the file contents
+    """
+    digest = hashlib.sha256(salt.encode())
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Content-addressed store of cleaned dataframes.
+
+    Every entry is saved as a pandas pickle, which keeps the column blocks and dtypes
+    as binary arrays so a warm load skips CSV parsing entirely. Only the newest entry
+    per table is kept.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path(self, table: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{table}-{key}.pkl")
+
+    def load(self, table: str, key: str) -> Optional[pd.DataFrame]:
+        """Returns the cached dataframe for table and key, or None on a cache miss.
+
+        Args:
+            table (str): name of the table, e.g. "details"
+            key (str): content hash of the raw input
+
+        Returns:
+            Optional[pd.DataFrame]: the cached dataframe if it exists
+        """
+        path = self.path(table, key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return pd.read_pickle(path)
+        except Exception:
+            logging.error(f"Could not read the cache entry {path}, rebuilding it")
+            return None
+
+    def store(self, table: str, key: str, table_df: pd.DataFrame) -> None:
+        """Saves table_df under table and key and drops older entries for the table.
+
+        Args:
+            table (str): name of the table, e.g. "details"
+            key (str): content hash of the raw input
+            table_df (pd.DataFrame): the cleaned dataframe to cache
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(table, key)
+
+        # write to a temporary file first so a crash never leaves a half written entry
+        temp_path = f"{path}.tmp"
+        table_df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.startswith(f"{table}-") and file_name != os.path.basename(
+                path
+            ):
+                os.remove(os.path.join(self.cache_dir, file_name))
@@ -0,0 +1,382 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Declares how a raw input CSV is loaded.
+
+    Attributes:
+        columns (Tuple[str, ...]): the raw columns the analyses need, nothing else is read
+        dtypes (Dict[str, str]): compact numeric dtypes for the columns
+        categories (Tuple[str, ...]): low cardinality text columns loaded as categoricals
+        booleans (Tuple[str, ...]): True/False text columns loaded as booleans
+        shared_categories (Tuple[Tuple[str, ...], ...]): groups of categorical columns that
+            are compared with each other and therefore need identical categories
+    """
+
+    columns: Tuple[str, ...]
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    categories: Tuple[str, ...] = ()
+    booleans: Tuple[str, ...] = ()
+    shared_categories: Tuple[Tuple[str, ...], ...] = ()
+
+
+SCHEMAS: Dict[str, TableSchema] = {
+    "batting_card": TableSchema(
+        columns=(
+            "season",
+            "match_id",
+            "match_name",
+            "home_team",
+            "away_team",
+            "venue",
+            "city",
+            "country",
+            "current_innings",
+            "innings_id",
+            "name",
+            "fullName",
+            "runs",
+            "ballsFaced",
+            "minutes",
+            "fours",
+            "sixes",
+            "strikeRate",
+            "captain",
+            "isNotOut",
+            "runningScore",
+            "runningOver",
+            "shortText",
+        ),
+        dtypes={
+            "season": "int16",
+            "match_id": "int32",
+            "innings_id": "int8",
+            "runs": "int16",
+            "ballsFaced": "int16",
+            "fours": "int16",
+            "sixes": "int16",
+        },
+        categories=(
+            "match_name",
+            "home_team",
+            "away_team",
+            "venue",
+            "city",
+            "country",
+            "current_innings",
+            "name",
+            "fullName",
+        ),
+        booleans=("captain", "isNotOut"),
+        shared_categories=(("home_team", "away_team", "current_innings"),),
+    ),
+    "bowling_card": TableSchema(
+        columns=(
+            "season",
+            "match_id",
+            "match_name",
+            "home_team",
+            "away_team",
+            "bowling_team",
+            "venue",
+            "city",
+            "country",
+            "innings_id",
+            "name",
+            "fullName",
+            "overs",
+            "maidens",
+            "conceded",
+            "wickets",
+            "economyRate",
+            "dots",
+            "foursConceded",
+            "sixesConceded",
+            "wides",
+            "noballs",
+            "captain",
+        ),
+        dtypes={
+            "season": "int16",
+            "match_id": "int32",
+            "innings_id": "int8",
+            "maidens": "int16",
+            "conceded": "int16",
+            "wickets": "int16",
+            "dots": "int16",
+            "foursConceded": "int16",
+            "sixesConceded": "int16",
+            "wides": "int16",
+            "noballs": "int16",
+        },
+        categories=(
+            "match_name",
+            "home_team",
+            "away_team",
+            "bowling_team",
+            "venue",
+            "city",
+            "country",
+            "name",
+            "fullName",
+        ),
+        booleans=("captain",),
+        shared_categories=(("home_team", "away_team", "bowling_team"),),
+    ),
+    "details": TableSchema(
+        columns=(
+            "comment_id",
+            "match_id",
+            "match_name",
+            "home_team",
+            "away_team",
+            "current_innings",
+            "innings_id",
+            "over",
+            "ball",
+            "runs",
+            "shortText",
+            "isBoundary",
+            "isWide",
+            "isNoball",
+            "batsman1_id",
+            "batsman1_name",
+            "batsman1_runs",
+            "batsman1_balls",
+            "bowler1_id",
+            "bowler1_name",
+            "bowler1_overs",
+            "bowler1_maidens",
+            "bowler1_runs",
+            "bowler1_wkts",
+            "batsman2_id",
+            "batsman2_name",
+            "batsman2_runs",
+            "batsman2_balls",
+            "bowler2_id",
+            "bowler2_name",
+            "bowler2_overs",
+            "bowler2_maidens",
+            "bowler2_runs",
+            "bowler2_wkts",
+            "wicket_id",
+            "wkt_batsman_name",
+            "wkt_bowler_name",
+            "wkt_batsman_runs",
+            "wkt_batsman_balls",
+            "wkt_text",
+            "isRetiredHurt",
+        ),
+        dtypes={
+            "comment_id": "int32",
+            "match_id": "int32",
+            "innings_id": "int8",
+            "over": "int8",
+            "ball": "int8",
+            "runs": "int8",
+            "batsman1_id": "int32",
+            "batsman1_runs": "int16",
+            "batsman1_balls": "int16",
+            "bowler1_id": "int32",
+            "bowler1_maidens": "int16",
+            "bowler1_runs": "int16",
+            "bowler1_wkts": "int16",
+            "batsman2_id": "int32",
+            "batsman2_runs": "int16",
+            "batsman2_balls": "int16",
+        },
+        categories=(
+            "match_name",
+            "home_team",
+            "away_team",
+            "current_innings",
+            "batsman1_name",
+            "bowler1_name",
+            "batsman2_name",
+            "bowler2_name",
+            "wkt_batsman_name",
+            "wkt_bowler_name",
+        ),
+        booleans=("isBoundary", "isWide", "isNoball", "isRetiredHurt"),
+        shared_categories=(("home_team", "away_team", "current_innings"),),
+    ),
+    "summary": TableSchema(
+        columns=(
+            "season",
+            "id",
+            "name",
+            "short_name",
+            "description",
+            "home_team",
+            "away_team",
+            "toss_won",
+            "decision",
+            "1st_inning_score",
+            "2nd_inning_score",
+            "home_score",
+            "away_score",
+            "winner",
+            "result",
+            "start_date",
+            "end_date",
+            "venue_id",
+            "venue_name",
+            "home_captain",
+            "away_captain",
+            "pom",
+            "points",
+            "super_over",
+            "home_overs",
+            "home_runs",
+            "home_wickets",
+            "home_boundaries",
+            "away_overs",
+            "away_runs",
+            "away_wickets",
+            "away_boundaries",
+            "home_key_batsman",
+            "home_key_bowler",
+            "home_playx1",
+            "away_playx1",
+            "away_key_batsman",
+            "away_key_bowler",
+            "match_days",
+            "umpire1",
+            "umpire2",
+            "tv_umpire",
+            "referee",
+            "reserve_umpire",
+        ),
+        dtypes={"id": "int32", "venue_id": "int32"},
+        categories=("home_team", "away_team", "winner", "venue_name"),
+        shared_categories=(("home_team", "away_team", "winner"),),
+    ),
+}
+
+
+def parse_boolean(column: pd.Series) -> pd.Series:
+    """Converts a True/False text column to booleans, treating anything else as False."""
+    if column.dtype == bool:
+        return column
+    return column.astype(str).str.lower().eq("true")
+
+
+def read_table(path: str, schema: TableSchema) -> pd.DataFrame:
+    """Reads a raw input CSV with only the columns and compact dtypes in its schema.
+
+    Args:
+        path (str): path of the raw CSV file
+        schema (TableSchema): the schema of the table
+
+    Returns:
+        pd.DataFrame: the typed dataframe
+    """
+    table_df = pd.read_csv(path, **read_csv_options(schema))
+    return apply_schema(table_df, schema)
+
+
+def read_table_chunks(
+    path: str, schema: TableSchema, chunksize: int
+) -> Iterator[pd.DataFrame]:
+    """Reads a raw input CSV like read_table, but at most chunksize rows at a time.
+
+    Args:
+        path (str): path of the raw CSV file
+        schema (TableSchema): the schema of the table
+        chunksize (int): number of rows per chunk
+
+    Yields:
+        pd.DataFrame: the typed chunks of the table
+    """
+    with pd.read_csv(path, chunksize=chunksize, **read_csv_options(schema)) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk, schema)
+
+
+def read_csv_options(schema: TableSchema) -> dict:
+    dtypes = {**schema.dtypes, **{column: "category" for column in schema.categories}}
+    return {"usecols": list(schema.columns), "dtype": dtypes}
+
+
+def apply_schema(table_df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """Applies the boolean parsing and shared categories of schema to table_df.
+
+    Args:
+        table_df (pd.DataFrame): dataframe read with the dtypes of schema
+        schema (TableSchema): the schema of the table
+
+    Returns:
+        pd.DataFrame: the typed dataframe
+    """
+    for column in schema.booleans:
+        table_df[column] = parse_boolean(table_df[column])
+
+    # keep categories sorted so grouped results come out in the same order as strings
+    for column in schema.categories:
+        table_df[column] = table_df[column].cat.reorder_categories(
+            sorted(table_df[column].cat.categories)
+        )
+
+    return share_categories(table_df, schema)
+
+
+def share_categories(table_df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """Gives the columns that are compared with each other the same categories.
+
+    Args:
+        table_df (pd.DataFrame): the typed dataframe
+        schema (TableSchema): the schema of the table
+
+    Returns:
+        pd.DataFrame: table_df with the shared categories applied
+    """
+    for columns in schema.shared_categories:
+        categories = union_categoricals(
+            [table_df[column] for column in columns], sort_categories=True
+        ).categories
+        for column in columns:
+            table_df[column] = table_df[column].cat.set_categories(categories)
+
+    return table_df
+
+
+def concat_tables(frames: List[pd.DataFrame], schema: TableSchema) -> pd.DataFrame:
+    """Concatenates typed dataframes of the same table without losing categoricals.
+
+    pd.concat turns categorical columns with different categories into plain objects,
+    so every categorical column is first given the sorted union of its categories.
+
+    Args:
+        frames (List[pd.DataFrame]): typed dataframes with the same columns
+        schema (TableSchema): the schema of the table
+
+    Returns:
+        pd.DataFrame: the concatenated typed dataframe
+    """
+    categorical = [
+        column
+        for column in frames[0].columns
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype)
+    ]
+    for column in categorical:
+        categories = union_categoricals(
+            [table_df[column] for table_df in frames],
+            sort_categories=True,
+            ignore_order=True,
+        ).categories
+        frames = [
+            table_df.assign(**{column: table_df[column].cat.set_categories(categories)})
+            for table_df in frames
+        ]
+
+    return share_categories(pd.concat(frames, ignore_index=True), schema)
+
+
+def memory_usage(table_df: pd.DataFrame) -> int:
+    """Returns the deep memory usage of table_df in bytes."""
+    return int(table_df.memory_usage(deep=True).sum())
@@ -0,0 +1,386 @@
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_cache import hash_file
+from src.dataset_schema import SCHEMAS, read_table_chunks
+
+STORE_DIR: str = "./input/delivery_store"
+DEFAULT_CHUNKSIZE: int = 50_000
+
+# bump whenever COLUMNS or the way they are derived change so stores are rebuilt
+STORE_VERSION: int = 2
+
+# every column of the store and its fixed width dtype
+COLUMNS: Dict[str, str] = {
+    "match_id": "int32",
+    "innings_id": "int8",
+    "team": "int8",
+    "over": "int8",
+    "ball": "int8",
+    "runs": "int8",
+    "batsman_id": "int32",
+    "bowler_id": "int32",
+    "is_boundary": "bool",
+    "is_wide": "bool",
+    "is_noball": "bool",
+    "is_wicket": "bool",
+    "is_bowler_wicket": "bool",
+}
+
+# columns of delivery_columns that only feed the player names of the store
+NAME_COLUMNS: Tuple[str, ...] = ("batsman_name", "bowler_name")
+
+
+def delivery_columns(details_df: pd.DataFrame) -> pd.DataFrame:
+    """Picks the store columns out of a typed details dataframe, with the batting team
+    still as a team code and the player names next to their ids."""
+    return pd.DataFrame(
+        {
+            "match_id": details_df["match_id"].to_numpy("int32"),
+            "innings_id": details_df["innings_id"].to_numpy("int8"),
+            "team": details_df["current_innings"].astype(object).to_numpy(),
+            "over": details_df["over"].to_numpy("int8"),
+            "ball": details_df["ball"].to_numpy("int8"),
+            "runs": details_df["runs"].to_numpy("int8"),
+            "batsman_id": details_df["batsman1_id"].to_numpy("int32"),
+            "bowler_id": details_df["bowler1_id"].to_numpy("int32"),
+            "is_boundary": details_df["isBoundary"].to_numpy("bool"),
+            "is_wide": details_df["isWide"].to_numpy("bool"),
+            "is_noball": details_df["isNoball"].to_numpy("bool"),
+            "is_wicket": details_df["wicket_id"].notna().to_numpy(),
+            # run outs are the only dismissals in details.csv not credited to the bowler
+            "is_bowler_wicket": (
+                details_df["wicket_id"].notna()
+                & ~details_df["wkt_text"]
+                .astype(object)
+                .str.contains("run out")
+                .eq(True)
+            ).to_numpy(),
+            "batsman_name": details_df["batsman1_name"],
+            "bowler_name": details_df["bowler1_name"],
+        }
+    )
+
+
+def add_players(players: Dict[int, str], part: pd.DataFrame) -> None:
+    """Adds the name of every batsman and bowler id of a delivery_columns chunk that is
+    not in players yet."""
+    for role in ["batsman", "bowler"]:
+        pairs = part[[f"{role}_id", f"{role}_name"]].drop_duplicates(f"{role}_id")
+        for player_id, name in pairs.itertuples(index=False):
+            players.setdefault(int(player_id), str(name))
+
+
+def remove_meta(store_dir: str) -> None:
+    """Invalidates the saved store in store_dir before its columns are overwritten."""
+    meta_path = os.path.join(store_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+
+def write_meta(
+    store_dir: str, key: str, teams: List[str], players: Dict[int, str], rows: int
+) -> None:
+    """Writes the key, teams and player names of a store to meta.json.
+
+    meta.json is written last, so a store is only valid once all columns are saved.
+    """
+    meta_path = os.path.join(store_dir, "meta.json")
+    temp_path = f"{meta_path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump({"key": key, "teams": teams, "players": players, "rows": rows}, file)
+    os.replace(temp_path, meta_path)
+
+
+class DeliveryStore:
+    """Ball by ball deliveries as a struct of fixed width NumPy arrays.
+
+    Only the dozen numeric and boolean columns the delivery queries need are kept,
+    one array per column, and the batting team is stored as an index into teams. A
+    saved store is loaded memory mapped, so opening it reads no data up front.
+
+    Attributes:
+        columns (Dict[str, np.ndarray]): one equally long array per name in COLUMNS
+        teams (List[str]): the team codes the team column indexes into, sorted
+        players (Dict[int, str]): the name of every batsman and bowler id
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        teams: List[str],
+        players: Optional[Dict[int, str]] = None,
+    ):
+        self.columns = columns
+        self.teams = teams
+        self.players = players if players is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.columns["match_id"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @classmethod
+    def from_frame(cls, details_df: pd.DataFrame) -> "DeliveryStore":
+        return cls.from_parts([delivery_columns(details_df)])
+
+    @classmethod
+    def from_parts(cls, parts: Iterable[pd.DataFrame]) -> "DeliveryStore":
+        """Builds an in memory store from the delivery_columns of one or more details
+        chunks. Use write to build a store larger than memory."""
+        frames, players = [], {}
+        for part in parts:
+            add_players(players, part)
+            frames.append(part.drop(columns=list(NAME_COLUMNS)))
+        deliveries = pd.concat(frames, ignore_index=True)
+        team_codes, teams = pd.factorize(deliveries["team"], sort=True)
+
+        columns = {
+            name: deliveries[name].to_numpy(dtype)
+            for name, dtype in COLUMNS.items()
+            if name != "team"
+        }
+        columns["team"] = team_codes.astype(COLUMNS["team"])
+        return cls({name: columns[name] for name in COLUMNS}, list(teams), players)
+
+    @staticmethod
+    def write(
+        parts: Iterable[pd.DataFrame],
+        store_dir: str,
+        key: str = "",
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> None:
+        """Saves a store built from the delivery_columns of details chunks, one chunk
+        at a time.
+
+        Every chunk is appended to a raw file per column as soon as it is read, so only
+        one chunk is in memory at once. The raw files are then copied into the .npy
+        files load memory maps, renumbering the teams in sorted order on the way.
+
+        Args:
+            parts (Iterable[pd.DataFrame]): delivery_columns of the details chunks
+            store_dir (str): folder to save the store to
+            key (str, optional): key to save the store with. Defaults to "".
+            chunksize (int, optional): deliveries copied at a time. Defaults to
+            DEFAULT_CHUNKSIZE.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        remove_meta(store_dir)
+        raw_paths = {name: os.path.join(store_dir, f"{name}.raw") for name in COLUMNS}
+        players: Dict[int, str] = {}
+        # team codes in the order they were first seen
+        teams: Dict[str, int] = {}
+        rows = 0
+
+        raw_files = {name: open(path, "wb") for name, path in raw_paths.items()}
+        try:
+            for part in parts:
+                add_players(players, part)
+                codes, part_teams = pd.factorize(part["team"])
+                # missing teams stay -1, as with pd.factorize
+                seen = [teams.setdefault(team, len(teams)) for team in part_teams]
+                part_codes = np.array(seen + [-1], dtype="int64")[codes]
+                for name, dtype in COLUMNS.items():
+                    values = part_codes if name == "team" else part[name]
+                    np.asarray(values, dtype=dtype).tofile(raw_files[name])
+                rows += len(part)
+        finally:
+            for file in raw_files.values():
+                file.close()
+
+        sorted_teams = sorted(teams)
+        renumber = np.full(len(teams) + 1, -1, dtype=COLUMNS["team"])
+        renumber[[teams[team] for team in sorted_teams]] = np.arange(len(teams))
+        for name, dtype in COLUMNS.items():
+            saved = np.lib.format.open_memmap(
+                os.path.join(store_dir, f"{name}.npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=(rows,),
+            )
+            itemsize = np.dtype(dtype).itemsize
+            for start in range(0, rows, chunksize):
+                values = np.fromfile(
+                    raw_paths[name],
+                    dtype=dtype,
+                    count=min(chunksize, rows - start),
+                    offset=start * itemsize,
+                )
+                saved[start : start + len(values)] = (
+                    renumber[values] if name == "team" else values
+                )
+            saved.flush()
+            del saved
+            os.remove(raw_paths[name])
+
+        write_meta(store_dir, key, sorted_teams, players, rows)
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        store_dir: str = STORE_DIR,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> "DeliveryStore":
+        """Returns the saved store of a details CSV, building and saving it first if the
+        CSV changed since it was saved.
+
+        Args:
+            path (str): path of the raw details CSV
+            store_dir (str, optional): folder of the saved store. Defaults to STORE_DIR.
+            chunksize (int, optional): deliveries read at a time when building the store.
+            Defaults to DEFAULT_CHUNKSIZE.
+
+        Returns:
+            DeliveryStore: the store, memory mapped from store_dir
+        """
+        key = hash_file(path, salt=f"deliveries:{STORE_VERSION}")
+        store = cls.load(store_dir, key)
+        if store is None:
+            cls.write(
+                (
+                    delivery_columns(chunk)
+                    for chunk in read_table_chunks(path, SCHEMAS["details"], chunksize)
+                ),
+                store_dir,
+                key,
+                chunksize,
+            )
+            store = cls.load(store_dir, key)
+        return store
+
+    def save(self, store_dir: str, key: str = "") -> None:
+        """Writes every column to its own .npy file and the key, teams and player names
+        to meta.json."""
+        os.makedirs(store_dir, exist_ok=True)
+        remove_meta(store_dir)
+        for name, values in self.columns.items():
+            np.save(os.path.join(store_dir, f"{name}.npy"), values)
+        write_meta(store_dir, key, self.teams, self.players, len(self))
+
+    @classmethod
+    def load(
+        cls, store_dir: str, key: Optional[str] = None
+    ) -> Optional["DeliveryStore"]:
+        """Memory maps a saved store, or returns None if there is none or its key differs.
+
+        Args:
+            store_dir (str): folder of the saved store
+            key (str, optional): the key the store must have been saved with. Defaults to
+            None, which accepts any key.
+
+        Returns:
+            Optional[DeliveryStore]: the memory mapped store
+        """
+        meta_path = os.path.join(store_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path) as file:
+                meta = json.load(file)
+            if key is not None and meta["key"] != key:
+                return None
+            columns = {
+                name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+                for name in COLUMNS
+            }
+        except Exception:
+            logging.error(
+                f"Could not read the delivery store in {store_dir}, rebuilding it"
+            )
+            return None
+
+        if any(len(values) != meta["rows"] for values in columns.values()):
+            logging.error(
+                f"The delivery store in {store_dir} is incomplete, rebuilding it"
+            )
+            return None
+        players = {int(player_id): name for player_id, name in meta["players"].items()}
+        return cls(columns, meta["teams"], players)
+
+    def mask(
+        self,
+        match_id: Optional[Union[int, Sequence[int]]] = None,
+        innings_id: Optional[int] = None,
+        overs: Optional[Tuple[int, int]] = None,
+        batsman_id: Optional[int] = None,
+        bowler_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """Returns a boolean array selecting the deliveries matching every given filter.
+
+        Args:
+            match_id (Union[int, Sequence[int]], optional): only this match, or these
+            matches. Defaults to None.
+            innings_id (int, optional): only this innings, 1 or 2. Defaults to None.
+            overs (Tuple[int, int], optional): only overs first to last, both included.
+            Defaults to None.
+            batsman_id (int, optional): only balls faced by this batsman. Defaults to None.
+            bowler_id (int, optional): only balls bowled by this bowler. Defaults to None.
+
+        Returns:
+            np.ndarray: True for every selected delivery
+        """
+        selected = np.ones(len(self), dtype=bool)
+        if match_id is not None:
+            selected &= np.isin(self.columns["match_id"], match_id)
+        for column, value in [
+            ("innings_id", innings_id),
+            ("batsman_id", batsman_id),
+            ("bowler_id", bowler_id),
+        ]:
+            if value is not None:
+                selected &= self.columns[column] == value
+        if overs is not None:
+            first, last = overs
+            selected &= (self.columns["over"] >= first) & (self.columns["over"] <= last)
+        return selected
+
+    def filter(self, **filters) -> "DeliveryStore":
+        """Returns a new in memory store of the deliveries selected by mask(**filters)."""
+        selected = self.mask(**filters)
+        return DeliveryStore(
+            {name: values[selected] for name, values in self.columns.items()},
+            self.teams,
+            self.players,
+        )
+
+    def sixes_per_over(self) -> pd.Series:
+        """Counts the deliveries that went for six in every over that had one."""
+        overs = self.columns["over"][self.columns["runs"] == 6]
+        over_values, counts = np.unique(overs, return_counts=True)
+        return pd.Series(
+            counts.astype("int64"),
+            index=pd.Index(over_values, name="over"),
+            name="sixes",
+        )
+
+    def run_counts(self) -> pd.DataFrame:
+        """Counts the deliveries per batting team and number of runs scored off them.
+
+        Returns:
+            pd.DataFrame: current_innings, runs and count, sorted by team then runs
+        """
+        keys, counts = np.unique(
+            np.stack(
+                [
+                    self.columns["team"].astype("int64"),
+                    self.columns["runs"].astype("int64"),
+                ]
+            ),
+            axis=1,
+            return_counts=True,
+        )
+        return pd.DataFrame(
+            {
+                "current_innings": np.asarray(self.teams, dtype=object)[keys[0]],
+                "runs": keys[1].astype(self.columns["runs"].dtype),
+                "count": counts.astype("int64"),
+            }
+        )
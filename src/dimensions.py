@@ -0,0 +1,272 @@
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# team codes used where a fixture's teams are not known yet
+UNKNOWN_TEAMS: tuple[str, ...] = ("TBA",)
+
+
+def build_player_dimension(
+    names: Iterable[pd.Series], cricinfo_ids: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """Gives every distinct player name a compact integer player_id.
+
+    Ids are assigned in sorted name order, so grouping on player_id gives the same
+    order as grouping on the name.
+
+    Args:
+        names (Iterable[pd.Series]): columns holding player names
+        cricinfo_ids (pd.DataFrame, optional): full_name and cricinfo_id pairs, e.g. the
+        batsman1_name and batsman1_id of details.csv. Defaults to None.
+
+    Returns:
+        pd.DataFrame: the full_name and cricinfo_id of every player, indexed by player_id
+    """
+    full_names = sorted(
+        set().union(*(set(column.dropna().astype(str)) for column in names))
+    )
+    players = pd.DataFrame(
+        {"full_name": full_names},
+        index=pd.RangeIndex(len(full_names), name="player_id"),
+    )
+
+    cricinfo_id = pd.Series(pd.NA, index=players.index, dtype="Int32")
+    if cricinfo_ids is not None and len(cricinfo_ids):
+        known = cricinfo_ids.dropna().drop_duplicates("full_name")
+        cricinfo_id = (
+            players["full_name"]
+            .map(known.set_index("full_name")["cricinfo_id"])
+            .astype("Int32")
+        )
+    return players.assign(cricinfo_id=cricinfo_id)
+
+
+def build_team_dimension(
+    codes: Iterable[pd.Series], summary_df: pd.DataFrame
+) -> pd.DataFrame:
+    """Gives every team code a compact integer team_id, in sorted code order.
+
+    Args:
+        codes (Iterable[pd.Series]): columns holding team codes like "PC"
+        summary_df (pd.DataFrame): the cleaned summary, used for the full team names
+
+    Returns:
+        pd.DataFrame: the code and full name of every team, indexed by team_id
+    """
+    team_codes = sorted(
+        set().union(*(set(column.dropna().astype(str)) for column in codes))
+        - set(UNKNOWN_TEAMS)
+    )
+    teams = pd.DataFrame(
+        {"code": team_codes}, index=pd.RangeIndex(len(team_codes), name="team_id")
+    )
+
+    # the match name is "<home team name> v <away team name>", though a few fixtures
+    # list the teams the other way round, so every code takes its most common name
+    match_names = summary_df["name"].astype(str).str.split(" v ", n=1, expand=True)
+    full_names = pd.concat(
+        [
+            pd.Series(
+                match_names[0].to_numpy(), index=summary_df["home_team"].astype(str)
+            ),
+            pd.Series(
+                match_names[1].to_numpy(), index=summary_df["away_team"].astype(str)
+            ),
+        ]
+    )
+    full_names = full_names.groupby(level=0).agg(lambda names: names.mode().iloc[0])
+    return teams.assign(name=teams["code"].map(full_names))
+
+
+def lookup_ids(values: pd.Series, dimension: pd.Series, dtype: str) -> pd.Series:
+    """Maps names or codes to the integer ids of a dimension, missing when unknown.
+
+    Categorical columns are mapped through their categories, so only one lookup per
+    distinct value is made.
+    """
+    ids = pd.Series(dimension.index, index=dimension.to_numpy())
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        category_ids = values.cat.categories.astype(str).map(ids)
+        codes = values.cat.codes.to_numpy()
+        mapped = np.where(
+            codes >= 0, np.asarray(category_ids, dtype="float64")[codes], np.nan
+        )
+        return pd.Series(mapped, index=values.index).astype(dtype)
+    return values.astype(object).map(ids).astype(dtype)
+
+
+def player_ids(names: pd.Series, players: pd.DataFrame) -> pd.Series:
+    """Maps player names to the player_id of the players dimension."""
+    return lookup_ids(names, players["full_name"], "Int32")
+
+
+def player_names(ids: pd.Series, players: pd.DataFrame) -> pd.Series:
+    """Attaches the full names to player ids, for presenting results."""
+    return pd.Series(
+        players["full_name"].reindex(ids.to_numpy()).to_numpy(),
+        index=ids.index,
+        name="full_name",
+    )
+
+
+def key_players(
+    table_df: pd.DataFrame, players: Optional[pd.DataFrame] = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Makes sure a card has a player_id column, keying it on the fly if needed.
+
+    Args:
+        table_df (pd.DataFrame): a batting or bowling card with a full_name column
+        players (pd.DataFrame, optional): the players dimension. Defaults to one built
+        from the names of table_df.
+
+    Returns:
+        Tuple[pd.DataFrame,pd.DataFrame]: the keyed card and the players dimension
+    """
+    if "player_id" in table_df.columns:
+        if players is None:
+            players = (
+                table_df[["player_id", "full_name"]]
+                .dropna()
+                .drop_duplicates("player_id")
+                .astype({"full_name": object})
+                .set_index("player_id")
+                .sort_index()
+            )
+        return table_df, players
+
+    if players is None:
+        players = build_player_dimension([table_df["full_name"]])
+    return (
+        table_df.assign(player_id=player_ids(table_df["full_name"], players)),
+        players,
+    )
+
+
+@dataclass(frozen=True)
+class Dimensions:
+    """The player and team dimension tables of a dataset.
+
+    Fact tables keyed with key_tables carry integer player_id and team_id columns next
+    to the names, so groupbys and joins run on integers and names are only attached
+    when presenting results.
+
+    Attributes:
+        players (pd.DataFrame): full_name and cricinfo_id, indexed by player_id
+        teams (pd.DataFrame): code and full name, indexed by team_id
+    """
+
+    players: pd.DataFrame
+    teams: pd.DataFrame
+
+    @classmethod
+    def build(
+        cls,
+        batting_df: pd.DataFrame,
+        bowling_df: pd.DataFrame,
+        details_df: pd.DataFrame,
+        summary_df: pd.DataFrame,
+    ) -> "Dimensions":
+        """Builds the dimensions from the cleaned tables.
+
+        Returns:
+            Dimensions: the player and team dimensions
+        """
+        cricinfo_ids = pd.concat(
+            [
+                details_df[[f"{role}_name", f"{role}_id"]].set_axis(
+                    ["full_name", "cricinfo_id"], axis=1
+                )
+                for role in ["batsman1", "bowler1", "batsman2"]
+            ]
+        ).astype({"full_name": object})
+        players = build_player_dimension(
+            [
+                batting_df["full_name"],
+                bowling_df["full_name"],
+                details_df["batsman1_name"],
+                details_df["bowler1_name"],
+                details_df["batsman2_name"],
+            ],
+            cricinfo_ids,
+        )
+        teams = build_team_dimension(
+            [
+                batting_df["current_innings"],
+                bowling_df["bowling_team"],
+                details_df["current_innings"],
+                summary_df["home_team"],
+                summary_df["away_team"],
+            ],
+            summary_df,
+        )
+        return cls(players=players, teams=teams)
+
+    def player_ids(self, names: pd.Series) -> pd.Series:
+        return player_ids(names, self.players)
+
+    def team_ids(self, codes: pd.Series) -> pd.Series:
+        return lookup_ids(codes, self.teams["code"], "Int8")
+
+    def player_names(self, ids: pd.Series) -> pd.Series:
+        return player_names(ids, self.players)
+
+    def key_table(self, table: str, table_df: pd.DataFrame) -> pd.DataFrame:
+        """Returns a copy of a cleaned table with its integer player and team keys added.
+
+        Args:
+            table (str): name of the table, e.g. "batting_card"
+            table_df (pd.DataFrame): the cleaned table
+
+        Returns:
+            pd.DataFrame: the keyed table
+        """
+        if table == "batting_card":
+            return table_df.assign(
+                player_id=self.player_ids(table_df["full_name"]),
+                team_id=self.team_ids(table_df["current_innings"]),
+            )
+        if table == "bowling_card":
+            return table_df.assign(
+                player_id=self.player_ids(table_df["full_name"]),
+                team_id=self.team_ids(table_df["bowling_team"]),
+            )
+        if table == "details":
+            return table_df.assign(
+                batsman_player_id=self.player_ids(table_df["batsman1_name"]),
+                bowler_player_id=self.player_ids(table_df["bowler1_name"]),
+                team_id=self.team_ids(table_df["current_innings"]),
+            )
+        if table == "summary":
+            return table_df.assign(
+                home_team_id=self.team_ids(table_df["home_team"]),
+                away_team_id=self.team_ids(table_df["away_team"]),
+                winner_id=self.team_ids(table_df["winner"]),
+            )
+        raise KeyError(f"Unknown table {table}")
+
+    def key_tables(
+        self,
+        batting_df: pd.DataFrame,
+        bowling_df: pd.DataFrame,
+        details_df: pd.DataFrame,
+        summary_df: pd.DataFrame,
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Returns copies of the cleaned tables with integer player and team keys added.
+
+        Returns:
+            Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]: the keyed tables
+        """
+        return (
+            self.key_table("batting_card", batting_df),
+            self.key_table("bowling_card", bowling_df),
+            self.key_table("details", details_df),
+            self.key_table("summary", summary_df),
+        )
+
+    def to_csv(self, folder: str) -> None:
+        """Writes the dimensions to players.csv and teams.csv in folder."""
+        self.players.to_csv(os.path.join(folder, "players.csv"))
+        self.teams.to_csv(os.path.join(folder, "teams.csv"))
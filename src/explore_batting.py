@@ -1,7 +1,18 @@
-from typing import Dict
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 
+from src.dimensions import key_players, player_ids, player_names
+from src.instrumentation import instrumented
+
+# batting_df columns averaged per venue side, and the suffix they are reported under
+HOME_AWAY_COLUMNS: Dict[str, str] = {
+    "runs": "runs_scored",
+    "balls_faced": "balls_faced",
+    "strike_rate": "strike_rate",
+}
+
 
 def compare_batsman_performances(
     batting_df: pd.DataFrame, batsman_name: str
@@ -51,41 +62,74 @@ def compare_batsman_performances(
     return results
 
 
+@instrumented
 class BattingData:
-    def __init__(self, batting_df: pd.DataFrame):
-        self.batting_df = batting_df
-
-    def get_all_performances(self):
-        grouped = self.batting_df.groupby("full_name").agg(
-            {
-                "current_innings": lambda x: x.tail(1).iloc[0],
-                "not_out": "sum",
-                "runs": "sum",
-                "balls_faced": "sum",
-                "fours": "sum",
-                "sixes": "sum",
-                "strike_rate": "mean",
-            }
-        )
+    def __init__(
+        self,
+        batting_df: pd.DataFrame,
+        players: Optional[pd.DataFrame] = None,
+        totals: Optional[pd.DataFrame] = None,
+    ):
+        # batsmen are grouped on their integer player_id, names are attached at the end
+        self.batting_df, self.players = key_players(batting_df, players)
+        # the running batting_totals of a match store, see match_store.batting_totals
+        self.totals = totals
+        self._home_away_performances: Optional[pd.DataFrame] = None
+
+    def get_all_performances(self) -> pd.DataFrame:
+        """Returns the totals of every batsman over all their innings, most runs first.
+
+        All totals come from a single grouped pass, or from the running totals of the
+        match store when the explorer has them, so only the latest team of every
+        batsman is looked up in batting_df; the averages and percentages are then
+        derived from those totals column by column.
 
-        # Calculate the batting average
-        grouped = grouped.assign(batting_average=grouped["runs"] / grouped["not_out"])
+        Returns:
+            pd.DataFrame: one row per batsman
+        """
+        if self.totals is None:
+            grouped = self.batting_df.groupby("player_id").agg(
+                team=("current_innings", "last"),
+                total_out=("not_out", "sum"),
+                total_runs=("runs", "sum"),
+                total_balls=("balls_faced", "sum"),
+                total_fours=("fours", "sum"),
+                total_sixes=("sixes", "sum"),
+                avg_strike_rate=("strike_rate", "mean"),
+                total_innings=("runs", "size"),
+            )
+        else:
+            team = self.batting_df.groupby("player_id")["current_innings"].last()
+            totals = self.totals.set_axis(
+                player_ids(self.totals.index.to_series(), self.players)
+            ).reindex(team.index)
+            grouped = pd.DataFrame(
+                {
+                    "team": team,
+                    "total_out": totals["not_out"],
+                    "total_runs": totals["runs"],
+                    "total_balls": totals["balls_faced"],
+                    "total_fours": totals["fours"],
+                    "total_sixes": totals["sixes"],
+                    "avg_strike_rate": totals["strike_rate"]
+                    / totals["rated_innings"].where(totals["rated_innings"] != 0),
+                    "total_innings": totals["innings"],
+                }
+            )
 
-        # Calculate boundary percentage for each player
-        boundary_percentage = self.batting_df.groupby("full_name").apply(
-            lambda x: ((x["fours"].sum() * 4) + (x["sixes"].sum() * 6))
-            / x["runs"].sum()
-            * 100
+        grouped = grouped.assign(
+            # plain strings, like the team column of the other performance tables
+            team=grouped["team"].astype(object),
+            batting_average=grouped["total_runs"] / grouped["total_out"],
+            boundary_percentage=(
+                grouped["total_fours"] * 4 + grouped["total_sixes"] * 6
+            )
+            / grouped["total_runs"]
+            * 100,
         )
 
-        # Add boundary percentage to the grouped DataFrame
-        grouped["boundary_percentage"] = boundary_percentage.values
-
-        total_innings = self.batting_df.groupby("full_name").size()
-        grouped["total_innings"] = total_innings
-
-        # Rename the columns
-        grouped.columns = [
+        columns = [
+            "full_name",
             "team",
             "total_out",
             "total_runs",
@@ -97,58 +141,97 @@ class BattingData:
             "boundary_percentage",
             "total_innings",
         ]
+        return (
+            grouped.assign(
+                full_name=player_names(grouped.index.to_series(), self.players)
+            )[columns]
+            .reset_index(drop=True)
+            .sort_values(by="total_runs", ascending=False, kind="mergesort")
+        )
 
-        # Reset the index
-        return grouped.reset_index().sort_values(by="total_runs", ascending=False)
-
-    def best_batsman_per_game(self) -> pd.DataFrame:
-        # create a new dataframe to store the best batsman in each game
-        best_batsman_df = pd.DataFrame(columns=["match_id", "full_name", "runs"])
+    def best_batsman_per_game(self, top_k: int = 1) -> pd.DataFrame:
+        """Returns the best batsman (or top_k batsmen) for each game.
 
-        # loop through each game in the data
-        for match_id in self.batting_df["match_id"].unique():
-            # subset the data to only include the current game
-            game_data = self.batting_df[self.batting_df["match_id"] == match_id]
+        Batsmen are ranked within a match by their average runs, ties are broken
+        alphabetically on full_name, and matches keep the order in which they first
+        appear in batting_df.
 
-            # calculate the batting average for each batsman in the game
-            batting_averages = game_data.groupby("full_name")["runs"].mean()
+        Args:
+            top_k (int, optional): number of batsmen to return per match. Defaults to 1.
 
-            # get the batsman with the highest batting average
-            best_batsman = batting_averages.idxmax()
+        Returns:
+            pd.DataFrame: A dataframe containing the match_id, full name of the batsman
+            and the runs they scored, with top_k rows per match.
 
-            # get the score of the best batsman
-            score = game_data.loc[game_data["full_name"] == best_batsman, "runs"].sum()
+        Raises:
+            ValueError: if top_k is less than 1
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        per_batsman = (
+            self.batting_df.groupby(["match_id", "player_id"], sort=False)["runs"]
+            .agg(["mean", "sum"])
+            .reset_index()
+        )
+        per_batsman["match_order"] = pd.factorize(per_batsman["match_id"])[0]
+
+        # rank every batsman in every game in one sort, then keep the leaders; player
+        # ids follow the alphabetical order of the names
+        ranked = per_batsman.sort_values(
+            by=["match_order", "mean", "player_id"],
+            ascending=[True, False, True],
+            kind="mergesort",
+        )
+        best_batsman_df = ranked.groupby("match_order", sort=False).head(top_k)
 
-            # add the best batsman and their score to the new dataframe
-            new_row = {"match_id": match_id, "full_name": best_batsman, "runs": score}
-            best_batsman_df = pd.concat(
-                [best_batsman_df, pd.DataFrame(new_row, index=[0])], ignore_index=True
-            )
-        return best_batsman_df
+        best_batsman_df = best_batsman_df.assign(
+            full_name=player_names(best_batsman_df["player_id"], self.players)
+        )
+        return best_batsman_df.rename(columns={"sum": "runs"})[
+            ["match_id", "full_name", "runs"]
+        ].reset_index(drop=True)
 
     def compare_all_performances(self) -> pd.DataFrame:
         """
-        This function takes a pandas dataframe containing batting statistics for a cricket tournament, loops over every
-        unique batsman in the dataframe, and creates a new dataframe with the performances for every batsman.
-
-        Args:
-        - df: pandas dataframe containing batting statistics
+        This function takes a pandas dataframe containing batting statistics for a cricket tournament, groups it by
+        batsman and venue side in a single pass, and creates a new dataframe with the performances for every batsman.
+        The result is cached on the instance, so repeated calls return the same dataframe without recomputing it.
 
         Returns:
         - A pandas dataframe containing the average runs scored, balls faced and batting strike rate for
         every batsman in the input dataframe, at home and away matches.
         """
+        if self._home_away_performances is not None:
+            return self._home_away_performances
+
+        batting_df = self.batting_df
+        is_home = batting_df["home_team"] == batting_df["current_innings"]
+        is_away = batting_df["away_team"] == batting_df["current_innings"]
+        side = np.select([is_home, is_away], ["home", "away"], default="")
+
+        averages = (
+            batting_df.assign(side=side)
+            .loc[is_home | is_away]
+            .groupby(["player_id", "side"])[list(HOME_AWAY_COLUMNS)]
+            .mean()
+            .unstack("side")
+        )
 
-        batsman_names = self.batting_df["full_name"].unique()
-
-        results_list = []
-
-        for batsman_name in batsman_names:
-            batsman_results = compare_batsman_performances(
-                self.batting_df, batsman_name
+        # make sure both sides exist even if nobody batted at home or away
+        results_df = averages.reindex(
+            columns=pd.MultiIndex.from_product(
+                [list(HOME_AWAY_COLUMNS), ["home", "away"]]
             )
-            results_list.append(batsman_results)
-
-        results_df = pd.DataFrame(results_list)
+        )
+        results_df.columns = [
+            f"{side_name}_{HOME_AWAY_COLUMNS[column]}"
+            for column, side_name in results_df.columns
+        ]
+        player_order = batting_df["player_id"].dropna().unique()
+        results_df = results_df.reindex(player_order)
+        results_df.index = pd.Index(
+            player_names(pd.Series(player_order), self.players), name="batsman_name"
+        )
 
-        return results_df
+        self._home_away_performances = results_df.reset_index()
+        return self._home_away_performances
@@ -1,7 +1,90 @@
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+from src.dimensions import key_players, player_ids, player_names
+from src.instrumentation import instrumented
+
+# (column, ascending) pairs used to pick the best bowler in a game
+BEST_BOWLER_RANKING: List[Tuple[str, bool]] = [
+    ("wickets", False),
+    ("conceded", True),
+    ("economy_rate", True),
+]
+
+# bowling_df columns averaged per venue side, and the suffix they are reported under
+HOME_AWAY_COLUMNS: Dict[str, str] = {
+    "conceded": "runs_conceded",
+    "wickets": "wickets_taken",
+    "economy_rate": "economy_rate",
+}
+
+
+def overs_to_balls(overs: pd.Series) -> pd.Series:
+    """
+    This function converts cricket overs notation, where 3.4 means 3 overs and 4 balls, to a number of balls
+    for every row at once.
+
+    Args:
+    - overs: pandas series of overs bowled
+
+    Returns:
+    - A pandas series with the number of balls bowled for every row.
+    """
+    completed_overs = np.floor(overs)
+    balls = completed_overs * 6 + ((overs - completed_overs) * 10).round()
+    return balls.astype("int64")
+
+
+def summarise_home_away(
+    bowling_df: pd.DataFrame, players: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    This function takes a pandas dataframe containing bowling statistics for a cricket tournament and summarises
+    every bowler's performance at home versus away matches in a single grouped pass.
+
+    Args:
+    - bowling_df: pandas dataframe containing bowling statistics
+    - players: the players dimension, bowlers are grouped on their player_id
+
+    Returns:
+    - A pandas dataframe indexed by bowler name, containing the average runs conceded, wickets taken, economy rate,
+    and bowling strike rate for every bowler at home and away matches, in order of first appearance.
+    """
+    bowling_df, players = key_players(bowling_df, players)
+    is_home = bowling_df["home_team"] == bowling_df["bowling_team"]
+    is_away = bowling_df["away_team"] == bowling_df["bowling_team"]
+    side = np.select([is_home, is_away], ["home", "away"], default="")
+
+    grouped = (
+        bowling_df.assign(side=side)
+        .loc[is_home | is_away]
+        .groupby(["player_id", "side"])
+    )
+    averages = grouped[list(HOME_AWAY_COLUMNS)].mean()
+
+    # strike rate is NaN wherever no wickets were taken on that side
+    averages["strike_rate"] = grouped["overs"].sum() / averages["wickets"].where(
+        averages["wickets"] != 0
+    )
+
+    # make sure both sides exist even if nobody bowled at home or away
+    results_df = averages.unstack("side").reindex(
+        columns=pd.MultiIndex.from_product(
+            [list(HOME_AWAY_COLUMNS) + ["strike_rate"], ["home", "away"]]
+        )
+    )
+    results_df.columns = [
+        f"{side_name}_{HOME_AWAY_COLUMNS.get(column, column)}"
+        for column, side_name in results_df.columns
+    ]
+    player_order = bowling_df["player_id"].dropna().unique()
+    results_df = results_df.reindex(player_order)
+    results_df.index = pd.Index(
+        player_names(pd.Series(player_order), players), name="bowler_name"
+    )
+    return results_df
+
 
 def compare_bowler_performances(
     bowling_df: pd.DataFrame, bowler_name: str
@@ -18,66 +101,64 @@ def compare_bowler_performances(
     - A dictionary containing the average runs conceded, wickets taken, economy rate, and bowling strike rate for the bowler
     at home and away matches.
     """
-
-    # Filter the dataframe to include only the specified bowler's data
     bowler_df = bowling_df[bowling_df["full_name"] == bowler_name]
+    results = summarise_home_away(bowler_df).reindex([bowler_name]).iloc[0]
 
-    # Split the data into home and away matches
-    bowler_team = bowler_df["bowling_team"]
-    home_df = bowler_df[bowler_df["home_team"] == bowler_team]
-    away_df = bowler_df[bowler_df["away_team"] == bowler_team]
-
-    # Calculate the average runs conceded, wickets taken, economy rate, and bowling strike rate for home and away matches
-    home_runs = home_df["conceded"].mean()
-    away_runs = away_df["conceded"].mean()
-
-    home_wickets = home_df["wickets"].mean()
-    away_wickets = away_df["wickets"].mean()
-
-    home_economy = home_df["economy_rate"].mean()
-    away_economy = away_df["economy_rate"].mean()
-
-    if home_wickets != 0:
-        home_strike_rate = home_df["overs"].sum() / home_wickets
-    else:
-        home_strike_rate = np.nan
-
-    if away_wickets != 0:
-        away_strike_rate = away_df["overs"].sum() / away_wickets
-    else:
-        away_strike_rate = np.nan
-
-    # Create a dictionary to store the results
-    results = {
-        "bowler_name": bowler_name,
-        "home_runs_conceded": home_runs,
-        "away_runs_conceded": away_runs,
-        "home_wickets_taken": home_wickets,
-        "away_wickets_taken": away_wickets,
-        "home_economy_rate": home_economy,
-        "away_economy_rate": away_economy,
-        "home_strike_rate": home_strike_rate,
-        "away_strike_rate": away_strike_rate,
-    }
-
-    return results
+    return {"bowler_name": bowler_name, **results.to_dict()}
 
 
+@instrumented
 class BowlingData:
-    def __init__(self, bowling_df: pd.DataFrame):
-        self.bowling_df = bowling_df
-
-    def best_bowler_per_game(self) -> pd.DataFrame:
+    def __init__(
+        self,
+        bowling_df: pd.DataFrame,
+        players: Optional[pd.DataFrame] = None,
+        totals: Optional[pd.DataFrame] = None,
+    ):
+        # bowlers are grouped on their integer player_id, names are attached at the end
+        self.bowling_df, self.players = key_players(bowling_df, players)
+        # the running bowling_totals of a match store, see match_store.bowling_totals
+        self.totals = totals
+        self._home_away_performances: Optional[pd.DataFrame] = None
+
+    def best_bowler_per_game(
+        self, ranking: Optional[List[Tuple[str, bool]]] = None
+    ) -> pd.DataFrame:
         """Returns the best bowler for each game along with their bowling statistics.
 
+        Bowlers are ranked lexicographically on the ranking keys, by default most
+        wickets, then fewest runs conceded, then lowest economy rate. Any remaining
+        tie goes to the bowler listed first in bowling_df.
+
+        Args:
+            ranking (List[Tuple[str, bool]], optional): (column, ascending) pairs to rank
+            the bowlers in a game by. Defaults to BEST_BOWLER_RANKING.
+
         Returns:
             pd.DataFrame: A dataframe containing the match_id, full name of the bowler,
             overs bowled, maidens bowled, runs conceded, wickets taken, and economy rate for
             the best bowler in each game.
         """
-        # create a new dataframe to store the best bowler in each game
-        best_bowler_df = pd.DataFrame(
-            columns=[
+        if ranking is None:
+            ranking = BEST_BOWLER_RANKING
+
+        columns = [column for column, _ in ranking]
+        ascending = [ascending for _, ascending in ranking]
+
+        # a single stable sort ranks every bowler in every game at once
+        ranked = self.bowling_df.sort_values(
+            by=["match_id"] + columns,
+            ascending=[True] + ascending,
+            kind="mergesort",
+        )
+        best_bowler_df = ranked.drop_duplicates(subset="match_id", keep="first")
+        # plain strings, not a categorical carrying every bowler of the card
+        best_bowler_df = best_bowler_df.assign(
+            full_name=best_bowler_df["full_name"].astype(object)
+        )
+
+        return best_bowler_df[
+            [
                 "match_id",
                 "full_name",
                 "overs",
@@ -86,157 +167,131 @@ class BowlingData:
                 "wickets",
                 "economy_rate",
             ]
-        ).reset_index(drop=True)
-
-        # loop through each game in the data
-        for match_id, game_data in self.bowling_df.groupby("match_id"):
-            # find the row with the maximum wickets
-            max_wickets_row = game_data.loc[game_data["wickets"].idxmax()]
-            # if there are multiple rows with the maximum wickets, find the one with the lowest conceded
-            if (game_data["wickets"] == max_wickets_row["wickets"]).sum() > 1:
-                min_conceded_row = game_data.loc[game_data["conceded"].idxmin()]
-                # if there are still multiple rows, find the one with the smallest economy rate
-                if (game_data["conceded"] == min_conceded_row["conceded"]).sum() > 1:
-                    best_bowler_row = game_data.loc[game_data["economy_rate"].idxmin()]
-                else:
-                    best_bowler_row = min_conceded_row
-            else:
-                best_bowler_row = max_wickets_row
-
-            # add the best bowler row to the new dataframe
-            best_bowler_df = pd.concat(
-                [
-                    best_bowler_df,
-                    best_bowler_row.loc[
-                        [
-                            "match_id",
-                            "full_name",
-                            "overs",
-                            "maidens",
-                            "conceded",
-                            "wickets",
-                            "economy_rate",
-                        ]
-                    ]
-                    .to_frame()
-                    .T,
-                ],
-                ignore_index=True,
-            )
+        ].reset_index(drop=True)
 
-        return best_bowler_df
+    def calculate_balls(self, bowling_df: pd.DataFrame) -> int:
+        """Returns the number of balls in the overs column of bowling_df.
 
-    def calculate_balls(self, bowling_df):
-        overs = int(bowling_df["overs"].sum())
-        # sum the decimal parts of overs
-        balls_decimal = (bowling_df["overs"].sum() - overs).sum()
-        balls_bowled = overs * 6 + int(round(balls_decimal * 10))
-        return balls_bowled
+        Every row is converted to balls before adding them up, so partial overs like
+        3.4 and 2.4 add up to 6 overs and 2 balls rather than 5.8 overs.
+        """
+        return int(overs_to_balls(bowling_df["overs"]).sum())
 
     def get_all_performances(self) -> pd.DataFrame:
         """
         Calculates and returns the tournament statistics for the bowlers.
 
+        All totals come from a single grouped pass over bowling_df with the overs of every
+        spell converted to balls first, or from the running totals of the match store
+        when the explorer has them, so only the latest team of every bowler is looked
+        up in bowling_df; the averages and rates are then derived from the exact ball
+        counts column by column.
+
         Returns:
             DataFrame: A pandas DataFrame containing the following columns:
                 - full_name (str): The name of the bowler.
-                - total_overs (float): The total number of overs bowled by the bowler.
+                - team (str): The team the bowler last played for.
+                - total_overs (float): The total number of overs bowled by the bowler, in overs notation.
                 - total_wickets (int): The total number of wickets taken by the bowler.
                 - total_maidens (int): The total number of maidens bowled by the bowler.
                 - total_conceded (int): The total number of runs conceded by the bowler.
-                - avg_economy_rate (float): The average economy rate of the bowler.
+                - avg_economy_rate (float): The average economy rate of the bowler's spells.
                 - dot_balls (int): The total number of dot balls bowled by the bowler.
                 - fours_conceded (int): The total number of fours conceded by the bowler.
                 - sixes_conceded (int): The total number of sixes conceded by the bowler.
                 - wides_bowled (int): The total number of wides bowled by the bowler.
                 - no_balls_bowled (int): The total number of no-balls bowled by the bowler.
+                - average (float): Runs conceded per wicket, NaN without wickets.
+                - balls_bowled (int): The total number of balls bowled by the bowler.
+                - strike_rate (float): Balls bowled per wicket, NaN without wickets.
+                - economy_rate (float): Runs conceded per six balls over all spells,
+                NaN without legal balls.
         """
-        # Group by full_name and sum the desired columns
-        grouped = self.bowling_df.groupby("full_name").agg(
-            {
-                "bowling_team": lambda x: x.tail(1).iloc[0],
-                "overs": "sum",
-                "wickets": "sum",
-                "maidens": "sum",
-                "conceded": "sum",
-                "economy_rate": "mean",
-                "dots": "sum",
-                "fours_conceded": "sum",
-                "sixes_conceded": "sum",
-                "wides": "sum",
-                "noballs": "sum",
-            }
-        )
-        # Rename the columns
-        grouped.columns = [
-            "team",
-            "total_overs",
-            "total_wickets",
-            "total_maidens",
-            "total_conceded",
-            "avg_economy_rate",
-            "dot_balls",
-            "fours_conceded",
-            "sixes_conceded",
-            "wides_bowled",
-            "no_balls_bowled",
-        ]
-
-        average = self.bowling_df.groupby("full_name").apply(
-            lambda x: (x["conceded"].sum() / x["wickets"].sum())
-            if x["wickets"].sum() != 0
-            else np.NaN
-        )
-
-        grouped["average"] = average.values
-
-        # Calculate bowling average for each player
-        average = self.bowling_df.groupby("full_name").apply(
-            lambda x: x["conceded"].sum() / x["wickets"].sum()
-            if x["wickets"].sum() != 0
-            else np.NaN
-        )
-
-        # Add bowling average to the grouped DataFrame
-        grouped["average"] = average.values
-
-        # apply the function to the "overs" column and create a new column "balls_bowled"
-        balls_bowled = self.bowling_df.groupby("full_name").apply(self.calculate_balls)
-        grouped["balls_bowled"] = balls_bowled.values
+        if self.totals is None:
+            grouped = (
+                self.bowling_df.assign(balls=overs_to_balls(self.bowling_df["overs"]))
+                .groupby("player_id")
+                .agg(
+                    team=("bowling_team", "last"),
+                    balls_bowled=("balls", "sum"),
+                    total_wickets=("wickets", "sum"),
+                    total_maidens=("maidens", "sum"),
+                    total_conceded=("conceded", "sum"),
+                    avg_economy_rate=("economy_rate", "mean"),
+                    dot_balls=("dots", "sum"),
+                    fours_conceded=("fours_conceded", "sum"),
+                    sixes_conceded=("sixes_conceded", "sum"),
+                    wides_bowled=("wides", "sum"),
+                    no_balls_bowled=("noballs", "sum"),
+                )
+            )
+        else:
+            team = self.bowling_df.groupby("player_id")["bowling_team"].last()
+            totals = self.totals.set_axis(
+                player_ids(self.totals.index.to_series(), self.players)
+            ).reindex(team.index)
+            grouped = pd.DataFrame(
+                {
+                    "team": team,
+                    "balls_bowled": totals["balls"],
+                    "total_wickets": totals["wickets"],
+                    "total_maidens": totals["maidens"],
+                    "total_conceded": totals["conceded"],
+                    "avg_economy_rate": totals["economy_rate"]
+                    / totals["rated_spells"].where(totals["rated_spells"] != 0),
+                    "dot_balls": totals["dots"],
+                    "fours_conceded": totals["fours_conceded"],
+                    "sixes_conceded": totals["sixes_conceded"],
+                    "wides_bowled": totals["wides"],
+                    "no_balls_bowled": totals["noballs"],
+                }
+            )
 
-        # calculate total number of wickets taken by each player
-        wickets_taken = (
-            self.bowling_df["wickets"].groupby(self.bowling_df["full_name"]).sum()
+        wickets = grouped["total_wickets"].where(grouped["total_wickets"] != 0)
+        balls = grouped["balls_bowled"].where(grouped["balls_bowled"] != 0)
+        grouped = grouped.assign(
+            full_name=player_names(grouped.index.to_series(), self.players),
+            team=grouped["team"].astype(object),
+            total_overs=grouped["balls_bowled"] // 6 + grouped["balls_bowled"] % 6 / 10,
+            average=grouped["total_conceded"] / wickets,
+            strike_rate=grouped["balls_bowled"] / wickets,
+            economy_rate=grouped["total_conceded"] / balls * 6,
         )
 
-        # calculate strike rate for each player
-        strike_rate = (balls_bowled / wickets_taken).replace(np.inf, np.nan)
-
-        grouped["strike_rate"] = strike_rate.values
-
-        # Reset the index
-        return grouped.reset_index()
+        return grouped[
+            [
+                "full_name",
+                "team",
+                "total_overs",
+                "total_wickets",
+                "total_maidens",
+                "total_conceded",
+                "avg_economy_rate",
+                "dot_balls",
+                "fours_conceded",
+                "sixes_conceded",
+                "wides_bowled",
+                "no_balls_bowled",
+                "average",
+                "balls_bowled",
+                "strike_rate",
+                "economy_rate",
+            ]
+        ].reset_index(drop=True)
 
     def compare_all_performances(self) -> pd.DataFrame:
         """
-        This function takes a pandas dataframe containing bowling statistics for a cricket tournament, loops over every
-        unique bowler in the dataframe, and creates a new dataframe with the performances for every bowler.
-
-        Args:
-        - df: pandas dataframe containing bowling statistics
+        This function takes a pandas dataframe containing bowling statistics for a cricket tournament, groups it by
+        bowler and venue side in a single pass, and creates a new dataframe with the performances for every bowler.
+        The result is cached on the instance, so repeated calls return the same dataframe without recomputing it.
 
         Returns:
         - A pandas dataframe containing the average runs conceded, wickets taken, economy rate, and bowling strike rate for
         every bowler in the input dataframe, at home and away matches.
         """
+        if self._home_away_performances is None:
+            self._home_away_performances = summarise_home_away(
+                self.bowling_df, self.players
+            ).reset_index()
 
-        bowler_names = self.bowling_df["full_name"].unique()
-
-        results_list = []
-
-        for bowler_name in bowler_names:
-            bowler_results = compare_bowler_performances(self.bowling_df, bowler_name)
-            results_list.append(bowler_results)
-
-        results_df = pd.DataFrame(results_list)
-        return results_df
+        return self._home_away_performances
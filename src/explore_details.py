@@ -1,42 +1,216 @@
+from typing import Optional
+
 import pandas as pd
 
+from src.dataset_schema import SCHEMAS, read_table_chunks
+from src.delivery_store import DEFAULT_CHUNKSIZE, STORE_DIR, DeliveryStore
+from src.instrumentation import instrumented
+from src.matchups import MATCHUP_PATH, MatchupMatrix
+from src.process_dataset import RAW_INPUT_DIR
+
+DETAILS_CSV: str = f"{RAW_INPUT_DIR}/details.csv"
+
+# per delivery counters summed for every bowler and batsman
+PLAYER_COUNTERS: list[str] = ["deliveries", "runs", "dots", "fours", "sixes"]
+
+
+def add_counts(total: Optional[pd.DataFrame], counts: pd.DataFrame) -> pd.DataFrame:
+    """Adds two count tables together, aligning on their index."""
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0).astype("int64")
+
+
+class DeliveryAggregates:
+    """Running, mergeable per player counts over ball by ball deliveries.
+
+    Every table only grows with the number of distinct players, never with the number
+    of deliveries, so folding a details file into it chunk by chunk uses bounded
+    memory. Players are counted under the integer batsman1_id and bowler1_id of
+    details.csv; player_names maps those ids to names for presentation.
+    """
+
+    def __init__(self):
+        self.by_bowler: Optional[pd.DataFrame] = None
+        self.by_batsman: Optional[pd.DataFrame] = None
+        self.player_names: Optional[pd.Series] = None
+
+    @classmethod
+    def from_frame(cls, details_df: pd.DataFrame) -> "DeliveryAggregates":
+        aggregates = cls()
+        aggregates.update(details_df)
+        return aggregates
+
+    def update(self, details_df: pd.DataFrame) -> None:
+        """Folds a chunk of deliveries into the running counts.
+
+        Args:
+            details_df (pd.DataFrame): a chunk of the details dataframe
+        """
+        deliveries = pd.DataFrame(
+            {
+                "bowler": details_df["bowler1_id"],
+                "batsman": details_df["batsman1_id"],
+                "deliveries": 1,
+                "runs": details_df["runs"].astype("int64"),
+                "dots": details_df["runs"].eq(0).astype("int64"),
+                "fours": details_df["runs"].eq(4).astype("int64"),
+                "sixes": details_df["runs"].eq(6).astype("int64"),
+            }
+        )
+
+        self.merge_counts(
+            by_bowler=deliveries.groupby("bowler")[PLAYER_COUNTERS].sum(),
+            by_batsman=deliveries.groupby("batsman")[PLAYER_COUNTERS].sum(),
+        )
+        self.merge_names(
+            pd.concat(
+                [
+                    pd.Series(
+                        details_df[f"{role}_name"].astype(object).to_numpy(),
+                        index=details_df[f"{role}_id"].to_numpy(),
+                    )
+                    for role in ["bowler1", "batsman1"]
+                ]
+            )
+        )
+
+    def merge(self, other: "DeliveryAggregates") -> None:
+        """Adds the counts of other, e.g. aggregates built from another file, to these."""
+        self.merge_counts(
+            by_bowler=other.by_bowler,
+            by_batsman=other.by_batsman,
+        )
+        if other.player_names is not None:
+            self.merge_names(other.player_names)
+
+    def merge_names(self, names: pd.Series) -> None:
+        names = names[~names.index.duplicated()]
+        if self.player_names is not None:
+            names = self.player_names.combine_first(names)
+        self.player_names = names
 
+    def merge_counts(self, **counts: Optional[pd.DataFrame]) -> None:
+        for name, table in counts.items():
+            if table is not None:
+                setattr(self, name, add_counts(getattr(self, name), table))
+
+
+@instrumented
 class DetailsData:
-    def __init__(self, details_df: pd.DataFrame):
+    def __init__(
+        self,
+        details_df: Optional[pd.DataFrame] = None,
+        aggregates: Optional[DeliveryAggregates] = None,
+        store: Optional[DeliveryStore] = None,
+        matchups: Optional[MatchupMatrix] = None,
+    ):
         self.details_df = details_df
+        self._aggregates = aggregates
+        self._store = store
+        self._matchups = matchups
 
-    def all_density_of_runs(self) -> pd.DataFrame:
-        count_df = (
-            self.details_df.groupby(["current_innings", "runs"])
-            .size()
-            .reset_index(name="count")
-        )
-        return count_df
+    @classmethod
+    def from_csv(
+        cls,
+        path: str = DETAILS_CSV,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        store_dir: str = STORE_DIR,
+        matrix_path: str = MATCHUP_PATH,
+    ) -> "DetailsData":
+        """Streams details.csv chunk by chunk into running aggregates and opens its saved
+        delivery store and matchups. A store that has to be built is also written chunk
+        by chunk, so the whole file never has to fit in memory. The results match those
+        of DetailsData(details_df).
 
-    def inning_density_of_runs(self) -> tuple[pd.DataFrame, pd.DataFrame]:
-        innings_1_df = self.details_df[self.details_df["innings_id"] == 1]
-        innings_2_df = self.details_df[self.details_df["innings_id"] == 2]
+        Args:
+            path (str, optional): path of the details CSV. Defaults to DETAILS_CSV.
+            chunksize (int, optional): deliveries per chunk. Defaults to DEFAULT_CHUNKSIZE.
+            store_dir (str, optional): folder of the saved delivery store. Defaults to
+            STORE_DIR.
+            matrix_path (str, optional): file of the saved matchups. Defaults to
+            MATCHUP_PATH.
 
-        innings_1_count_df = (
-            innings_1_df.groupby(["current_innings", "runs"])
-            .size()
-            .reset_index(name="count")
+        Returns:
+            DetailsData: details data backed only by the aggregates and the store
+        """
+        aggregates = DeliveryAggregates()
+        for chunk in read_table_chunks(path, SCHEMAS["details"], chunksize):
+            aggregates.update(chunk)
+        return cls(
+            aggregates=aggregates,
+            store=DeliveryStore.open(path, store_dir, chunksize),
+            matchups=MatchupMatrix.open(path, matrix_path, store_dir),
         )
-        innings_2_count_df = (
-            innings_2_df.groupby(["current_innings", "runs"])
-            .size()
-            .reset_index(name="count")
+
+    @property
+    def aggregates(self) -> DeliveryAggregates:
+        if self._aggregates is None:
+            if self.details_df is None:
+                raise ValueError("The player counts need details_df or aggregates")
+            self._aggregates = DeliveryAggregates.from_frame(self.details_df)
+        return self._aggregates
+
+    @property
+    def store(self) -> DeliveryStore:
+        if self._store is None:
+            if self.details_df is None:
+                raise ValueError("The delivery queries need details_df or a store")
+            self._store = DeliveryStore.from_frame(self.details_df)
+        return self._store
+
+    @property
+    def matchups(self) -> MatchupMatrix:
+        if self._matchups is None:
+            self._matchups = MatchupMatrix.build(self.store)
+        return self._matchups
+
+    def all_density_of_runs(self) -> pd.DataFrame:
+        return self.store.run_counts()
+
+    def inning_density_of_runs(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        innings_1_count_df, innings_2_count_df = (
+            self.store.filter(innings_id=innings_id).run_counts()
+            for innings_id in [1, 2]
         )
 
         return innings_1_count_df, innings_2_count_df
 
     def likelihood_of_six_per_over(self):
-        sixes: pd.DataFrame = self.details_df[self.details_df["runs"] == 6].copy()
-        sixes_by_over = sixes.groupby("over")["runs"].count()
-        total_sixes = sixes["runs"].count()
-        sixes_by_over_total = sixes.groupby("over")["runs"].sum()
+        sixes_by_over = self.store.sixes_per_over()
+        total_sixes = sixes_by_over.sum()
+        sixes_by_over_total = (sixes_by_over * 6).rename("runs")
         six_probs = {}
-        for over, sixes_at_over in sixes_by_over.iteritems():  # type: ignore
+        for over, sixes_at_over in sixes_by_over.items():
             six_prob = (sixes_at_over / total_sixes) * 100
             six_probs[over] = six_prob
         return six_probs, sixes_by_over_total
+
+    def bowler_deliveries(self) -> pd.DataFrame:
+        """Returns the deliveries, runs, dots, fours and sixes bowled by every bowler."""
+        return self._player_deliveries(self.aggregates.by_bowler, "bowler_name")
+
+    def batsman_deliveries(self) -> pd.DataFrame:
+        """Returns the deliveries, runs, dots, fours and sixes faced by every batsman."""
+        return self._player_deliveries(self.aggregates.by_batsman, "batsman_name")
+
+    def _player_deliveries(self, counts: pd.DataFrame, name: str) -> pd.DataFrame:
+        """Attaches the player names to counts keyed by player id, sorted by name."""
+        names = self.aggregates.player_names.reindex(counts.index).to_numpy()
+        return (
+            counts.set_axis(pd.Index(names, name=name))
+            .sort_index(kind="mergesort")
+            .reset_index()
+        )
+
+    def batsman_matchups(self, batsman_name: str) -> pd.DataFrame:
+        """Returns how a batsman fared against every bowler they faced."""
+        return self.matchups.batsman(self.matchups.player_id(batsman_name))
+
+    def bowler_matchups(self, bowler_name: str) -> pd.DataFrame:
+        """Returns how a bowler fared against every batsman they bowled to."""
+        return self.matchups.bowler(self.matchups.player_id(bowler_name))
+
+    def hardest_matchups(self, top_k: int = 10) -> pd.DataFrame:
+        """Returns the top_k batsman and bowler pairs hardest for the batsman."""
+        return self.matchups.hardest(top_k)
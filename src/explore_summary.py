@@ -1,10 +1,273 @@
-from typing import Dict
+from typing import Dict, Optional
+
+import numpy as np
 import pandas as pd
 
+from src.instrumentation import instrumented
+
+# e.g. "226/5", "113" (all out), "167/9 (20 ov, target 227)" or "53/3 (5.2/20 ov)"
+SCORE_PATTERN: str = (
+    r"^(?P<runs>\d+)(?:/(?P<wickets>\d+))?"
+    r"(?:\s*\((?P<overs>\d+(?:\.\d)?)(?:/(?P<max_overs>\d+))?\s*ov"
+    r"(?:,\s*target\s*(?P<target>\d+))?\))?"
+)
+
+
+def parse_scores(scores: pd.Series) -> pd.DataFrame:
+    """
+    This function parses score strings like "167/9 (20 ov, target 227)" into typed columns for every row at once.
+    A score without wickets means the side was all out.
+
+    Args:
+    - scores: pandas series of score strings, missing when the side did not bat
+
+    Returns:
+    - A pandas dataframe with the runs, wickets, overs (missing when the string has none) and target of every score.
+    """
+    parsed = scores.astype("string").str.extract(SCORE_PATTERN)
+    runs = pd.to_numeric(parsed["runs"]).astype("Int16")
+    wickets = pd.to_numeric(parsed["wickets"]).astype("Int16")
+    return pd.DataFrame(
+        {
+            "runs": runs,
+            "wickets": wickets.mask(runs.notna() & wickets.isna(), 10),
+            "overs": pd.to_numeric(parsed["overs"]).astype("float64"),
+            "target": pd.to_numeric(parsed["target"]).astype("Int16"),
+        },
+        index=scores.index,
+    )
+
+
+def parse_scorecards(summary_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function parses the home and away score strings of every match in a single vectorized pass and works out
+    which side batted first.
+
+    Args:
+    - summary_df: pandas dataframe of the cleaned summary.csv
+
+    Returns:
+    - A pandas dataframe indexed by match_id and sorted on it, with the home and away team, winner, the runs, wickets,
+    overs and target of both sides (home_runs, away_target, ...), and the team, runs and wickets of the first and
+    second innings (first_team, second_runs, ...). Sides that did not bat have missing values.
+    """
+    home = parse_scores(summary_df["home_score"]).add_prefix("home_")
+    away = parse_scores(summary_df["away_score"]).add_prefix("away_")
+
+    # the overs of a completed innings are only in the home_overs/away_overs columns
+    for side, parsed in [("home", home), ("away", away)]:
+        parsed[f"{side}_overs"] = parsed[f"{side}_overs"].fillna(
+            pd.to_numeric(summary_df[f"{side}_overs"], errors="coerce")
+        )
+
+    # the side chasing a target batted second; otherwise match the first innings score
+    home_core = summary_df["home_score"].astype("string").str.split(" ").str[0]
+    home_batted_first = (
+        away["away_target"].notna()
+        | (home_core == summary_df["1st_inning_score"].astype("string"))
+        | (home["home_runs"].notna() & away["away_runs"].isna())
+    ).fillna(False)
+
+    played = home["home_runs"].notna() | away["away_runs"].notna()
+    home_team = summary_df["home_team"].astype(object)
+    away_team = summary_df["away_team"].astype(object)
+    scorecards = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "match_id": summary_df["id"],
+                    "home_team": home_team,
+                    "away_team": away_team,
+                    "winner": summary_df["winner"].astype(object),
+                }
+            ),
+            home,
+            away,
+        ],
+        axis=1,
+    )
+    for innings, batted in [
+        ("first", home_batted_first),
+        ("second", ~home_batted_first),
+    ]:
+        scorecards[f"{innings}_team"] = home_team.where(batted, away_team).where(played)
+        for column in ["runs", "wickets"]:
+            scorecards[f"{innings}_{column}"] = home[f"home_{column}"].where(
+                batted, away[f"away_{column}"]
+            )
+
+    return scorecards.set_index("match_id").sort_index()
+
+
+def build_team_timeline(summary_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function lays out the fixtures of every team in date order, one row per team per match, in a single
+    vectorized pass over the summary.
+
+    Args:
+    - summary_df: pandas dataframe of the cleaned summary.csv
+
+    Returns:
+    - A pandas dataframe sorted by team and start_date with the columns:
+        - match_id, team, opponent, is_home and start_date (UTC) of the fixture
+        - rest_days: calendar days since the team's previous fixture, missing for its first
+        - outcome: "won", "lost", "no result" or "upcoming"
+        - streak: consecutive wins (positive) or losses (negative) up to and including the fixture, 0 otherwise
+        - fixtures_last_7_days: the team's fixtures in the 7 days up to and including this one
+    """
+    result = summary_df["result"].astype(str)
+    fixtures = pd.DataFrame(
+        {
+            "match_id": summary_df["id"],
+            "start_date": pd.to_datetime(
+                summary_df["start_date"], format="%Y-%m-%dT%H:%MZ", utc=True
+            ),
+            "winner": summary_df["winner"].astype(object),
+            "upcoming": result.str.startswith("Starts at"),
+            "no_result": result.str.contains("No result|abandoned"),
+        }
+    )
+    home_team = summary_df["home_team"].astype(object)
+    away_team = summary_df["away_team"].astype(object)
+    timeline = pd.concat(
+        [
+            fixtures.assign(team=home_team, opponent=away_team, is_home=True),
+            fixtures.assign(team=away_team, opponent=home_team, is_home=False),
+        ],
+        ignore_index=True,
+    )
+    # knockout fixtures are listed before their teams are known
+    timeline = timeline[timeline["team"] != "TBA"].sort_values(
+        ["team", "start_date"], kind="mergesort", ignore_index=True
+    )
+
+    timeline["outcome"] = np.select(
+        [
+            timeline["upcoming"],
+            timeline["no_result"],
+            timeline["winner"] == timeline["team"],
+        ],
+        ["upcoming", "no result", "won"],
+        default="lost",
+    )
+    # calendar days, so a 15:30 fixture after a 11:30 one the day before is 1 rest day
+    timeline["rest_days"] = (
+        timeline["start_date"].dt.normalize().groupby(timeline["team"]).diff().dt.days
+    ).astype("Int16")
 
+    # a new run starts whenever the outcome differs from the team's previous one
+    new_run = (
+        timeline["outcome"] != timeline.groupby("team")["outcome"].shift()
+    ).cumsum()
+    run_length = timeline.groupby(new_run).cumcount() + 1
+    direction = np.select(
+        [timeline["outcome"] == "won", timeline["outcome"] == "lost"], [1, -1], 0
+    )
+    timeline["streak"] = run_length * direction
+
+    timeline["fixtures_last_7_days"] = (
+        timeline.set_index("start_date")
+        .groupby("team")["match_id"]
+        .rolling("7D")
+        .count()
+        .to_numpy()
+        .astype("int64")
+    )
+
+    return timeline[
+        [
+            "match_id",
+            "team",
+            "opponent",
+            "is_home",
+            "start_date",
+            "rest_days",
+            "outcome",
+            "streak",
+            "fixtures_last_7_days",
+        ]
+    ]
+
+
+def select_matches(
+    summary_df: pd.DataFrame,
+    season: Optional[int] = None,
+    venue: Optional[str] = None,
+) -> np.ndarray:
+    """Returns the ids of the matches of a season and/or at a venue.
+
+    Args:
+        summary_df (pd.DataFrame): the cleaned summary
+        season (int, optional): only matches of this season. Defaults to None.
+        venue (str, optional): only matches at this venue_name. Defaults to None.
+
+    Returns:
+        np.ndarray: the selected match ids
+    """
+    selected = pd.Series(True, index=summary_df.index)
+    if season is not None:
+        selected &= summary_df["season"] == season
+    if venue is not None:
+        selected &= summary_df["venue_name"].astype(object) == venue
+    return summary_df.loc[selected, "id"].to_numpy()
+
+
+@instrumented
 class SummaryData:
-    def __init__(self, summary_df: pd.DataFrame):
+    def __init__(self, summary_df: pd.DataFrame, totals: Optional[pd.DataFrame] = None):
         self.summary_df = summary_df
+        # the running team_totals of a match store, see match_store.team_totals
+        self.totals = totals
+        self._scorecards: Optional[pd.DataFrame] = None
+        self._timeline: Optional[pd.DataFrame] = None
+
+    @property
+    def scorecards(self) -> pd.DataFrame:
+        """The parsed scores of every match indexed by match_id, see parse_scorecards. Parsed on first use."""
+        if self._scorecards is None:
+            self._scorecards = parse_scorecards(self.summary_df)
+        return self._scorecards
+
+    @property
+    def timeline(self) -> pd.DataFrame:
+        """The fixtures of every team in date order, see build_team_timeline. Built on first use."""
+        if self._timeline is None:
+            self._timeline = build_team_timeline(self.summary_df)
+        return self._timeline
+
+    def get_team_timeline(self, team_name: str) -> pd.DataFrame:
+        """
+        Returns the fixtures of the given team in date order with their rest days, outcome, streak and workload.
+
+        Args:
+            team_name (str): Name of the team, e.g. "PC".
+
+        Returns:
+            pd.DataFrame: The rows of the timeline for the team.
+        """
+        return self.timeline[self.timeline["team"] == team_name]
+
+    def get_current_streaks(self) -> Dict[str, int]:
+        """
+        Returns the streak of every team after its latest decided match, positive for wins and negative for losses.
+
+        Returns:
+            dict: A dictionary with the streak of every team.
+        """
+        decided = self.timeline[self.timeline["outcome"].isin(["won", "lost"])]
+        return decided.groupby("team")["streak"].last().to_dict()
+
+    def get_match_score(self, match_id: int) -> Dict[str, object]:
+        """
+        Returns the parsed scores of a single match.
+
+        Args:
+            match_id (int): id of the match.
+
+        Returns:
+            dict: A dictionary with the teams, winner, and runs, wickets, overs and target of both sides.
+        """
+        return self.scorecards.loc[match_id].to_dict()
 
     def get_total_matches(self) -> int:
         """
@@ -22,9 +285,20 @@ class SummaryData:
         Args:
             team_name (str): Name of the team to get the total wins for.
 
+        The wins are read from the running totals of the match store when the explorer has them.
+
         Returns:
             dict: A dictionary containing the number of home_wins, away_wins, and total_wins for the given team.
         """
+        if self.totals is not None:
+            wins = self.totals.reindex([team_name]).fillna(0).iloc[0]
+            home_wins, away_wins = int(wins["home_wins"]), int(wins["away_wins"])
+            return {
+                "home_wins": home_wins,
+                "away_wins": away_wins,
+                "total_wins": home_wins + away_wins,
+            }
+
         home_wins = len(
             self.summary_df[
                 (self.summary_df["home_team"] == team_name)
@@ -59,28 +333,7 @@ class SummaryData:
         Returns:
             A dictionary with keys '1st Inning' and '2nd Inning', each containing a dictionary with keys 'Team' and 'Score'
         """
-        self.summary_df["1st_inning_score"] = pd.to_numeric(
-            self.summary_df["1st_inning_score"], errors="coerce"
-        )
-        highest_1st_inn_score = self.summary_df.loc[
-            self.summary_df["1st_inning_score"].idxmax()
-        ]
-        self.summary_df["2nd_inning_score"] = pd.to_numeric(
-            self.summary_df["2nd_inning_score"], errors="coerce"
-        )
-        highest_2nd_inn_score = self.summary_df.loc[
-            self.summary_df["2nd_inning_score"].idxmax()
-        ]
-        return {
-            "1st Inning": {
-                "Team": highest_1st_inn_score["winner"],
-                "Score": highest_1st_inn_score["1st_inning_score"],
-            },
-            "2nd Inning": {
-                "Team": highest_2nd_inn_score["winner"],
-                "Score": highest_2nd_inn_score["2nd_inning_score"],
-            },
-        }
+        return self.innings_extremes("idxmax")
 
     def get_lowest_scores(self) -> Dict[str, Dict[str, int]]:
         """
@@ -89,76 +342,58 @@ class SummaryData:
         Returns:
             A dictionary with keys '1st Inning' and '2nd Inning', each containing a dictionary with keys 'Team' and 'Score'
         """
-        self.summary_df["1st_inning_score"] = pd.to_numeric(
-            self.summary_df["1st_inning_score"], errors="coerce"
-        )
-        highest_1st_inn_score = self.summary_df.loc[
-            self.summary_df["1st_inning_score"].idxmin()
-        ]
-        self.summary_df["2nd_inning_score"] = pd.to_numeric(
-            self.summary_df["2nd_inning_score"], errors="coerce"
-        )
-        highest_2nd_inn_score = self.summary_df.loc[
-            self.summary_df["2nd_inning_score"].idxmin()
-        ]
-        return {
-            "1st Inning": {
-                "Team": highest_1st_inn_score["winner"],
-                "Score": highest_1st_inn_score["1st_inning_score"],
-            },
-            "2nd Inning": {
-                "Team": highest_2nd_inn_score["winner"],
-                "Score": highest_2nd_inn_score["2nd_inning_score"],
-            },
-        }
-
-    def analyze_result_vs_days(self) -> pd.DataFrame:
-        """The output is a pandas DataFrame with the winning team names in the columns and days between games in the index.
-        The values in the cells represent the proportion of games won by each team for a particular number of days between games.
-
-        For example, the first row with index value -11.0 represents the proportion of games won by each team when there are 11 days between games.
-        The value for "Capitals" is 0.0, meaning they did not win any games when there were 11 days between games. The value for "Super Kings" is 1.0,
-        meaning they won all their games when there were 11 days between games.
+        return self.innings_extremes("idxmin")
 
-        Similarly, the second row with index value -7.0 represents the proportion of games won by each team when there are 7 days between games.
-        The value for "Super Kings" is 1.0, meaning they won all their games when there were 7 days between games.
+    def innings_extremes(self, extreme: str) -> Dict[str, Dict[str, int]]:
+        """
+        Looks up the team that batted and the runs scored of the highest or lowest innings.
+        Innings of matches without a result are left out, as they were not batted to completion.
 
-        You can use this output to observe the relationship between the number of days between games and the proportion of games won by each team.
-        For example, you can see that for most values of days between games, "Super Kings" have a higher proportion of wins compared to other teams.
-        However, for some values of days between games (e.g. -3.0), "Capitals" have a higher proportion of wins compared to other teams.
+        Args:
+            extreme (str): "idxmax" for the highest or "idxmin" for the lowest innings.
 
         Returns:
-            pd.Dataframe: dataframe containing all teams and their respective win rates compared to game break
-        """
-        # convert start_date and end_date columns to datetime format
-        self.summary_df["start_date"] = pd.to_datetime(self.summary_df["start_date"])
-        self.summary_df["end_date"] = pd.to_datetime(self.summary_df["end_date"])
+            A dictionary with keys '1st Inning' and '2nd Inning', each containing a dictionary with keys 'Team' and 'Score'
 
-        # extract the name of the winning team from the 'result' column
-        self.summary_df["winning_team"] = (
-            self.summary_df["result"].str.split(" won").str[0]
-        )
+        Raises:
+            ValueError: if no match was batted to completion, e.g. for a season without results
+        """
+        completed = self.scorecards[self.scorecards["second_runs"].notna()]
+        if completed.empty:
+            raise ValueError("no completed innings")
+        extremes = {}
+        for label, innings in [("1st Inning", "first"), ("2nd Inning", "second")]:
+            match_id = getattr(
+                completed[f"{innings}_runs"].astype("float64"), extreme
+            )()
+            extremes[label] = {
+                "Team": completed.at[match_id, f"{innings}_team"],
+                "Score": int(completed.at[match_id, f"{innings}_runs"]),
+            }
+        return extremes
 
-        # calculate the number of days between consecutive games
-        self.summary_df["start_date"] = pd.to_datetime(
-            self.summary_df["start_date"], format="%Y-%m-%dT%H:%M%z"
-        )
-        self.summary_df["days_between_games"] = (
-            self.summary_df.groupby("winning_team")["start_date"]
-            .diff()  # type: ignore
-            .dt.days
-        )
+    def analyze_result_vs_days(self) -> pd.DataFrame:
+        """The output is a pandas DataFrame with the teams in the columns and the rest days before a game in the index.
+        The values in the cells are the proportion of the team's decided games after that many rest days that it won.
 
-        # group by days between games and calculate the average result for each group
-        result_by_days = (
-            self.summary_df.groupby("days_between_games")["winning_team"]
-            .value_counts(normalize=True)
-            .unstack()
-            .fillna(0)
-        )
+        For example, a value of 0.75 in the row with index 2 and the column "PC" means the Pretoria Capitals won 3 of
+        the 4 games they played 2 days after their previous game. Teams that never had that many rest days before a
+        decided game have a missing value.
 
-        result_by_days.drop(
-            ["Starts at 17:30 local time", "No result"], axis=1, inplace=True
+        Returns:
+            pd.Dataframe: dataframe containing all teams and their win rates by rest days before the game
+        """
+        decided = self.timeline[
+            self.timeline["outcome"].isin(["won", "lost"])
+            & self.timeline["rest_days"].notna()
+        ]
+        return (
+            decided.assign(
+                won=decided["outcome"] == "won",
+                rest_days=decided["rest_days"].astype("int64"),
+            )
+            .pivot_table(
+                index="rest_days", columns="team", values="won", aggfunc="mean"
+            )
+            .sort_index()
         )
-        result_by_days = result_by_days.loc[~(result_by_days == 0).all(axis=1)]
-        return result_by_days
@@ -0,0 +1,195 @@
+import functools
+import inspect
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+
+def count_rows(value: object) -> Optional[int]:
+    """Counts the rows of a dataframe or series, or of all the ones in a tuple or list.
+    Dictionaries count their entries and anything else has no row count."""
+    if isinstance(value, (pd.DataFrame, pd.Series, dict)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        counts = [count_rows(item) for item in value]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+def input_rows(args: tuple, kwargs: dict) -> Optional[int]:
+    """Counts the rows of the dataframes a method was called with, including the
+    dataframes held by the instance, e.g. BattingData.batting_df."""
+    values = list(args[1:]) + list(kwargs.values())
+    if args:
+        values += [
+            value
+            for name, value in getattr(args[0], "__dict__", {}).items()
+            if name.endswith("_df")
+        ]
+    return count_rows([value for value in values if isinstance(value, pd.DataFrame)])
+
+
+class Profiler:
+    """Records the wall time, CPU time, peak traced memory and row counts of stages.
+
+    Disabled by default. While disabled, stage() and the instrumented methods do
+    nothing but check the enabled flag, and tracemalloc is not running.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: List[dict] = []
+        self._stack: List[dict] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.stages = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[dict]:
+        """Measures the code run inside the with block as one stage.
+
+        Stages can be nested; the peak memory of a stage includes that of its children.
+
+        Args:
+            name (str): name of the stage, e.g. "BattingData.get_all_performances"
+            rows_in (int, optional): number of input rows. Defaults to None.
+
+        Yields:
+            dict: the record of the stage, set "rows_out" on it to record output rows
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        record = {
+            "stage": name,
+            "depth": len(self._stack),
+            "rows_in": rows_in,
+            "rows_out": None,
+        }
+        frame = {"peak": 0, "start": tracemalloc.get_traced_memory()[0]}
+        self._stack.append(frame)
+        self.stages.append(record)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall_start
+            record["cpu_seconds"] = time.process_time() - cpu_start
+            current, peak = tracemalloc.get_traced_memory()
+            self._stack.pop()
+            record["peak_memory_bytes"] = max(frame["peak"], peak) - frame["start"]
+            record["allocated_bytes"] = current - frame["start"]
+
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], frame["peak"], peak)
+            tracemalloc.reset_peak()
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "stages": self.stages,
+            "total_wall_seconds": sum(
+                record["wall_seconds"] for record in self.stages if record["depth"] == 0
+            ),
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def summary_table(self) -> str:
+        """Returns the stages as a fixed width table with nested stages indented. Repeated
+        calls of a stage under the same parent are added together into one row."""
+        if not self.stages:
+            return "No stages were recorded"
+
+        table = pd.DataFrame(self.stages)
+        table["stage"] = [
+            "  " * depth + stage for depth, stage in zip(table["depth"], table["stage"])
+        ]
+        # consecutive rows at the same depth or deeper belong to the same parent
+        parents, path = [], []
+        for depth, stage in zip(table["depth"], table["stage"]):
+            path = path[:depth] + [stage]
+            parents.append(" > ".join(path[:-1]))
+        table["parent"] = parents
+
+        table = (
+            table.groupby(["parent", "stage"], sort=False)
+            .agg(
+                calls=("stage", "size"),
+                wall_seconds=("wall_seconds", "sum"),
+                cpu_seconds=("cpu_seconds", "sum"),
+                peak_memory_mb=("peak_memory_bytes", lambda peak: peak.max() / 2**20),
+                rows_in=("rows_in", "max"),
+                rows_out=("rows_out", "max"),
+            )
+            .reset_index()
+            .drop(columns="parent")
+        )
+        for column in ["rows_in", "rows_out"]:
+            table[column] = table[column].astype("Int64")
+
+        width = table["stage"].str.len().max()
+        return table.to_string(
+            index=False,
+            formatters={"stage": lambda stage: f"{stage:<{width}}"},
+            float_format="{:.3f}".format,
+        )
+
+
+PROFILER = Profiler()
+
+
+def instrument_method(name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return method(*args, **kwargs)
+        with PROFILER.stage(name, rows_in=input_rows(args, kwargs)) as record:
+            result = method(*args, **kwargs)
+            record["rows_out"] = count_rows(result)
+        return result
+
+    return wrapper
+
+
+def instrumented(cls: type) -> type:
+    """Class decorator that records every public method of cls as a stage of PROFILER.
+
+    Args:
+        cls (type): the class to instrument
+
+    Returns:
+        type: cls with its public methods wrapped
+    """
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith("_"):
+            continue
+        name = f"{cls.__name__}.{attribute}"
+        if inspect.isfunction(value):
+            setattr(cls, attribute, instrument_method(name, value))
+        elif isinstance(value, classmethod):
+            setattr(
+                cls, attribute, classmethod(instrument_method(name, value.__func__))
+            )
+    return cls
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.dataset_schema import SCHEMAS, concat_tables
+from src.explore_bowling import overs_to_balls
+
+STORE_DIR: str = "./input/match_store"
+
+# the column holding the match id in every raw table
+MATCH_KEYS: Dict[str, str] = {
+    "batting_card": "match_id",
+    "bowling_card": "match_id",
+    "details": "match_id",
+    "summary": "id",
+}
+
+
+def batting_totals(batting_df: pd.DataFrame) -> pd.DataFrame:
+    """Sums the additive batting statistics of every batsman in a cleaned batting_df.
+
+    The strike rates are summed along with the number of innings that have one, so
+    their mean can be derived from the totals.
+    """
+    return (
+        batting_df.assign(
+            innings=1, rated_innings=batting_df["strike_rate"].notna().astype("int64")
+        )
+        .groupby(batting_df["full_name"].astype(object))[
+            [
+                "innings",
+                "not_out",
+                "runs",
+                "balls_faced",
+                "fours",
+                "sixes",
+                "strike_rate",
+                "rated_innings",
+            ]
+        ]
+        .sum()
+    )
+
+
+def bowling_totals(bowling_df: pd.DataFrame) -> pd.DataFrame:
+    """Sums the additive bowling statistics of every bowler in a cleaned bowling_df.
+
+    The economy rates are summed along with the number of spells that have one, so
+    their mean can be derived from the totals.
+    """
+    return (
+        bowling_df.assign(
+            spells=1,
+            balls=overs_to_balls(bowling_df["overs"]),
+            rated_spells=bowling_df["economy_rate"].notna().astype("int64"),
+        )
+        .groupby(bowling_df["full_name"].astype(object))[
+            [
+                "spells",
+                "balls",
+                "maidens",
+                "conceded",
+                "wickets",
+                "dots",
+                "fours_conceded",
+                "sixes_conceded",
+                "wides",
+                "noballs",
+                "economy_rate",
+                "rated_spells",
+            ]
+        ]
+        .sum()
+    )
+
+
+def team_totals(summary_df: pd.DataFrame) -> pd.DataFrame:
+    """Counts the matches played and won, at home and away, by every team in a
+    cleaned summary_df."""
+    teams = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "team": summary_df[f"{side}_team"].astype(object),
+                    "won": summary_df[f"{side}_team"].astype(object)
+                    == summary_df["winner"].astype(object),
+                    "side": side,
+                }
+            )
+            for side in ["home", "away"]
+        ]
+    )
+    return (
+        teams.assign(
+            matches=1,
+            wins=teams["won"],
+            home_wins=teams["won"] & (teams["side"] == "home"),
+            away_wins=teams["won"] & (teams["side"] == "away"),
+        )
+        .groupby("team")[["matches", "wins", "home_wins", "away_wins"]]
+        .sum()
+    )
+
+
+# the running aggregate kept for a table, and how to compute it from cleaned rows
+AGGREGATORS: Dict[str, tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]] = {
+    "batting_card": ("batting_totals", batting_totals),
+    "bowling_card": ("bowling_totals", bowling_totals),
+    "summary": ("team_totals", team_totals),
+}
+
+
+def hash_matches(table_df: pd.DataFrame, match_key: str, salt: str) -> Dict[int, str]:
+    """Hashes the rows of every match in table_df, in order of first appearance.
+
+    Args:
+        table_df (pd.DataFrame): a raw table
+        match_key (str): the column holding the match id
+        salt (str): extra text mixed into every hash, e.g. the cleaning version
+
+    Returns:
+        Dict[int, str]: the hex SHA-256 digest of every match's rows
+    """
+    row_hashes = pd.util.hash_pandas_object(table_df, index=False).to_numpy()
+    positions = table_df.groupby(match_key).indices
+    return {
+        int(match_id): hashlib.sha256(
+            salt.encode() + row_hashes[positions[match_id]].tobytes()
+        ).hexdigest()
+        for match_id in pd.unique(table_df[match_key])
+    }
+
+
+def match_seasons(raw_tables: Dict[str, pd.DataFrame]) -> Dict[int, str]:
+    """Works out the season of every match, using the score cards and falling back to
+    the year of the start date in the summary.
+
+    Args:
+        raw_tables (Dict[str, pd.DataFrame]): the raw tables by name
+
+    Returns:
+        Dict[int, str]: the season of every match id
+    """
+    summary_df = raw_tables["summary"]
+    seasons = pd.concat(
+        [
+            raw_tables["batting_card"][["match_id", "season"]].astype(str),
+            raw_tables["bowling_card"][["match_id", "season"]].astype(str),
+            pd.DataFrame(
+                {
+                    "match_id": summary_df["id"].astype(str),
+                    "season": summary_df["start_date"].astype(str).str[:4],
+                }
+            ),
+        ]
+    ).drop_duplicates(subset="match_id")
+    return dict(zip(seasons["match_id"].astype(int), seasons["season"]))
+
+
+class MatchStore:
+    """Persistent store of cleaned rows, partitioned by table, season and match.
+
+    The manifest records a content hash of the raw rows of every stored match, so an
+    ingest only cleans matches that are new or changed. Running per player and per team
+    totals, see AGGREGATORS, are kept next to the partitions and updated by
+    subtracting the old rows of a changed match and adding its new rows.
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self.manifest: Dict[str, List[dict]] = self.read_json("manifest.json", {})
+        self.aggregates: Dict[str, pd.DataFrame] = {}
+
+        aggregates_path = os.path.join(self.root, "aggregates.pkl")
+        if os.path.exists(aggregates_path):
+            self.aggregates = pd.read_pickle(aggregates_path)
+
+    def read_json(self, file_name: str, default: dict) -> dict:
+        path = os.path.join(self.root, file_name)
+        if not os.path.exists(path):
+            return default
+        with open(path) as file:
+            return json.load(file)
+
+    def partition_path(self, table: str, season: str, match_id: int) -> str:
+        return os.path.join(self.root, table, season, f"{match_id}.pkl")
+
+    def ingest(
+        self,
+        raw_tables: Dict[str, pd.DataFrame],
+        cleaners: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]],
+        version: int,
+    ) -> Dict[str, List[int]]:
+        """Cleans and stores the matches in raw_tables that are new or have changed.
+
+        Matches that are stored but missing from raw_tables, e.g. earlier seasons, are
+        kept as they are.
+
+        Args:
+            raw_tables (Dict[str, pd.DataFrame]): the raw tables by name
+            cleaners (Dict[str, Callable]): the cleaning function of every table
+            version (int): the cleaning version, a new version reprocesses every match
+
+        Returns:
+            Dict[str, List[int]]: the match ids that were cleaned for every table
+        """
+        seasons = match_seasons(raw_tables)
+        changed: Dict[str, List[int]] = {}
+
+        for table, raw_df in raw_tables.items():
+            match_key = MATCH_KEYS[table]
+            hashes = hash_matches(raw_df, match_key, salt=f"{table}:{version}")
+            stored = {
+                entry["match_id"]: entry for entry in self.manifest.get(table, [])
+            }
+
+            changed[table] = [
+                match_id
+                for match_id, digest in hashes.items()
+                if stored.get(match_id, {}).get("hash") != digest
+            ]
+            if table in AGGREGATORS and stored:
+                name, aggregate = AGGREGATORS[table]
+                if name not in self.aggregates:
+                    # a store written without its totals, start from every stored row
+                    self.aggregates[name] = aggregate(self.load(table))
+            if changed[table]:
+                clean_df = cleaners[table](
+                    raw_df[raw_df[match_key].isin(changed[table])].copy()
+                )
+                self.replace_matches(table, clean_df, stored, seasons)
+                logging.info(f"Ingested {len(changed[table])} matches into {table}")
+
+            # raw order first so a full raw input reproduces the original row order,
+            # unchanged matches keep the season their partition was written under
+            self.manifest[table] = [
+                {
+                    "match_id": match_id,
+                    "season": (
+                        stored[match_id]["season"]
+                        if match_id not in changed[table]
+                        else seasons.get(match_id, "unknown")
+                    ),
+                    "hash": digest,
+                }
+                for match_id, digest in hashes.items()
+            ] + [entry for match_id, entry in stored.items() if match_id not in hashes]
+
+        self.save()
+        return changed
+
+    def replace_matches(
+        self,
+        table: str,
+        clean_df: pd.DataFrame,
+        stored: Dict[int, dict],
+        seasons: Dict[int, str],
+    ) -> None:
+        """Overwrites the partitions of the matches in clean_df and updates the totals."""
+        match_key = MATCH_KEYS[table]
+        old_frames = []
+
+        for match_id, match_df in clean_df.groupby(match_key, sort=False):
+            match_id = int(match_id)
+            if match_id in stored:
+                old_path = self.partition_path(
+                    table, stored[match_id]["season"], match_id
+                )
+                old_frames.append(pd.read_pickle(old_path))
+                os.remove(old_path)
+
+            path = self.partition_path(
+                table, seasons.get(match_id, "unknown"), match_id
+            )
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            match_df.reset_index(drop=True).to_pickle(path)
+
+        if table in AGGREGATORS:
+            name, aggregate = AGGREGATORS[table]
+            added = aggregate(clean_df)
+            totals = self.aggregates.get(name)
+            if totals is None:
+                totals = added.iloc[:0]
+            if old_frames:
+                totals = totals.sub(aggregate(pd.concat(old_frames)), fill_value=0)
+            # 64 bit counts, the running totals of many seasons outgrow the card dtypes
+            dtypes = {
+                column: "float64" if added[column].dtype.kind == "f" else "int64"
+                for column in added.columns
+            }
+            totals = totals.add(added, fill_value=0).astype(dtypes)
+
+            # drop players and teams that no longer have any rows
+            self.aggregates[name] = totals[totals.iloc[:, 0] > 0]
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "manifest.json"), "w") as file:
+            json.dump(self.manifest, file, indent=2)
+        pd.to_pickle(self.aggregates, os.path.join(self.root, "aggregates.pkl"))
+
+    def load(self, table: str) -> Optional[pd.DataFrame]:
+        """Returns every stored cleaned row of table, or None if nothing is stored.
+
+        Args:
+            table (str): name of the table, e.g. "details"
+
+        Returns:
+            Optional[pd.DataFrame]: the cleaned dataframe
+        """
+        frames = [
+            pd.read_pickle(
+                self.partition_path(table, entry["season"], entry["match_id"])
+            )
+            for entry in self.manifest.get(table, [])
+        ]
+        if not frames:
+            return None
+        return concat_tables(frames, SCHEMAS[table])
@@ -0,0 +1,275 @@
+import logging
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_cache import hash_file
+from src.delivery_store import STORE_DIR, STORE_VERSION, DeliveryStore
+
+MATCHUP_PATH: str = "./input/delivery_store/matchups.npz"
+
+# bump whenever STATS or the way they are counted change so saved matrices are rebuilt
+MATCHUP_VERSION: int = 1
+
+# the counters kept for every batsman and bowler pair
+STATS: tuple[str, ...] = ("balls", "runs", "dots", "boundaries", "dismissals")
+
+
+class MatchupMatrix:
+    """Balls, runs, dots, boundaries and dismissals of every batsman against every bowler.
+
+    The matrix is sparse: only pairs that actually met are stored, as entries sorted by
+    batsman then bowler (compressed rows), with a second ordering by bowler (compressed
+    columns), so a batsman's row and a bowler's column are both contiguous slices.
+
+    Attributes:
+        batsman_ids (np.ndarray): sorted cricinfo ids of the batsmen, one per row
+        bowler_ids (np.ndarray): sorted cricinfo ids of the bowlers, one per column
+        rows (np.ndarray): row of every entry
+        cols (np.ndarray): column of every entry
+        stats (Dict[str, np.ndarray]): every counter in STATS, one value per entry
+        players (Dict[int, str]): the name of every batsman and bowler id
+        player_ids (Dict[str, int]): the id of every name, the first id of a name shared
+            by several players
+    """
+
+    def __init__(
+        self,
+        batsman_ids: np.ndarray,
+        bowler_ids: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        stats: Dict[str, np.ndarray],
+        players: Dict[int, str],
+    ):
+        self.batsman_ids = batsman_ids
+        self.bowler_ids = bowler_ids
+        self.rows = rows
+        self.cols = cols
+        self.stats = stats
+        self.players = players
+        # reversed, so the first id of a shared name is the one kept
+        self.player_ids = {
+            name: player_id for player_id, name in reversed(players.items())
+        }
+
+        # entries are sorted by row, so rows start at row_starts; col_order sorts them
+        # by column instead, stable so every column stays sorted by row
+        self.row_starts = np.searchsorted(rows, np.arange(len(batsman_ids) + 1))
+        self.col_order = np.argsort(cols, kind="stable")
+        self.col_starts = np.searchsorted(
+            cols[self.col_order], np.arange(len(bowler_ids) + 1)
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def build(
+        cls, store: DeliveryStore, match_ids: Optional[Sequence[int]] = None
+    ) -> "MatchupMatrix":
+        """Counts every batsman and bowler pair in a single vectorized pass over store.
+
+        Wides are not balls faced, and the runs are those scored off every other
+        delivery. Dismissals are the wickets credited to the bowler.
+
+        Args:
+            store (DeliveryStore): the deliveries
+            match_ids (Sequence[int], optional): only count these matches, see
+            explore_summary.select_matches. Defaults to all of them.
+
+        Returns:
+            MatchupMatrix: the matrix
+        """
+        if match_ids is not None:
+            store = store.filter(match_id=match_ids)
+
+        faced = ~np.asarray(store["is_wide"])
+        batsman_ids, batsman_rows = np.unique(store["batsman_id"], return_inverse=True)
+        bowler_ids, bowler_cols = np.unique(store["bowler_id"], return_inverse=True)
+
+        # one key per pair, sorted by batsman then bowler
+        keys, entry = np.unique(
+            batsman_rows.astype("int64") * len(bowler_ids) + bowler_cols,
+            return_inverse=True,
+        )
+        runs = np.asarray(store["runs"], dtype="int64")
+        counted = {
+            "balls": faced,
+            "runs": np.where(faced, runs, 0),
+            "dots": faced & (runs == 0),
+            "boundaries": np.asarray(store["is_boundary"]) & faced,
+            "dismissals": np.asarray(store["is_bowler_wicket"]),
+        }
+        stats = {
+            name: np.bincount(entry, weights=counted[name], minlength=len(keys)).astype(
+                "int32"
+            )
+            for name in STATS
+        }
+        if len(bowler_ids):
+            rows, cols = np.divmod(keys, len(bowler_ids))
+        else:
+            rows, cols = keys, keys
+
+        return cls(
+            batsman_ids.astype("int32"),
+            bowler_ids.astype("int32"),
+            rows.astype("int32"),
+            cols.astype("int32"),
+            stats,
+            store.players,
+        )
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        matrix_path: str = MATCHUP_PATH,
+        store_dir: str = STORE_DIR,
+    ) -> "MatchupMatrix":
+        """Returns the saved matrix of a details CSV, building and saving it first if the
+        CSV changed since it was saved.
+
+        Args:
+            path (str): path of the raw details CSV
+            matrix_path (str, optional): file of the saved matrix. Defaults to
+            MATCHUP_PATH.
+            store_dir (str, optional): folder of the delivery store to build it from.
+            Defaults to STORE_DIR.
+
+        Returns:
+            MatchupMatrix: the matrix
+        """
+        key = hash_file(path, salt=f"matchups:{MATCHUP_VERSION}:{STORE_VERSION}")
+        matrix = cls.load(matrix_path, key)
+        if matrix is None:
+            matrix = cls.build(DeliveryStore.open(path, store_dir))
+            matrix.save(matrix_path, key)
+        return matrix
+
+    def save(self, matrix_path: str, key: str = "") -> None:
+        """Writes the matrix and key to a single .npz file."""
+        os.makedirs(os.path.dirname(matrix_path) or ".", exist_ok=True)
+        player_ids = np.array(list(self.players), dtype="int64")
+        temp_path = f"{matrix_path}.tmp.npz"
+        np.savez(
+            temp_path,
+            key=np.array(key),
+            batsman_ids=self.batsman_ids,
+            bowler_ids=self.bowler_ids,
+            rows=self.rows,
+            cols=self.cols,
+            player_ids=player_ids,
+            player_names=np.array([self.players[i] for i in player_ids], dtype=str),
+            **self.stats,
+        )
+        os.replace(temp_path, matrix_path)
+
+    @classmethod
+    def load(
+        cls, matrix_path: str, key: Optional[str] = None
+    ) -> Optional["MatchupMatrix"]:
+        """Loads a saved matrix, or returns None if there is none or its key differs."""
+        if not os.path.exists(matrix_path):
+            return None
+
+        try:
+            with np.load(matrix_path) as saved:
+                if key is not None and str(saved["key"]) != key:
+                    return None
+                players = dict(
+                    zip(saved["player_ids"].tolist(), saved["player_names"].tolist())
+                )
+                return cls(
+                    saved["batsman_ids"],
+                    saved["bowler_ids"],
+                    saved["rows"],
+                    saved["cols"],
+                    {name: saved[name] for name in STATS},
+                    players,
+                )
+        except Exception:
+            logging.error(
+                f"Could not read the matchups in {matrix_path}, rebuilding them"
+            )
+            return None
+
+    def player_id(self, name: str) -> int:
+        """Returns the id of a player by full name, raising KeyError if unknown."""
+        return self.player_ids[name]
+
+    def entries(self, selected: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Returns entries of the matrix as a table with names and rates attached.
+
+        Args:
+            selected (np.ndarray, optional): positions of the entries. Defaults to all.
+
+        Returns:
+            pd.DataFrame: batsman and bowler ids and names, the STATS, strike_rate (runs
+            per 100 balls) and average (runs per dismissal, NaN without dismissals)
+        """
+        if selected is None:
+            selected = np.arange(len(self))
+        batsman_ids = self.batsman_ids[self.rows[selected]]
+        bowler_ids = self.bowler_ids[self.cols[selected]]
+        table = pd.DataFrame(
+            {
+                "batsman_id": batsman_ids,
+                "batsman_name": [self.players.get(int(i)) for i in batsman_ids],
+                "bowler_id": bowler_ids,
+                "bowler_name": [self.players.get(int(i)) for i in bowler_ids],
+                **{name: self.stats[name][selected] for name in STATS},
+            }
+        )
+        balls = table["balls"].where(table["balls"] != 0)
+        dismissals = table["dismissals"].where(table["dismissals"] != 0)
+        return table.assign(
+            strike_rate=table["runs"] / balls * 100,
+            average=table["runs"] / dismissals,
+        )
+
+    def batsman(self, batsman_id: int) -> pd.DataFrame:
+        """Returns the row of a batsman: one entry per bowler they faced."""
+        row = np.searchsorted(self.batsman_ids, batsman_id)
+        if row == len(self.batsman_ids) or self.batsman_ids[row] != batsman_id:
+            return self.entries(np.arange(0))
+        return self.entries(np.arange(self.row_starts[row], self.row_starts[row + 1]))
+
+    def bowler(self, bowler_id: int) -> pd.DataFrame:
+        """Returns the column of a bowler: one entry per batsman they bowled to."""
+        col = np.searchsorted(self.bowler_ids, bowler_id)
+        if col == len(self.bowler_ids) or self.bowler_ids[col] != bowler_id:
+            return self.entries(np.arange(0))
+        return self.entries(
+            self.col_order[self.col_starts[col] : self.col_starts[col + 1]]
+        )
+
+    def hardest(self, top_k: int = 10, min_balls: int = 6) -> pd.DataFrame:
+        """Returns the top_k matchups hardest for the batsman.
+
+        Pairs that met for at least min_balls balls are ranked by most dismissals per
+        ball, then lowest strike rate, then most balls.
+
+        Args:
+            top_k (int, optional): number of matchups. Defaults to 10.
+            min_balls (int, optional): fewest balls a pair must have met for. Defaults
+            to 6.
+
+        Returns:
+            pd.DataFrame: the matchups, hardest first
+
+        Raises:
+            ValueError: if top_k is less than 1
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        balls = self.stats["balls"].astype("float64")
+        candidates = np.flatnonzero(balls >= min_balls)
+        dismissal_rate = self.stats["dismissals"][candidates] / balls[candidates]
+        run_rate = self.stats["runs"][candidates] / balls[candidates]
+        # np.lexsort sorts on its last key first
+        order = np.lexsort((-balls[candidates], run_rate, -dismissal_rate))
+        return self.entries(candidates[order[:top_k]])
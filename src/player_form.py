@@ -0,0 +1,379 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dimensions import lookup_ids
+from src.explore_bowling import overs_to_balls
+
+
+@dataclass(frozen=True)
+class Window:
+    """A trailing window of a player's latest innings.
+
+    Attributes:
+        size (int): number of innings, or of calendar days up to and including the
+            day of the innings
+        unit (str): "innings" or "days"
+    """
+
+    size: int
+    unit: str = "innings"
+
+    def __post_init__(self):
+        if self.unit not in ("innings", "days"):
+            raise ValueError(f"Unknown window unit {self.unit}")
+        if self.size < 1:
+            raise ValueError("A window must span at least one innings or day")
+
+    @property
+    def name(self) -> str:
+        return f"last_{self.size}_{self.unit}"
+
+
+DEFAULT_WINDOWS: Tuple[Window, ...] = (Window(5, "innings"), Window(30, "days"))
+
+
+def window_totals(
+    player_ids: np.ndarray,
+    days: np.ndarray,
+    values: np.ndarray,
+    windows: Tuple[Window, ...],
+) -> Dict[Window, np.ndarray]:
+    """Sums values over every window ending at every row.
+
+    The rows must be sorted by player, then date. With a running sum over all rows,
+    the total of a window is the difference of the running sums at its two ends, so
+    every window of every row takes a constant number of operations; day windows only
+    add a binary search for where they start.
+
+    Args:
+        player_ids (np.ndarray): player of every row
+        days (np.ndarray): calendar day of every row, as days since the epoch
+        values (np.ndarray): the values to sum, one column per stat
+        windows (Tuple[Window, ...]): the windows
+
+    Returns:
+        Dict[Window, np.ndarray]: the totals of every row in every window
+    """
+    new_player = np.ones(len(player_ids), dtype=bool)
+    new_player[1:] = player_ids[1:] != player_ids[:-1]
+    block = np.cumsum(new_player) - 1
+    block_starts = np.flatnonzero(new_player)[block]
+    positions = np.arange(len(player_ids))
+    running = np.cumsum(values, axis=0)
+
+    totals = {}
+    for window in windows:
+        if window.unit == "innings":
+            starts = positions - window.size + 1
+        else:
+            # one key per player and day, increasing over the sorted rows
+            keys = block.astype("int64") * 2**32 + days
+            starts = np.searchsorted(keys, keys - window.size + 1)
+        starts = np.maximum(starts, block_starts)
+        before = np.where((starts > 0)[:, None], running[starts - 1], 0)
+        totals[window] = running - before
+    return totals
+
+
+def card_innings(
+    card_df: pd.DataFrame,
+    summary_df: pd.DataFrame,
+    team_column: str,
+    values: Dict[str, pd.Series],
+) -> pd.DataFrame:
+    """Lays out the innings of a batting or bowling card in date order.
+
+    Args:
+        card_df (pd.DataFrame): a batting or bowling card with a player_id column
+        summary_df (pd.DataFrame): the cleaned summary, for the start dates
+        team_column (str): column of card_df holding the team of the player
+        values (Dict[str, pd.Series]): the stats of every innings by name
+
+    Returns:
+        pd.DataFrame: match_id, start_date, day, player_id, full_name, team, innings
+        and the stats, sorted by start date and match, card order within a match
+    """
+    start_dates = pd.Series(
+        summary_df["start_date"].astype(object).to_numpy(),
+        index=summary_df["id"].to_numpy(),
+    )
+    innings = pd.DataFrame(
+        {
+            "match_id": card_df["match_id"].to_numpy(),
+            "start_date": pd.to_datetime(
+                card_df["match_id"].map(start_dates).to_numpy(),
+                format="%Y-%m-%dT%H:%MZ",
+                utc=True,
+            ),
+            "player_id": card_df["player_id"].to_numpy(),
+            "full_name": card_df["full_name"].astype(object).to_numpy(),
+            "team": card_df[team_column].astype(object).to_numpy(),
+            "innings": 1,
+            **{
+                name: value.fillna(0).to_numpy("int64")
+                for name, value in values.items()
+            },
+        }
+    )
+    # innings of matches missing from the summary have no date to place them at
+    innings = innings.dropna(subset=["start_date", "player_id"])
+    innings = innings.astype({"player_id": "int64"}).sort_values(
+        ["start_date", "match_id"], kind="mergesort", ignore_index=True
+    )
+    # calendar days, like the rest days of the team timeline
+    day = (
+        innings["start_date"].dt.normalize() - pd.Timestamp("1970-01-01", tz="UTC")
+    ).dt.days
+    innings.insert(2, "day", day.astype("int64"))
+    return innings
+
+
+class FormEngine(ABC):
+    """Rolling form of every player over trailing windows of their innings.
+
+    The engine keeps every innings sorted by player and date, and the form of every
+    innings once computed. Appending the innings of a new match only sums the windows
+    of those innings, over the history of the players in it; the form of earlier
+    innings never changes, so nothing else is windowed again.
+
+    Subclasses pick the stats summed in every window, the rates derived from them and
+    how a card is turned into innings.
+
+    Attributes:
+        windows (Tuple[Window, ...]): the windows of the form
+        players (pd.DataFrame): the players dimension the innings are keyed to, see
+            dimensions.Dimensions; players of appended cards missing from it get the
+            next ids, so earlier ids never change
+        latest (pd.Timestamp, optional): start date of the latest innings appended
+    """
+
+    # stats of an innings summed over every window, besides the number of innings
+    stats: Tuple[str, ...] = ()
+    # name of every rate and the numerator, denominator and scale it is derived from
+    rates: Dict[str, Tuple[str, str, float]] = {}
+    # total the current form is ranked by, highest first
+    rank_by: str = "innings"
+
+    def __init__(
+        self,
+        players: Optional[pd.DataFrame] = None,
+        windows: Tuple[Window, ...] = DEFAULT_WINDOWS,
+    ):
+        self.windows = windows
+        if players is None:
+            players = pd.DataFrame(
+                {"full_name": pd.Series(dtype=object)},
+                index=pd.RangeIndex(0, name="player_id"),
+            )
+        self.players = players
+        self.latest: Optional[pd.Timestamp] = None
+        columns = ("innings",) + self.stats
+        self._player_ids = np.empty(0, dtype="int64")
+        self._days = np.empty(0, dtype="int64")
+        self._values = np.empty((0, len(columns)), dtype="int64")
+        self._chunks: List[pd.DataFrame] = []
+        self._form: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_card(
+        cls,
+        card_df: pd.DataFrame,
+        summary_df: pd.DataFrame,
+        players: Optional[pd.DataFrame] = None,
+        windows: Tuple[Window, ...] = DEFAULT_WINDOWS,
+    ) -> "FormEngine":
+        """Builds the form of every innings of a card in one vectorized pass.
+
+        Args:
+            card_df (pd.DataFrame): a batting or bowling card
+            summary_df (pd.DataFrame): the cleaned summary, for the start dates
+            players (pd.DataFrame, optional): the players dimension of the card.
+            Defaults to one numbering the players in order of appearance.
+            windows (Tuple[Window, ...], optional): the windows of the form. Defaults
+            to DEFAULT_WINDOWS.
+
+        Returns:
+            FormEngine: the engine
+        """
+        engine = cls(players, windows)
+        engine.append(card_df, summary_df)
+        return engine
+
+    @abstractmethod
+    def innings(self, card_df: pd.DataFrame, summary_df: pd.DataFrame) -> pd.DataFrame:
+        """Turns a card into innings, see card_innings."""
+
+    def append(self, card_df: pd.DataFrame, summary_df: pd.DataFrame) -> pd.DataFrame:
+        """Adds the innings of one or more new matches and computes only their form.
+
+        Args:
+            card_df (pd.DataFrame): the card rows of the new matches
+            summary_df (pd.DataFrame): a summary holding their start dates
+
+        Returns:
+            pd.DataFrame: the form of the new innings, see form
+        """
+        card_df = self.key_players(card_df)
+        innings = self.innings(card_df, summary_df)
+        if len(innings) and self.latest is not None:
+            if innings["start_date"].iloc[0] < self.latest:
+                raise ValueError(
+                    "Matches must be appended in date order, build a new engine to add "
+                    "earlier ones"
+                )
+
+        player_ids = innings["player_id"].to_numpy("int64")
+        days = innings["day"].to_numpy("int64")
+        values = innings[["innings", *self.stats]].to_numpy("int64")
+
+        # the history of the players of the new innings, followed by the new innings
+        players = np.unique(player_ids)
+        first = np.searchsorted(self._player_ids, players, side="left")
+        lengths = np.searchsorted(self._player_ids, players, side="right") - first
+        history = np.repeat(first - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+        order = np.argsort(
+            np.concatenate([self._player_ids[history], player_ids]), kind="stable"
+        )
+        totals = window_totals(
+            np.concatenate([self._player_ids[history], player_ids])[order],
+            np.concatenate([self._days[history], days])[order],
+            np.concatenate([self._values[history], values])[order],
+            self.windows,
+        )
+        # positions in the sorted rows of the new innings, in the order of innings
+        is_new = order >= len(history)
+        new_rows = np.empty(len(innings), dtype="int64")
+        new_rows[order[is_new] - len(history)] = np.flatnonzero(is_new)
+
+        form = innings.drop(columns="day")
+        for window in self.windows:
+            window_df = pd.DataFrame(
+                totals[window][new_rows],
+                columns=["innings", *self.stats],
+                index=form.index,
+            )
+            for name, (numerator, denominator, scale) in self.rates.items():
+                window_df[name] = (
+                    window_df[numerator]
+                    / window_df[denominator].where(window_df[denominator] != 0)
+                    * scale
+                )
+            form = form.join(window_df.add_suffix(f"_{window.name}"))
+
+        # keep the history sorted by player, new innings after the earlier ones
+        by_player = np.argsort(player_ids, kind="stable")
+        at = np.searchsorted(self._player_ids, player_ids[by_player], side="right")
+        self._player_ids = np.insert(self._player_ids, at, player_ids[by_player])
+        self._days = np.insert(self._days, at, days[by_player])
+        self._values = np.insert(self._values, at, values[by_player], axis=0)
+
+        if len(innings):
+            self.latest = innings["start_date"].iloc[-1]
+        self._chunks.append(form)
+        self._form = None
+        return form
+
+    def key_players(self, card_df: pd.DataFrame) -> pd.DataFrame:
+        """Returns card_df keyed to the players dimension, giving players missing from
+        it the next ids. A card that is already keyed keeps its player_id."""
+        if "player_id" in card_df.columns:
+            return card_df
+
+        names = card_df["full_name"].astype(object)
+        new_names = pd.Index(names.dropna().unique()).difference(
+            self.players["full_name"]
+        )
+        if len(new_names):
+            first_id = int(self.players.index.max()) + 1 if len(self.players) else 0
+            new_players = pd.DataFrame(
+                {"full_name": new_names},
+                index=pd.RangeIndex(
+                    first_id, first_id + len(new_names), name="player_id"
+                ),
+            ).reindex(columns=self.players.columns)
+            self.players = pd.concat([self.players, new_players]).astype(
+                self.players.dtypes.to_dict()
+            )
+        return card_df.assign(
+            player_id=lookup_ids(names, self.players["full_name"], "Int32")
+        )
+
+    @property
+    def form(self) -> pd.DataFrame:
+        """Every innings in date order with its totals and rates in every window.
+
+        Columns are match_id, start_date, player_id, full_name, team, the stats of the
+        innings, and for every window e.g. runs_last_5_innings or innings_last_30_days.
+        """
+        if self._form is None:
+            self._form = pd.concat(self._chunks, ignore_index=True)
+            self._chunks = [self._form]
+        return self._form
+
+    def current_form(self) -> pd.DataFrame:
+        """Returns the form of every player as of their latest innings, ranked by the
+        rank_by total of the first window, highest first."""
+        latest = self.form.drop_duplicates("player_id", keep="last")
+        return latest.sort_values(
+            f"{self.rank_by}_{self.windows[0].name}", ascending=False, kind="mergesort"
+        ).reset_index(drop=True)
+
+    def player_form(self, full_name: str) -> pd.DataFrame:
+        """Returns the form of a player after every one of their innings."""
+        return self.form[self.form["full_name"] == full_name].reset_index(drop=True)
+
+
+class BattingForm(FormEngine):
+    """Rolling runs, balls, boundaries, strike rate and average of every batsman."""
+
+    stats = ("runs", "balls_faced", "fours", "sixes", "dismissals")
+    rates = {
+        "strike_rate": ("runs", "balls_faced", 100),
+        "average": ("runs", "dismissals", 1),
+    }
+    rank_by = "runs"
+
+    def innings(self, card_df: pd.DataFrame, summary_df: pd.DataFrame) -> pd.DataFrame:
+        return card_innings(
+            card_df,
+            summary_df,
+            "current_innings",
+            {
+                "runs": card_df["runs"],
+                "balls_faced": card_df["balls_faced"],
+                "fours": card_df["fours"],
+                "sixes": card_df["sixes"],
+                "dismissals": ~card_df["not_out"].astype(bool),
+            },
+        )
+
+
+class BowlingForm(FormEngine):
+    """Rolling balls, runs conceded, wickets, economy rate and average of every bowler."""
+
+    stats = ("balls", "conceded", "wickets", "dots")
+    rates = {
+        "economy_rate": ("conceded", "balls", 6),
+        "average": ("conceded", "wickets", 1),
+        "strike_rate": ("balls", "wickets", 1),
+    }
+    rank_by = "wickets"
+
+    def innings(self, card_df: pd.DataFrame, summary_df: pd.DataFrame) -> pd.DataFrame:
+        return card_innings(
+            card_df,
+            summary_df,
+            "bowling_team",
+            {
+                "balls": overs_to_balls(card_df["overs"]),
+                "conceded": card_df["conceded"],
+                "wickets": card_df["wickets"],
+                "dots": card_df["dots"],
+            },
+        )
@@ -1,33 +1,226 @@
+import hashlib
 import logging
+from typing import Optional
 
 import pandas as pd
 
+from src.dataset_cache import DatasetCache, hash_file
+from src.dataset_schema import SCHEMAS, memory_usage, read_table
+from src.dimensions import Dimensions
+from src.instrumentation import instrumented
+from src.match_store import MatchStore
 
+TABLES: tuple[str, ...] = ("batting_card", "bowling_card", "details", "summary")
+RAW_INPUT_DIR: str = "./input/raw_input"
+CLEAN_INPUT_DIR: str = "./input/clean_input"
+
+# bump whenever the cleaning steps or SCHEMAS change so cached clean tables are rebuilt
+CLEANING_VERSION: int = 4
+
+
+@instrumented
 class DatasetCleaner:
+    def __init__(
+        self, raw_input_dir: str = RAW_INPUT_DIR, clean_input_dir: str = CLEAN_INPUT_DIR
+    ):
+        self.raw_input_dir = raw_input_dir
+        self.clean_input_dir = clean_input_dir
+
     def read_dataset(
         self,
     ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Reads all the input CSV files into separate Pandas dataframes.
 
+        Only the columns declared in SCHEMAS are read, using their compact dtypes.
+
         Returns:
             Tuple[pd.DataFrame]: All the separate CSV files converted to dataframes
         """
-        BATTING_CSV: str = "./input/raw_input/batting_card.csv"
-        BOWLING_CSV: str = "./input/raw_input/bowling_card.csv"
-        DETAILS_CSV: str = "./input/raw_input/details.csv"
-        SUMMARY_CSV: str = "./input/raw_input/summary.csv"
-
-        batting_df: pd.DataFrame = pd.read_csv(BATTING_CSV)
-        bowling_df: pd.DataFrame = pd.read_csv(BOWLING_CSV)
-        details_df: pd.DataFrame = pd.read_csv(DETAILS_CSV)
-        summary_df: pd.DataFrame = pd.read_csv(SUMMARY_CSV)
+        batting_df, bowling_df, details_df, summary_df = (
+            read_table(f"{self.raw_input_dir}/{table}.csv", SCHEMAS[table])
+            for table in TABLES
+        )
+        return batting_df, bowling_df, details_df, summary_df
+
+    def memory_report(self) -> pd.DataFrame:
+        """Compares the memory used by a bare pd.read_csv of every raw CSV with the
+        schema driven load.
+
+        Returns:
+            pd.DataFrame: one row per table with the untyped_bytes, typed_bytes,
+            saved_bytes and saved_percent
+        """
+        rows = []
+        for table in TABLES:
+            raw_csv = f"{self.raw_input_dir}/{table}.csv"
+            untyped_bytes = memory_usage(pd.read_csv(raw_csv))
+            typed_bytes = memory_usage(read_table(raw_csv, SCHEMAS[table]))
+            rows.append(
+                {
+                    "table": table,
+                    "untyped_bytes": untyped_bytes,
+                    "typed_bytes": typed_bytes,
+                    "saved_bytes": untyped_bytes - typed_bytes,
+                    "saved_percent": (untyped_bytes - typed_bytes)
+                    / untyped_bytes
+                    * 100,
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def load_dataset(
+        self, cache: Optional[DatasetCache] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Returns all the cleaned and keyed dataframes, reusing cached copies where
+        possible.
+
+        Every table is keyed by a hash of all the raw CSVs and CLEANING_VERSION, as
+        the player and team ids depend on every table. On a cache hit the cleaned
+        dataframe is loaded directly and the CSV is neither parsed nor cleaned; on a
+        miss the tables are read, cleaned, keyed, written to the clean input folder and
+        stored in the cache.
+
+        Args:
+            cache (DatasetCache, optional): the cache to use. Defaults to DatasetCache().
+
+        Returns:
+            Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]: all cleaned dataframes
+        """
+        if cache is None:
+            cache = DatasetCache()
+
+        dataset_key = self.dataset_key()
+        batting_df, bowling_df, details_df, summary_df = (
+            self._load_table(table, cache, dataset_key) for table in TABLES
+        )
+        return batting_df, bowling_df, details_df, summary_df
+
+    def load_table(
+        self, table: str, cache: Optional[DatasetCache] = None
+    ) -> pd.DataFrame:
+        """Returns a single cleaned and keyed table, like load_dataset does for all of
+        them.
+
+        Args:
+            table (str): name of the table, e.g. "details"
+            cache (DatasetCache, optional): the cache to use. Defaults to DatasetCache().
+
+        Returns:
+            pd.DataFrame: the cleaned dataframe
+        """
+        if cache is None:
+            cache = DatasetCache()
+        return self._load_table(table, cache, self.dataset_key())
+
+    def load_dimensions(self, cache: Optional[DatasetCache] = None) -> Dimensions:
+        """Returns the player and team dimensions every loaded table is keyed to.
+
+        On a cache miss every table is cleaned and keyed at once, the dimensions are
+        written to players.csv and teams.csv and everything is stored in the cache.
+
+        Args:
+            cache (DatasetCache, optional): the cache to use. Defaults to DatasetCache().
+
+        Returns:
+            Dimensions: the player and team dimensions
+        """
+        if cache is None:
+            cache = DatasetCache()
+
+        dataset_key = self.dataset_key()
+        players = cache.load("players", dataset_key)
+        teams = cache.load("teams", dataset_key)
+        if players is not None and teams is not None:
+            return Dimensions(players=players, teams=teams)
+
+        cleaned = [
+            self.table_cleaners()[table](
+                read_table(f"{self.raw_input_dir}/{table}.csv", SCHEMAS[table])
+            )
+            for table in TABLES
+        ]
+        dimensions = Dimensions.build(*cleaned)
+        dimensions.to_csv(self.clean_input_dir)
+        for table, table_df in zip(TABLES, dimensions.key_tables(*cleaned)):
+            table_df.to_csv(f"{self.clean_input_dir}/{table}.csv", index=False)
+            cache.store(table, self.table_key(table, dataset_key), table_df)
+        cache.store("players", dataset_key, dimensions.players)
+        cache.store("teams", dataset_key, dimensions.teams)
+        return dimensions
+
+    def dataset_key(self) -> str:
+        """Hashes every raw CSV and CLEANING_VERSION into the key of the dataset."""
+        digest = hashlib.sha256(f"dataset:{CLEANING_VERSION}".encode())
+        for table in TABLES:
+            digest.update(hash_file(f"{self.raw_input_dir}/{table}.csv").encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def table_key(table: str, dataset_key: str) -> str:
+        return hashlib.sha256(f"{table}:{dataset_key}".encode()).hexdigest()
+
+    def _load_table(
+        self, table: str, cache: DatasetCache, dataset_key: str
+    ) -> pd.DataFrame:
+        key = self.table_key(table, dataset_key)
+        table_df = cache.load(table, key)
+        if table_df is None:
+            dimensions = self.load_dimensions(cache)
+            table_df = cache.load(table, key)
+        if table_df is None:
+            # the dimensions were cached but this table was not
+            raw_csv = f"{self.raw_input_dir}/{table}.csv"
+            table_df = dimensions.key_table(
+                table, self.table_cleaners()[table](read_table(raw_csv, SCHEMAS[table]))
+            )
+            table_df.to_csv(f"{self.clean_input_dir}/{table}.csv", index=False)
+            cache.store(table, key, table_df)
+        return table_df
+
+    def ingest_incremental(
+        self, store: Optional[MatchStore] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Cleans only the matches in the raw CSVs that are new or changed since the last
+        ingest, adds them to the persistent match store and returns every stored match,
+        keyed to player and team dimensions built from all of them.
+
+        Args:
+            store (MatchStore, optional): the store to ingest into. Defaults to MatchStore().
+
+        Returns:
+            Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]: all cleaned dataframes
+        """
+        if store is None:
+            store = MatchStore()
+
+        raw_tables = dict(zip(TABLES, self.read_dataset()))
+        store.ingest(raw_tables, self.table_cleaners(), CLEANING_VERSION)
+
+        stored = [store.load(table) for table in TABLES]
+        batting_df, bowling_df, details_df, summary_df = Dimensions.build(
+            *stored
+        ).key_tables(*stored)
         return batting_df, bowling_df, details_df, summary_df
 
+    def table_cleaners(self) -> dict:
+        """Returns the cleaning function of every table."""
+        return {
+            "batting_card": self.clean_batting,
+            "bowling_card": self.clean_bowling,
+            "details": self.clean_details,
+            "summary": self.clean_summary,
+        }
+
     def clean_dataframe(
         self, batting_df, bowling_df, details_df, summary_df
     ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Main function that co-ordinates the cleaning of all Dataframes
 
+        The player and team dimensions are built from the cleaned tables and written
+        to players.csv and teams.csv, and every table is keyed to their integer ids:
+        player_id and team_id on the cards, batsman_player_id, bowler_player_id and
+        team_id on details, and home_team_id, away_team_id and winner_id on summary.
+
         Args:
             batting_df (pd.DataFrame): batting_card.csv dataframe
             bowling_df (pd.DataFrame): bowling_card.csv dataframe
@@ -35,17 +228,24 @@ class DatasetCleaner:
             summary_df (pd.DataFrame): summary.csv dataframe
 
         Returns:
-            Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]: all cleaned dataframes
+            Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]: all cleaned and
+            keyed dataframes
         """
         batting_df = self.clean_batting(batting_df)
         bowling_df = self.clean_bowling(bowling_df)
         details_df = self.clean_details(details_df)
         summary_df = self.clean_summary(summary_df)
 
-        batting_df.to_csv("./input/clean_input/batting_card.csv", index=False)
-        bowling_df.to_csv("./input/clean_input/bowling_card.csv", index=False)
-        details_df.to_csv("./input/clean_input/details.csv", index=False)
-        summary_df.to_csv("./input/clean_input/summary.csv", index=False)
+        dimensions = Dimensions.build(batting_df, bowling_df, details_df, summary_df)
+        batting_df, bowling_df, details_df, summary_df = dimensions.key_tables(
+            batting_df, bowling_df, details_df, summary_df
+        )
+        dimensions.to_csv(self.clean_input_dir)
+
+        for table, table_df in zip(
+            TABLES, (batting_df, bowling_df, details_df, summary_df)
+        ):
+            table_df.to_csv(f"{self.clean_input_dir}/{table}.csv", index=False)
         return batting_df, bowling_df, details_df, summary_df
 
     def clean_batting(self, batting_df: pd.DataFrame) -> pd.DataFrame:
@@ -145,4 +345,13 @@ class DatasetCleaner:
         if duplicate_rows > 0:
             logging.error("Duplicate rows were detected for /input/summary.csv")
 
+        # a few fixtures have no season, take it from the year they start in
+        summary_df = summary_df.assign(
+            season=summary_df["season"].fillna(
+                pd.to_numeric(
+                    summary_df["start_date"].astype(str).str[:4], errors="coerce"
+                )
+            )
+        )
+
         return summary_df
@@ -0,0 +1,53 @@
+from typing import Any, Optional
+
+import pandas as pd
+
+from src.analysis_graph import AnalysisGraph
+from src.catalog import QUERIES
+
+
+def to_frame(
+    result: Any, name: str, key: Optional[str] = None, value: Optional[str] = None
+) -> pd.DataFrame:
+    """Turns the result of an explorer method into a flat table.
+
+    Dataframes and series keep a named index as columns. A dictionary becomes one row
+    per key, in a key column, when key is given and a single row otherwise. Scalars
+    become a single cell under name.
+    """
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        unnamed = all(level is None for level in result.index.names)
+        return pd.DataFrame(result.reset_index(drop=unnamed))
+    if isinstance(result, dict):
+        if key is None:
+            return pd.DataFrame([result])
+        if value is None:
+            rows = pd.DataFrame.from_dict(result, orient="index")
+        else:
+            rows = (
+                pd.Series(result, name=value, dtype=object).infer_objects().to_frame()
+            )
+        return rows.rename_axis(key).reset_index()
+    return pd.DataFrame({name: [result]})
+
+
+def run_query(
+    graph: AnalysisGraph, subject: str, name: str, *args: Any
+) -> pd.DataFrame:
+    """Computes a query on the graph, loading only the tables its explorer needs.
+
+    Args:
+        graph (AnalysisGraph): the analysis graph, see analysis_graph.build_pipeline
+        subject (str): subject of the query, e.g. "summary"
+        name (str): name of the query, e.g. "team-wins"
+        *args: the arguments of the query, converted by its params
+
+    Returns:
+        pd.DataFrame: the result as a flat table
+    """
+    query = QUERIES[subject][name]
+    args = tuple(convert(value) for (_, convert), value in zip(query.params, args))
+    result = getattr(graph.get(query.node), query.method)(*args)
+    if query.item is not None:
+        result = result[query.item]
+    return to_frame(result, name, query.key, query.value)
@@ -0,0 +1,342 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.catalog import DEFAULT_SEASONS
+from src.explore_bowling import overs_to_balls
+from src.explore_summary import parse_scorecards
+from src.instrumentation import PROFILER
+
+# points of a league win and of a no result, for each side; played matches count the
+# points actually awarded where the summary has them, bonus points included
+POINTS_FOR_WIN: int = 4
+POINTS_FOR_NO_RESULT: int = 2
+
+# teams reaching the playoffs: semi-finals of 1st v 4th and 2nd v 3rd, then the final
+QUALIFIERS: int = 4
+
+# league fixtures are described as e.g. "26th Match (D/N), SA20 at Centurion, ..."
+LEAGUE_PATTERN: str = r"\d+(?:st|nd|rd|th) Match"
+
+# the win rate behind a team's strength counts this many extra games, half of them
+# won, so a team with few results is rated close to even
+PRIOR_GAMES: float = 2.0
+# weight of the net run rate in a team's strength, on the log-odds scale
+NRR_WEIGHT: float = 0.5
+
+# seasons replayed per task, every task draws from its own seed
+CHUNK_SEASONS: int = 25_000
+# upper bound on the number of simulation processes
+MAX_SIMULATION_WORKERS: int = 8
+
+
+@dataclass(frozen=True)
+class SeasonState:
+    """The league table so far and the fixtures left to play.
+
+    Attributes:
+        teams (Tuple[str, ...]): team codes, sorted
+        points (np.ndarray): league points of every team
+        net_run_rate (np.ndarray): net run rate of every team, breaks ties on points
+        strengths (np.ndarray): strength of every team on the log-odds scale
+        home (np.ndarray): team index of the home side of every remaining fixture
+        away (np.ndarray): team index of the away side of every remaining fixture
+    """
+
+    teams: Tuple[str, ...]
+    points: np.ndarray
+    net_run_rate: np.ndarray
+    strengths: np.ndarray
+    home: np.ndarray
+    away: np.ndarray
+
+    def win_probabilities(self) -> np.ndarray:
+        """Returns the chance of team i beating team j at row i and column j."""
+        difference = self.strengths[:, None] - self.strengths[None, :]
+        return 1 / (1 + np.exp(-difference))
+
+
+def season_state(
+    summary_df: pd.DataFrame, as_of: Optional[pd.Timestamp] = None
+) -> SeasonState:
+    """Builds the league table and team strengths from the league results in summary_df.
+
+    Played matches count the points awarded in the summary, bonus points included, and
+    POINTS_FOR_WIN where it has none. A team's strength is the log-odds of its win
+    rate, shrunk towards even by PRIOR_GAMES, plus NRR_WEIGHT times its net run rate. A
+    team bowled out, or whose score has no overs because it batted them all out, is
+    charged the full 20 overs, as in the net run rate of the league.
+
+    Only the league is conditioned on: playoff fixtures are always simulated, even
+    when they have already been played.
+
+    Args:
+        summary_df (pd.DataFrame): the cleaned summary
+        as_of (pd.Timestamp, optional): treat every league fixture starting at or after
+        this time as not played yet. Defaults to None, the actual results.
+
+    Returns:
+        SeasonState: the table and remaining fixtures
+    """
+    description = summary_df["description"].astype(str)
+    league = summary_df[description.str.contains(LEAGUE_PATTERN)]
+    teams = tuple(
+        sorted(
+            set(league["home_team"].astype(str)) | set(league["away_team"].astype(str))
+        )
+    )
+    team_index = {team: index for index, team in enumerate(teams)}
+
+    result = league["result"].astype(str)
+    played = ~result.str.startswith("Starts at")
+    if as_of is not None:
+        start_dates = pd.to_datetime(
+            league["start_date"], format="%Y-%m-%dT%H:%MZ", utc=True
+        )
+        played &= start_dates < as_of
+    no_result = played & result.str.contains("No result|abandoned")
+    decided = played & ~no_result
+
+    home = league["home_team"].astype(str).map(team_index).to_numpy()
+    away = league["away_team"].astype(str).map(team_index).to_numpy()
+    winner = league["winner"].astype(str).map(team_index)
+
+    # e.g. "Pretoria Capitals 5, Paarl Royals 0", the winner is awarded the most points
+    awarded = (
+        league["points"]
+        .astype("string")
+        .str.extractall(r" (\d+)(?:,|$)")[0]
+        .astype("int64")
+        .groupby(level=0)
+        .agg(["max", "min"])
+        .reindex(league.index)
+    )
+    points = np.zeros(len(teams), dtype="int64")
+    np.add.at(
+        points,
+        winner[decided].to_numpy("int64"),
+        awarded["max"][decided].fillna(POINTS_FOR_WIN).to_numpy("int64"),
+    )
+    loser = np.where(winner.to_numpy() == home, away, home)
+    np.add.at(
+        points,
+        loser[decided.to_numpy()],
+        awarded["min"][decided].fillna(0).to_numpy("int64"),
+    )
+    for side in [home, away]:
+        np.add.at(points, side[no_result.to_numpy()], POINTS_FOR_NO_RESULT)
+
+    wins = np.bincount(winner[decided].to_numpy("int64"), minlength=len(teams))
+    games = np.bincount(home[decided.to_numpy()], minlength=len(teams)) + np.bincount(
+        away[decided.to_numpy()], minlength=len(teams)
+    )
+
+    # runs and balls of every decided match for the side that scored them and against
+    # the side that conceded them
+    scorecards = parse_scorecards(league[decided.to_numpy()])
+    scored = np.zeros(len(teams))
+    faced = np.zeros(len(teams))
+    conceded = np.zeros(len(teams))
+    bowled = np.zeros(len(teams))
+    for batting, bowling in [("home", "away"), ("away", "home")]:
+        runs = scorecards[f"{batting}_runs"].fillna(0).to_numpy("float64")
+        # scores without overs, e.g. "226/5", were batted out over the full 20 overs
+        full_overs = (
+            scorecards[f"{batting}_wickets"].fillna(0).to_numpy("int64") == 10
+        ) | (
+            scorecards[f"{batting}_overs"].isna()
+            & scorecards[f"{batting}_runs"].notna()
+        ).to_numpy()
+        balls = np.where(
+            full_overs,
+            120,
+            overs_to_balls(scorecards[f"{batting}_overs"].fillna(0)).to_numpy(),
+        )
+        batting_index = scorecards[f"{batting}_team"].astype(str).map(team_index)
+        bowling_index = scorecards[f"{bowling}_team"].astype(str).map(team_index)
+        np.add.at(scored, batting_index.to_numpy("int64"), runs)
+        np.add.at(faced, batting_index.to_numpy("int64"), balls)
+        np.add.at(conceded, bowling_index.to_numpy("int64"), runs)
+        np.add.at(bowled, bowling_index.to_numpy("int64"), balls)
+    net_run_rate = np.where(faced > 0, scored / np.maximum(faced, 1) * 6, 0) - np.where(
+        bowled > 0, conceded / np.maximum(bowled, 1) * 6, 0
+    )
+
+    win_rate = (wins + PRIOR_GAMES / 2) / (games + PRIOR_GAMES)
+    remaining = (~played).to_numpy()
+    return SeasonState(
+        teams=teams,
+        points=points,
+        net_run_rate=net_run_rate,
+        strengths=np.log(win_rate / (1 - win_rate)) + NRR_WEIGHT * net_run_rate,
+        home=home[remaining].astype("int64"),
+        away=away[remaining].astype("int64"),
+    )
+
+
+def simulate_chunk(
+    state: SeasonState, seasons: int, seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Replays the rest of the league and the playoffs seasons times at once.
+
+    Every remaining fixture of every replay is a single uniform draw against the chance
+    of the home side winning, and the table is ranked on points, then the current net
+    run rate.
+
+    Args:
+        state (SeasonState): the table and remaining fixtures
+        seasons (int): number of replays
+        seed (np.random.SeedSequence): seed of the random draws
+
+    Returns:
+        np.ndarray: per team, the replays in which it qualified, topped the table and
+        won the title, one row each
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = state.win_probabilities()
+    teams = len(state.teams)
+
+    home_won = (
+        rng.random((seasons, len(state.home))) < probabilities[state.home, state.away]
+    )
+    # one-hot fixtures by team, so the wins of every replay are two matrix products
+    home_teams = np.eye(teams, dtype="float32")[state.home]
+    away_teams = np.eye(teams, dtype="float32")[state.away]
+    wins = (
+        home_won.astype("float32") @ home_teams
+        + (~home_won).astype("float32") @ away_teams
+    )
+
+    # net run rate only breaks ties, so it is worth less than a single point
+    nrr_rank = np.argsort(np.argsort(-state.net_run_rate, kind="stable"))
+    ranking = state.points + POINTS_FOR_WIN * wins + (teams - nrr_rank) / (teams + 1)
+    standings = np.argsort(-ranking, axis=1, kind="stable")
+
+    counts = np.zeros((3, teams), dtype="int64")
+    counts[0] = np.bincount(standings[:, :QUALIFIERS].ravel(), minlength=teams)
+    counts[1] = np.bincount(standings[:, 0], minlength=teams)
+
+    # semi-finals of 1st v 4th and 2nd v 3rd, then the final
+    draws = rng.random((seasons, 3))
+    first, second, third, fourth = standings[:, :QUALIFIERS].T
+    semi_1 = np.where(draws[:, 0] < probabilities[first, fourth], first, fourth)
+    semi_2 = np.where(draws[:, 1] < probabilities[second, third], second, third)
+    champion = np.where(draws[:, 2] < probabilities[semi_1, semi_2], semi_1, semi_2)
+    counts[2] = np.bincount(champion, minlength=teams)
+    return counts
+
+
+def simulation_task(
+    task: Tuple[SeasonState, int, np.random.SeedSequence],
+) -> np.ndarray:
+    """Runs a single simulate_chunk task, this runs inside the worker processes."""
+    return simulate_chunk(*task)
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """The odds of every team and how fast they were simulated.
+
+    Attributes:
+        table (pd.DataFrame): team, points, net_run_rate, strength, remaining fixtures
+            and the qualification, top of table and title probabilities, most likely
+            champion first
+        seasons (int): number of replayed seasons
+        seconds (float): wall time of the simulation
+        workers (int): number of processes
+    """
+
+    table: pd.DataFrame
+    seasons: int
+    seconds: float
+    workers: int
+
+    @property
+    def seasons_per_second(self) -> float:
+        return self.seasons / self.seconds if self.seconds else float("inf")
+
+
+class SeasonSimulator:
+    """Monte Carlo replays of the rest of a season and its playoffs.
+
+    Replays are split into tasks of CHUNK_SEASONS, each drawing from its own child of
+    a single seed sequence, so the odds only depend on the seed and the number of
+    seasons, not on how many processes share the tasks.
+
+    Attributes:
+        state (SeasonState): the table, strengths and remaining fixtures
+    """
+
+    def __init__(self, summary_df: pd.DataFrame, as_of: Optional[str] = None):
+        self.state = season_state(
+            summary_df, pd.Timestamp(as_of, tz="UTC") if as_of else None
+        )
+
+    def simulate(
+        self,
+        seasons: int = DEFAULT_SEASONS,
+        max_workers: Optional[int] = None,
+        seed: int = 0,
+    ) -> SimulationResult:
+        """Replays the season seasons times across a bounded process pool.
+
+        Args:
+            seasons (int, optional): number of replays. Defaults to DEFAULT_SEASONS.
+            max_workers (int, optional): number of processes. Defaults to the number of
+            cores, capped at MAX_SIMULATION_WORKERS.
+            seed (int, optional): seed of the replays. Defaults to 0.
+
+        Returns:
+            SimulationResult: the odds of every team and the throughput
+        """
+        if seasons < 1:
+            raise ValueError("seasons must be at least 1")
+        sizes = [CHUNK_SEASONS] * (seasons // CHUNK_SEASONS)
+        if seasons % CHUNK_SEASONS:
+            sizes.append(seasons % CHUNK_SEASONS)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(self.state, size, child) for size, child in zip(sizes, seeds)]
+
+        if max_workers is None:
+            max_workers = min(os.cpu_count() or 1, MAX_SIMULATION_WORKERS)
+        max_workers = max(1, min(max_workers, len(tasks)))
+
+        started = time.perf_counter()
+        if max_workers == 1:
+            counts = [simulation_task(task) for task in tasks]
+        else:
+            # the workers' stages would never be reported, so they do not record any
+            with ProcessPoolExecutor(
+                max_workers=max_workers, initializer=PROFILER.disable
+            ) as executor:
+                counts = list(executor.map(simulation_task, tasks))
+        seconds = time.perf_counter() - started
+
+        qualified, top, titles = np.sum(counts, axis=0) / seasons
+        state = self.state
+        table = pd.DataFrame(
+            {
+                "team": list(state.teams),
+                "points": state.points,
+                "net_run_rate": state.net_run_rate,
+                "strength": state.strengths,
+                "remaining": np.bincount(state.home, minlength=len(state.teams))
+                + np.bincount(state.away, minlength=len(state.teams)),
+                "qualification_probability": qualified,
+                "top_of_table_probability": top,
+                "title_probability": titles,
+            }
+        )
+        table = table.sort_values(
+            ["title_probability", "points"], ascending=False, kind="mergesort"
+        ).reset_index(drop=True)
+        return SimulationResult(table, seasons, seconds, max_workers)
+
+    def season_odds(self, seasons: int = DEFAULT_SEASONS) -> pd.DataFrame:
+        """Returns the qualification, top of table and title odds of every team."""
+        return self.simulate(seasons).table
@@ -0,0 +1,319 @@
+import datetime
+import functools
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from src import analysis_graph, queries
+from src.delivery_store import DeliveryStore
+from src.explore_summary import select_matches
+from src.matchups import MatchupMatrix
+from src.process_dataset import TABLES, DatasetCleaner
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8020
+DEFAULT_CACHE_SIZE: int = 256
+
+# result columns the player, team and side filters apply to, first match wins
+PLAYER_COLUMNS: Tuple[str, ...] = ("full_name", "batsman_name", "bowler_name")
+TEAM_COLUMNS: Tuple[str, ...] = ("team", "current_innings")
+SIDES: Tuple[str, ...] = ("home", "away")
+FILTERS: Tuple[str, ...] = ("season", "venue", "player", "team", "side")
+
+
+class QueryError(ValueError):
+    """A query that cannot be answered as asked, e.g. a missing or invalid parameter."""
+
+
+def filter_table(
+    table: pd.DataFrame,
+    player: Optional[str] = None,
+    team: Optional[str] = None,
+    side: Optional[str] = None,
+) -> pd.DataFrame:
+    """Keeps the rows of a single player or team, and the columns of a single side.
+
+    Args:
+        table (pd.DataFrame): the result of a query
+        player (str, optional): full name of the player. Defaults to None.
+        team (str, optional): team code, e.g. "JSK". Defaults to None.
+        side (str, optional): "home" or "away", drops the columns of the other side.
+        Defaults to None.
+
+    Returns:
+        pd.DataFrame: the filtered table
+    """
+    for value, columns, name in [
+        (player, PLAYER_COLUMNS, "player"),
+        (team, TEAM_COLUMNS, "team"),
+    ]:
+        if value is None:
+            continue
+        column = next((column for column in columns if column in table.columns), None)
+        if column is None:
+            raise QueryError(f"This query cannot be filtered by {name}")
+        table = table[table[column].astype(object) == value]
+
+    if side is not None:
+        if side not in SIDES:
+            raise QueryError(f"side must be one of {', '.join(SIDES)}")
+        other = next(other for other in SIDES if other != side)
+        table = table.drop(
+            columns=[
+                column for column in table.columns if column.startswith(f"{other}_")
+            ]
+        )
+    return table.reset_index(drop=True)
+
+
+class StatsService:
+    """Answers stat queries from cleaned tables and explorers kept in memory.
+
+    The tables are loaded once, by reload, and every explorer is built on first use and
+    then kept. Query results and responses are memoized in LRU caches that reload
+    replaces, so nothing computed from the previous data is ever served after a reload.
+
+    Attributes:
+        cleaner (DatasetCleaner): loads the cleaned tables
+        cache_size (int): number of responses kept in the LRU cache
+    """
+
+    def __init__(
+        self,
+        cleaner: Optional[DatasetCleaner] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.cleaner = cleaner if cleaner is not None else DatasetCleaner()
+        self.cache_size = cache_size
+        self.reload()
+
+    def reload(self) -> None:
+        """Reloads the cleaned tables and drops every explorer and cached response."""
+        self.tables: Dict[str, pd.DataFrame] = dict(
+            zip(TABLES, self.cleaner.load_dataset())
+        )
+        self.dimensions = self.cleaner.load_dimensions()
+        self.store = DeliveryStore.open(f"{self.cleaner.raw_input_dir}/details.csv")
+        self.graphs: Dict[
+            Tuple[Optional[int], Optional[str]], analysis_graph.AnalysisGraph
+        ] = {}
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc)
+        self.table = functools.lru_cache(maxsize=self.cache_size)(self._table)
+        self.respond = functools.lru_cache(maxsize=self.cache_size)(self._respond)
+
+        # build the explorers of the whole dataset up front, so queries find them warm
+        graph = self.graph()
+        for node in [
+            "batting",
+            "bowling",
+            "details",
+            "matchup_details",
+            "details_frame",
+            "summary",
+        ]:
+            graph.get(node)
+
+    def graph(
+        self, season: Optional[int] = None, venue: Optional[str] = None
+    ) -> analysis_graph.AnalysisGraph:
+        """Returns the analysis graph of a season and/or venue, or of every match, over
+        the loaded tables. Graphs are kept, so their explorers and analyses are computed
+        once."""
+        if (season, venue) not in self.graphs:
+            tables = self.tables
+            store = self.store
+            if season is not None or venue is not None:
+                match_ids = select_matches(tables["summary"], season, venue)
+                tables = {
+                    table: table_df[
+                        table_df["id" if table == "summary" else "match_id"].isin(
+                            match_ids
+                        )
+                    ]
+                    for table, table_df in tables.items()
+                }
+                store = store.filter(match_id=match_ids)
+
+            graph = analysis_graph.build_pipeline(self.cleaner)
+            for table, node in zip(TABLES, analysis_graph.TABLE_NODES):
+                graph.set(node, tables[table])
+            graph.set("dimensions", self.dimensions)
+            graph.set("delivery_store", store)
+            if store is not self.store:
+                graph.set("matchups", MatchupMatrix.build(store))
+            self.graphs[season, venue] = graph
+        return self.graphs[season, venue]
+
+    def query(self, subject: str, name: str, params: Dict[str, str]) -> pd.DataFrame:
+        """Answers a query, see queries.QUERIES. The unfiltered result is cached, so
+        filtering it by another player or team does not compute it again.
+
+        Args:
+            subject (str): subject of the query, e.g. "batting"
+            name (str): name of the query, e.g. "performances"
+            params (Dict[str, str]): the arguments of the query by name, plus any of the
+            season, venue, player, team and side filters
+
+        Returns:
+            pd.DataFrame: the result
+        """
+        if name not in queries.QUERIES.get(subject, {}):
+            raise KeyError(f"Unknown query {subject}/{name}")
+        query = queries.QUERIES[subject][name]
+
+        params = dict(params)
+        missing = [param for param, _ in query.params if param not in params]
+        if missing:
+            raise QueryError(f"Missing parameters: {', '.join(missing)}")
+        args = tuple(params.pop(param) for param, _ in query.params)
+        unknown = [param for param in params if param not in FILTERS]
+        if unknown:
+            raise QueryError(f"Unknown parameters: {', '.join(unknown)}")
+
+        try:
+            season = int(params["season"]) if "season" in params else None
+        except ValueError:
+            raise QueryError("season must be a year, e.g. 2023")
+
+        return filter_table(
+            self.table(subject, name, args, season, params.get("venue")),
+            player=params.get("player"),
+            team=params.get("team"),
+            side=params.get("side"),
+        )
+
+    def _table(
+        self,
+        subject: str,
+        name: str,
+        args: Tuple[str, ...],
+        season: Optional[int],
+        venue: Optional[str],
+    ) -> pd.DataFrame:
+        try:
+            return queries.run_query(self.graph(season, venue), subject, name, *args)
+        except KeyError as error:
+            raise QueryError(f"Nothing found for {error.args[0]}")
+        except ValueError as error:
+            raise QueryError(f"Invalid parameter: {error}")
+
+    def _respond(
+        self, subject: str, name: str, params: Tuple[Tuple[str, str], ...]
+    ) -> str:
+        return self.query(subject, name, dict(params)).to_json(
+            orient="records", date_format="iso"
+        )
+
+    def index(self) -> dict:
+        """Describes every query and its parameters."""
+        return {
+            "queries": {
+                subject: {
+                    name: {
+                        "description": query.description,
+                        "params": [param for param, _ in query.params],
+                    }
+                    for name, query in subject_queries.items()
+                }
+                for subject, subject_queries in queries.QUERIES.items()
+            },
+            "filters": list(FILTERS),
+        }
+
+    def status(self) -> dict:
+        """Returns when the tables were loaded and the statistics of the LRU cache."""
+        cache_info = self.respond.cache_info()
+        table_cache_info = self.table.cache_info()
+        return {
+            "loaded_at": self.loaded_at.isoformat(),
+            "rows": {table: len(table_df) for table, table_df in self.tables.items()},
+            "cache": {
+                "hits": cache_info.hits,
+                "misses": cache_info.misses,
+                "size": cache_info.currsize,
+                "max_size": cache_info.maxsize,
+                "table_hits": table_cache_info.hits,
+                "table_misses": table_cache_info.misses,
+            },
+        }
+
+
+def make_handler(service: StatsService) -> type:
+    """Creates the request handler class answering requests from service.
+
+    GET / lists the queries, GET /status shows the cache, GET /<subject>/<query>?...
+    answers a query with JSON records and POST /reload reloads the data.
+    """
+
+    class StatsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            parts = [part for part in url.path.split("/") if part]
+            if not parts:
+                self.send_json(200, json.dumps(service.index()))
+            elif parts == ["status"]:
+                self.send_json(200, json.dumps(service.status()))
+            elif len(parts) == 2:
+                params = tuple(sorted(parse_qsl(url.query)))
+                try:
+                    self.send_json(200, service.respond(*parts, params))
+                except KeyError as error:
+                    self.send_error_json(404, str(error.args[0]))
+                except QueryError as error:
+                    self.send_error_json(400, str(error))
+            else:
+                self.send_error_json(404, f"Unknown path {url.path}")
+
+        def do_POST(self) -> None:
+            if urlsplit(self.path).path.rstrip("/") == "/reload":
+                service.reload()
+                self.send_json(200, json.dumps(service.status()))
+            else:
+                self.send_error_json(404, f"Unknown path {self.path}")
+
+        def send_json(self, status: int, body: str) -> None:
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_error_json(self, status: int, message: str) -> None:
+            self.send_json(status, json.dumps({"error": message}))
+
+        def log_message(self, format: str, *args) -> None:
+            logging.info(f"{self.address_string()} {format % args}")
+
+    return StatsRequestHandler
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    cleaner: Optional[DatasetCleaner] = None,
+) -> None:
+    """Loads the data and answers stat queries over HTTP until interrupted.
+
+    Args:
+        host (str, optional): address to listen on. Defaults to DEFAULT_HOST.
+        port (int, optional): port to listen on. Defaults to DEFAULT_PORT.
+        cache_size (int, optional): responses kept in the LRU cache. Defaults to
+        DEFAULT_CACHE_SIZE.
+        cleaner (DatasetCleaner, optional): loads the cleaned tables. Defaults to
+        DatasetCleaner().
+    """
+    service = StatsService(cleaner, cache_size)
+    server = HTTPServer((host, port), make_handler(service))
+    print(f"Serving SA20 stats on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,692 @@
+import datetime
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# code, full name, name used in results, venue, city and venue id of the real SA20 sides
+TEAMS: List[tuple] = [
+    (
+        "PC",
+        "Pretoria Capitals",
+        "Capitals",
+        "SuperSport Park, Centurion",
+        "Centurion",
+        59079,
+    ),
+    ("PR", "Paarl Royals", "Royals", "Boland Park, Paarl", "Paarl", 59070),
+    (
+        "JSK",
+        "Joburg Super Kings",
+        "Super Kings",
+        "The Wanderers Stadium, Johannesburg",
+        "Johannesburg",
+        59120,
+    ),
+    (
+        "DSG",
+        "Durban's Super Giants",
+        "Super Giants",
+        "Kingsmead, Durban",
+        "Durban",
+        59089,
+    ),
+    ("MICT", "MI Cape Town", "MI Cape Town", "Newlands, Cape Town", "Cape Town", 59108),
+    (
+        "SEC",
+        "Sunrisers Eastern Cape",
+        "Eastern Cape",
+        "St George's Park, Gqeberha",
+        "Gqeberha",
+        59101,
+    ),
+]
+
+FIRST_NAMES: List[str] = [
+    "Aiden",
+    "Bjorn",
+    "Codi",
+    "David",
+    "Evan",
+    "Faf",
+    "George",
+    "Heinrich",
+    "Imran",
+    "Jos",
+    "Kagiso",
+    "Lungi",
+    "Marco",
+    "Nandre",
+    "Ottniel",
+    "Phil",
+    "Quinton",
+    "Rilee",
+    "Sisanda",
+    "Temba",
+    "Wayne",
+    "Reeza",
+    "Dewald",
+    "Anrich",
+    "Tabraiz",
+    "Keshav",
+]
+LAST_NAMES: List[str] = [
+    "Markram",
+    "Fortuin",
+    "Yusuf",
+    "Miller",
+    "Jones",
+    "du Plessis",
+    "Garton",
+    "Klaasen",
+    "Tahir",
+    "Buttler",
+    "Rabada",
+    "Ngidi",
+    "Jansen",
+    "Burger",
+    "Baartman",
+    "Salt",
+    "de Kock",
+    "Rossouw",
+    "Magala",
+    "Bavuma",
+    "Parnell",
+    "Hendricks",
+    "Brevis",
+    "Nortje",
+    "Shamsi",
+    "Maharaj",
+    "Phangiso",
+    "Coetzee",
+    "Pretorius",
+    "van der Dussen",
+]
+
+# outcome probabilities of a legal delivery, roughly those of the 2023 season
+RUN_VALUES: np.ndarray = np.array([0, 1, 2, 3, 4, 5, 6])
+RUN_PROBABILITIES: np.ndarray = np.array(
+    [0.37, 0.40, 0.066, 0.004, 0.105, 0.002, 0.053]
+)
+WICKET_PROBABILITY: float = 0.052
+WIDE_PROBABILITY: float = 0.033
+NOBALL_PROBABILITY: float = 0.004
+NO_RESULT_PROBABILITY: float = 0.03
+SQUAD_SIZE: int = 16
+COMMENTARY_WORDS: List[str] = (
+    "full on the pads length back of a good outside off drives punches flicks pulls "
+    "cuts edges misses tucks swings lofts wide yorker bouncer slower ball into the gap "
+    "over cover deep midwicket long on fine leg third man point square"
+).split()
+
+
+class SyntheticDataGenerator:
+    """Generates raw SA20 style CSVs with exactly the columns of input/raw_input.
+
+    Every match is simulated ball by ball and the batting card, bowling card and summary
+    are derived from the simulated deliveries, so all four tables agree with each other.
+    Output is appended season by season, so memory does not grow with the number of
+    seasons.
+    """
+
+    def __init__(self, teams: int = 6, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.teams = [self.make_team(index) for index in range(teams)]
+        self.next_match_id = 1343941
+        self.next_player_id = 500000
+
+    def make_team(self, index: int) -> dict:
+        if index < len(TEAMS):
+            code, name, result_name, venue, city, venue_id = TEAMS[index]
+        else:
+            code, name = f"T{index + 1}", f"Team {index + 1}"
+            result_name, venue, city = name, f"Stadium {index + 1}", f"City {index + 1}"
+            venue_id = 60000 + index
+        return {
+            "code": code,
+            "name": name,
+            "result_name": result_name,
+            "venue": venue,
+            "city": city,
+            "venue_id": venue_id,
+            "squad": [],
+        }
+
+    def make_player(self) -> dict:
+        first = self.rng.choice(FIRST_NAMES)
+        last = self.rng.choice(LAST_NAMES)
+        self.next_player_id += 1
+        return {
+            "id": self.next_player_id,
+            "full_name": f"{first} {last} {self.next_player_id % 1000}",
+            "name": f"{first[0]} {last} {self.next_player_id % 1000}",
+            "batting": self.rng.uniform(0.6, 1.4),
+            "bowling": self.rng.uniform(0.6, 1.4),
+        }
+
+    def refresh_squads(self) -> None:
+        """Replaces a few players of every squad between seasons."""
+        for team in self.teams:
+            keep = [player for player in team["squad"] if self.rng.random() > 0.2]
+            team["squad"] = keep + [
+                self.make_player() for _ in range(SQUAD_SIZE - len(keep))
+            ]
+            team["squad"].sort(key=lambda player: -player["batting"])
+
+    def generate(
+        self,
+        out_dir: str,
+        seasons: int = 1,
+        matches_per_season: int = 30,
+        upcoming: int = 3,
+        first_season: int = 2023,
+    ) -> Dict[str, int]:
+        """Writes batting_card.csv, bowling_card.csv, details.csv and summary.csv to out_dir.
+
+        Args:
+            out_dir (str): folder to write the CSVs to
+            seasons (int, optional): number of seasons. Defaults to 1.
+            matches_per_season (int, optional): matches per season. Defaults to 30.
+            upcoming (int, optional): matches at the end of the last season that have not
+            been played yet, like the play-offs in the real data. Defaults to 3.
+            first_season (int, optional): year of the first season. Defaults to 2023.
+
+        Returns:
+            Dict[str, int]: number of rows written to every table
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        rows = {"batting_card": 0, "bowling_card": 0, "details": 0, "summary": 0}
+
+        for season_index in range(seasons):
+            season = first_season + season_index
+            self.refresh_squads()
+            tables: Dict[str, List[dict]] = {table: [] for table in rows}
+            start = datetime.datetime(season, 1, 10, 15, 30)
+
+            for match_index in range(matches_per_season):
+                home, away = self.fixture(match_index)
+                date = start + datetime.timedelta(days=int(match_index * 0.9))
+                unplayed = (
+                    season_index == seasons - 1
+                    and match_index >= matches_per_season - upcoming
+                )
+                self.simulate_match(
+                    tables, season, match_index, home, away, date, unplayed
+                )
+
+            for table, table_rows in tables.items():
+                path = os.path.join(out_dir, f"{table}.csv")
+                pd.DataFrame(table_rows, columns=COLUMNS[table]).to_csv(
+                    path,
+                    mode="w" if season_index == 0 else "a",
+                    header=season_index == 0,
+                    index=False,
+                )
+                rows[table] += len(table_rows)
+
+        return rows
+
+    def fixture(self, match_index: int) -> tuple:
+        """Picks the home and away side of a match in a rotating round robin."""
+        count = len(self.teams)
+        home = match_index % count
+        away = (home + 1 + (match_index // count) % (count - 1)) % count
+        return self.teams[home], self.teams[away]
+
+    def simulate_match(
+        self,
+        tables: Dict[str, List[dict]],
+        season: int,
+        match_index: int,
+        home: dict,
+        away: dict,
+        date: datetime.datetime,
+        unplayed: bool,
+    ) -> None:
+        self.next_match_id += 1
+        match = {
+            "season": season,
+            "match_id": self.next_match_id,
+            "match_name": f"{home['code']} v {away['code']}",
+            "home_team": home["code"],
+            "away_team": away["code"],
+            "venue": home["venue"],
+            "city": home["city"],
+            "country": "South Africa",
+        }
+        summary = {
+            "season": season if not unplayed else np.nan,
+            "id": match["match_id"],
+            "name": f"{home['name']} v {away['name']}",
+            "short_name": match["match_name"],
+            "description": f"{match_index + 1}th Match, SA20 at {home['city']}, "
+            f"{date:%b} {date.day} {date.year}",
+            "home_team": home["code"],
+            "away_team": away["code"],
+            "start_date": f"{date:%Y-%m-%dT%H:%MZ}",
+            "end_date": f"{date + datetime.timedelta(days=1):%Y-%m-%d}T23:59Z",
+            "venue_id": home["venue_id"],
+            "venue_name": home["venue"],
+            "super_over": False,
+        }
+
+        if unplayed:
+            summary.update(winner="TBA", result="Starts at 17:30 local time")
+            tables["summary"].append(summary)
+            return
+
+        toss = home if self.rng.random() < 0.5 else away
+        decision = "BOWL FIRST" if self.rng.random() < 0.75 else "BAT FIRST"
+        batting_first = (
+            toss if decision == "BAT FIRST" else (away if toss is home else home)
+        )
+        bowling_first = away if batting_first is home else home
+
+        # a few matches are washed out part of the way through the first innings
+        max_overs = 20
+        if self.rng.random() < NO_RESULT_PROBABILITY:
+            max_overs = int(self.rng.integers(2, 15))
+
+        first = self.simulate_innings(
+            tables, match, 1, batting_first, bowling_first, None, max_overs
+        )
+        innings = {batting_first["code"]: first}
+        if max_overs == 20:
+            innings[bowling_first["code"]] = self.simulate_innings(
+                tables, match, 2, bowling_first, batting_first, first["runs"] + 1, 20
+            )
+
+        summary.update(
+            toss_won=toss["name"],
+            decision=decision,
+            home_captain=home["squad"][0]["full_name"],
+            away_captain=away["squad"][0]["full_name"],
+            points=f"{home['name']} 0, {away['name']} 0",
+            match_days=f"{date.day} {date:%B} {date.year} (20-over match)",
+            umpire1="Shaun George",
+            umpire2="Arno Jacobs",
+            tv_umpire="Stephen Harris",
+            referee="Gerrie Pienaar",
+            reserve_umpire="Brad White",
+        )
+        for side, team in [("home", home), ("away", away)]:
+            team_innings = innings.get(team["code"])
+            if team_innings is None:
+                continue
+            summary[f"{side}_score"] = team_innings["score"]
+            summary[f"{side}_overs"] = team_innings["overs"]
+            summary[f"{side}_runs"] = team_innings["runs"]
+            summary[f"{side}_wickets"] = team_innings["wickets"]
+            summary[f"{side}_boundaries"] = team_innings["boundaries"]
+            summary[f"{side}_key_batsman"] = ",".join(team_innings["top_batsmen"])
+            summary[f"{side}_key_bowler"] = ",".join(
+                innings.get(
+                    (away if team is home else home)["code"], {"top_bowlers": []}
+                )["top_bowlers"]
+            )
+            summary[f"{side}_playx1"] = ",".join(
+                f"{player['full_name']} (UKN)" for player in team["squad"][:11]
+            )
+
+        if max_overs < 20:
+            summary[f"{'home' if batting_first is home else 'away'}_score"] = (
+                f"{first['score']} ({first['overs']}/20 ov)"
+            )
+            summary.update(winner="TBA", result="No result")
+            tables["summary"].append(summary)
+            return
+
+        second = innings[bowling_first["code"]]
+        summary["1st_inning_score"] = first["score"]
+        summary["2nd_inning_score"] = second["score"]
+        chasing_side = "home" if bowling_first is home else "away"
+        summary[f"{chasing_side}_score"] = (
+            f"{second['score']} ({second['overs']} ov, target {first['runs'] + 1})"
+            if second["runs"] <= first["runs"]
+            else second["score"]
+        )
+
+        if second["runs"] > first["runs"]:
+            winner = bowling_first
+            balls_left = 120 - second["balls"]
+            margin = f"{10 - second['wickets']} wkts ({balls_left}b rem)"
+        elif second["runs"] < first["runs"]:
+            winner = batting_first
+            margin = f"{first['runs'] - second['runs']} runs"
+        else:
+            winner = batting_first if self.rng.random() < 0.5 else bowling_first
+            margin = None
+            summary["super_over"] = True
+
+        summary["winner"] = winner["code"]
+        summary["result"] = (
+            f"{winner['result_name']} won by {margin}"
+            if margin
+            else f"Match tied ({winner['result_name']} won the Super Over)"
+        )
+        loser = away if winner is home else home
+        summary["points"] = f"{winner['name']} 4, {loser['name']} 0"
+        summary["pom"] = innings[winner["code"]]["top_batsmen"][0]
+        tables["summary"].append(summary)
+
+    def simulate_innings(
+        self,
+        tables: Dict[str, List[dict]],
+        match: dict,
+        innings_id: int,
+        batting: dict,
+        bowling: dict,
+        target: Optional[int],
+        max_overs: int,
+    ) -> dict:
+        """Simulates one innings ball by ball and appends its deliveries, batting card
+        and bowling card rows to tables.
+
+        Returns:
+            dict: the totals of the innings used by the summary
+        """
+        rng = self.rng
+        batsmen = batting["squad"][:11]
+        bowlers = sorted(bowling["squad"][:11], key=lambda player: -player["bowling"])[
+            :5
+        ]
+
+        batting_rows = {
+            player["id"]: {"runs": 0, "balls": 0, "fours": 0, "sixes": 0, "out": None}
+            for player in batsmen
+        }
+        bowling_rows = {
+            player["id"]: {
+                "balls": 0,
+                "runs": 0,
+                "wickets": 0,
+                "maidens": 0,
+                "dots": 0,
+                "fours": 0,
+                "sixes": 0,
+                "wides": 0,
+                "noballs": 0,
+            }
+            for player in bowlers
+        }
+
+        striker, non_striker, next_batsman = 0, 1, 2
+        runs = wickets = legal_balls = boundaries = 0
+        previous_bowler = None
+
+        for over in range(1, max_overs + 1):
+            bowler = bowlers[(over - 1) % len(bowlers)]
+            bowler_row = bowling_rows[bowler["id"]]
+            over_runs = 0
+            ball = 0
+
+            while ball < 6 and wickets < 10 and (target is None or runs < target):
+                batsman = batsmen[striker]
+                batsman_row = batting_rows[batsman["id"]]
+                is_wide = rng.random() < WIDE_PROBABILITY
+                is_noball = not is_wide and rng.random() < NOBALL_PROBABILITY
+                is_out = False
+
+                if is_wide:
+                    delivery_runs = 1
+                    bowler_row["wides"] += 1
+                else:
+                    wicket_chance = (
+                        WICKET_PROBABILITY * bowler["bowling"] / batsman["batting"]
+                    )
+                    is_out = not is_noball and rng.random() < wicket_chance
+                    delivery_runs = 0
+                    if not is_out:
+                        probabilities = RUN_PROBABILITIES.copy()
+                        probabilities[4:] *= batsman["batting"]
+                        delivery_runs = int(
+                            rng.choice(
+                                RUN_VALUES, p=probabilities / probabilities.sum()
+                            )
+                        )
+                    if is_noball:
+                        bowler_row["noballs"] += 1
+                    else:
+                        ball += 1
+                        legal_balls += 1
+                        bowler_row["balls"] += 1
+                        batsman_row["balls"] += 1
+                    batsman_row["runs"] += delivery_runs
+                    batsman_row["fours"] += delivery_runs == 4
+                    batsman_row["sixes"] += delivery_runs == 6
+                    delivery_runs += is_noball
+
+                is_boundary = delivery_runs in (4, 6) and not is_wide
+                boundaries += is_boundary
+                runs += delivery_runs
+                over_runs += delivery_runs
+                bowler_row["runs"] += delivery_runs
+                bowler_row["dots"] += delivery_runs == 0
+                bowler_row["fours"] += delivery_runs == 4
+                bowler_row["sixes"] += delivery_runs == 6
+
+                non_striker_player = batsmen[non_striker]
+                delivery = {
+                    "comment_id": innings_id * 100000
+                    + over * 1000
+                    + len(tables["details"]) % 1000,
+                    "match_id": match["match_id"],
+                    "match_name": match["match_name"],
+                    "home_team": match["home_team"],
+                    "away_team": match["away_team"],
+                    "current_innings": batting["code"],
+                    "innings_id": innings_id,
+                    "over": over,
+                    "ball": max(ball, 1),
+                    "runs": delivery_runs,
+                    "shortText": f"{bowler['name']} to {batsman['name']}, "
+                    + self.outcome_text(delivery_runs, is_out, is_wide),
+                    "isBoundary": is_boundary,
+                    "isWide": is_wide,
+                    "isNoball": is_noball,
+                    "batsman1_id": batsman["id"],
+                    "batsman1_name": batsman["full_name"],
+                    "batsman1_runs": batsman_row["runs"],
+                    "batsman1_balls": batsman_row["balls"],
+                    "bowler1_id": bowler["id"],
+                    "bowler1_name": bowler["full_name"],
+                    "bowler1_overs": bowler_row["balls"] // 6
+                    + bowler_row["balls"] % 6 / 10,
+                    "bowler1_maidens": bowler_row["maidens"],
+                    "bowler1_runs": bowler_row["runs"],
+                    "bowler1_wkts": bowler_row["wickets"] + is_out,
+                    "batsman2_id": non_striker_player["id"],
+                    "batsman2_name": non_striker_player["full_name"],
+                    "batsman2_runs": batting_rows[non_striker_player["id"]]["runs"],
+                    "batsman2_balls": batting_rows[non_striker_player["id"]]["balls"],
+                    "isRetiredHurt": False,
+                    "text": self.commentary(),
+                    "preText": self.commentary() if rng.random() < 0.15 else np.nan,
+                    "postText": self.commentary() if rng.random() < 0.05 else np.nan,
+                }
+                if previous_bowler is not None:
+                    previous_row = bowling_rows[previous_bowler["id"]]
+                    delivery.update(
+                        bowler2_id=previous_bowler["id"],
+                        bowler2_name=previous_bowler["full_name"],
+                        bowler2_overs=previous_row["balls"] // 6
+                        + previous_row["balls"] % 6 / 10,
+                        bowler2_maidens=previous_row["maidens"],
+                        bowler2_runs=previous_row["runs"],
+                        bowler2_wkts=previous_row["wickets"],
+                    )
+
+                if is_out:
+                    wickets += 1
+                    bowler_row["wickets"] += 1
+                    dismissal = self.dismissal(bowler, bowling)
+                    batsman_row["out"] = {
+                        "short_text": dismissal,
+                        "running_score": f"{{'wickets': {wickets}, 'runs': {runs}}}",
+                        "running_over": over - 1 + ball / 10,
+                    }
+                    delivery.update(
+                        wicket_id=batsman["id"],
+                        wkt_batsman_name=batsman["full_name"],
+                        wkt_bowler_name=bowler["full_name"],
+                        wkt_batsman_runs=batsman_row["runs"],
+                        wkt_batsman_balls=batsman_row["balls"],
+                        wkt_text=f"{batsman['name']} {dismissal} {batsman_row['runs']} "
+                        f"({batsman_row['balls']}b {batsman_row['fours']}x4 "
+                        f"{batsman_row['sixes']}x6)",
+                    )
+                    striker = next_batsman
+                    next_batsman += 1
+                elif delivery_runs % 2 == 1 and not is_wide:
+                    striker, non_striker = non_striker, striker
+
+                tables["details"].append(delivery)
+
+            if ball == 6:
+                bowler_row["maidens"] += over_runs == 0
+                striker, non_striker = non_striker, striker
+            previous_bowler = bowler
+
+            if wickets >= 10 or (target is not None and runs >= target):
+                break
+
+        for position, player in enumerate(batsmen):
+            row = batting_rows[player["id"]]
+            if position >= max(next_batsman, 2):
+                continue
+            out = row["out"]
+            tables["batting_card"].append(
+                {
+                    **match,
+                    "current_innings": batting["code"],
+                    "innings_id": innings_id,
+                    "name": player["name"],
+                    "fullName": player["full_name"],
+                    "runs": row["runs"],
+                    "ballsFaced": row["balls"],
+                    "minutes": int(row["balls"] * 1.3) if out else "-",
+                    "fours": row["fours"],
+                    "sixes": row["sixes"],
+                    "strikeRate": (
+                        round(row["runs"] / row["balls"] * 100, 2)
+                        if row["balls"]
+                        else 0.0
+                    ),
+                    "captain": position == 0,
+                    "isNotOut": out is None,
+                    "runningScore": out["running_score"] if out else "{}",
+                    "runningOver": out["running_over"] if out else np.nan,
+                    "shortText": out["short_text"] if out else "not out",
+                    "commentary": self.commentary() if out else np.nan,
+                    "link": np.nan,
+                }
+            )
+
+        for player in bowlers:
+            row = bowling_rows[player["id"]]
+            if row["balls"] == 0 and row["wides"] == 0:
+                continue
+            tables["bowling_card"].append(
+                {
+                    **match,
+                    "bowling_team": bowling["code"],
+                    "innings_id": innings_id,
+                    "name": player["name"],
+                    "fullName": player["full_name"],
+                    "overs": row["balls"] // 6 + row["balls"] % 6 / 10,
+                    "maidens": row["maidens"],
+                    "conceded": row["runs"],
+                    "wickets": row["wickets"],
+                    "economyRate": round(row["runs"] / max(row["balls"], 1) * 6, 2),
+                    "dots": row["dots"],
+                    "foursConceded": row["fours"],
+                    "sixesConceded": row["sixes"],
+                    "wides": row["wides"],
+                    "noballs": row["noballs"],
+                    "captain": player is bowling["squad"][0],
+                    "href": f"https://www.espncricinfo.com/ci/content/player/{player['id']}.html",
+                }
+            )
+
+        top_batsmen = sorted(
+            batsmen, key=lambda player: -batting_rows[player["id"]]["runs"]
+        )[:2]
+        top_bowlers = sorted(
+            bowlers, key=lambda player: -bowling_rows[player["id"]]["wickets"]
+        )[:2]
+        return {
+            "runs": runs,
+            "wickets": wickets,
+            "balls": legal_balls,
+            "overs": legal_balls // 6 + legal_balls % 6 / 10,
+            "boundaries": boundaries,
+            "score": f"{runs}/{wickets}" if wickets < 10 else f"{runs}",
+            "top_batsmen": [player["full_name"] for player in top_batsmen],
+            "top_bowlers": [player["full_name"] for player in top_bowlers],
+        }
+
+    def outcome_text(self, runs: int, is_out: bool, is_wide: bool) -> str:
+        if is_out:
+            return "OUT"
+        if is_wide:
+            return "1 wide"
+        return {0: "no run", 1: "1 run", 4: "FOUR", 6: "SIX"}.get(runs, f"{runs} runs")
+
+    def dismissal(self, bowler: dict, bowling: dict) -> str:
+        fielder = bowling["squad"][int(self.rng.integers(0, 11))]
+        kind = self.rng.choice(
+            ["caught", "bowled", "lbw", "run out"], p=[0.6, 0.2, 0.12, 0.08]
+        )
+        if kind == "caught":
+            return f"c {fielder['name']} b {bowler['name']}"
+        if kind == "bowled":
+            return f"b {bowler['name']}"
+        if kind == "lbw":
+            return f"lbw b {bowler['name']}"
+        return f"run out ({fielder['name']})"
+
+    def commentary(self) -> str:
+        """Returns a few hundred characters of HTML commentary, like the real text column."""
+        words = self.rng.choice(COMMENTARY_WORDS, size=int(self.rng.integers(20, 60)))
+        return f"<p><b>{' '.join(words[:5])}</b> {' '.join(words[5:])}</p>"
+
+
+def read_columns(path: str) -> List[str]:
+    with open(path) as file:
+        return file.readline().strip().split(",")
+
+
+# the column layout of every generated table is taken from the real raw input
+COLUMNS: Dict[str, List[str]] = {
+    table: read_columns(
+        os.path.join(
+            os.path.dirname(__file__), "..", "input", "raw_input", f"{table}.csv"
+        )
+    )
+    for table in ["batting_card", "bowling_card", "details", "summary"]
+}
+
+
+def generate_dataset(
+    out_dir: str,
+    seasons: int = 1,
+    teams: int = 6,
+    matches_per_season: int = 30,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """Writes a synthetic raw dataset with the same columns as input/raw_input.
+
+    Args:
+        out_dir (str): folder to write the CSVs to
+        seasons (int, optional): number of seasons. Defaults to 1.
+        teams (int, optional): number of teams. Defaults to 6.
+        matches_per_season (int, optional): matches per season. Defaults to 30.
+        seed (int, optional): random seed, the same seed gives the same files. Defaults to 0.
+
+    Returns:
+        Dict[str, int]: number of rows written to every table
+    """
+    return SyntheticDataGenerator(teams=teams, seed=seed).generate(
+        out_dir, seasons=seasons, matches_per_season=matches_per_season
+    )
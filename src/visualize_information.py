@@ -1,9 +1,19 @@
-from typing import Dict, Tuple
-import matplotlib.pyplot as plt
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from matplotlib import colormaps
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.patches import Patch
 import pandas as pd
 import numpy as np
 
+from src.instrumentation import PROFILER, instrumented
+
 # Define a color dictionary mapping team names to colors
 TEAM_COLOURS = {
     "PR": "pink",
@@ -14,14 +24,166 @@ TEAM_COLOURS = {
     "SEC": "orange",
 }
 
+# upper bound on the number of processes used to render charts
+MAX_RENDER_WORKERS: int = 8
+
+# a chart to render: the name of a VisualizeInformation method and its arguments
+ChartJob = Tuple[str, tuple]
+
+# fingerprints and output paths of the charts rendered by the last run
+CHART_MANIFEST: str = "result/chart_manifest.json"
+
+
+def new_figure(figsize: Tuple[float, float] = (6.4, 4.8)) -> Tuple[Figure, object]:
+    """Creates a standalone figure with a single axis on the non-interactive Agg canvas.
+
+    The figure is never registered with pyplot, so it is freed as soon as the chart that
+    drew it returns instead of accumulating in pyplot's global state.
+
+    Args:
+        figsize (Tuple[float, float], optional): width and height in inches. Defaults to (6.4, 4.8).
+
+    Returns:
+        Tuple[Figure, Axes]: the figure and its axis
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def save_figure(fig: Figure, path: str) -> str:
+    """Saves fig to path and returns the path."""
+    fig.savefig(path)
+    return path
+
+
+def render_chart(job: ChartJob) -> str:
+    """Renders a single chart job and returns its path, this runs inside the worker processes."""
+    name, args = job
+    return getattr(VisualizeInformation(), name)(*args)
+
+
+def chart_key(job: ChartJob) -> str:
+    """Names a chart job by its method and text arguments, e.g. show_team_run_count[1st]."""
+    name, args = job
+    labels = [arg for arg in args if isinstance(arg, str)]
+    return f"{name}[{','.join(labels)}]" if labels else name
+
+
+def update_fingerprint(digest: Any, value: Any) -> None:
+    """Feeds the contents of a chart argument into digest."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(type(value)).encode())
+        labels = value.columns if isinstance(value, pd.DataFrame) else value.name
+        digest.update(repr(labels).encode())
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            update_fingerprint(digest, key)
+            update_fingerprint(digest, item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            update_fingerprint(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def chart_fingerprint(job: ChartJob) -> str:
+    """Fingerprints a chart job by its input data, its arguments and the code that draws it.
+
+    Args:
+        job (ChartJob): (method name, arguments) of the chart
+
+    Returns:
+        str: the hex SHA-256 digest of the job
+    """
+    name, args = job
+    digest = hashlib.sha256(
+        inspect.getsource(getattr(VisualizeInformation, name)).encode()
+    )
+    update_fingerprint(digest, args)
+    return digest.hexdigest()
+
 
+@instrumented
 class VisualizeInformation:
-    def show_top10_batsman(self, all_performances: pd.DataFrame) -> None:
+    def render_all(
+        self,
+        jobs: List[ChartJob],
+        max_workers: Optional[int] = None,
+        force: bool = False,
+        manifest_path: str = CHART_MANIFEST,
+    ) -> Dict[str, dict]:
+        """Renders the charts whose input or drawing code changed since the last run, in
+        parallel across a bounded process pool.
+
+        A chart is skipped when its fingerprint matches the one recorded in the manifest
+        and its image still exists. The manifest is rewritten with the fingerprint, path
+        and whether every chart was regenerated; entries of charts that are not in jobs
+        are kept as they are.
+
+        Args:
+            jobs (List[ChartJob]): (method name, arguments) of every chart to render
+            max_workers (int, optional): number of processes. Defaults to the number of
+            cores, capped at MAX_RENDER_WORKERS.
+            force (bool, optional): render every chart regardless. Defaults to False.
+            manifest_path (str, optional): where the manifest is kept. Defaults to CHART_MANIFEST.
+
+        Returns:
+            Dict[str, dict]: the manifest entry of every chart in jobs
+        """
+        previous = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                previous = json.load(file)
+
+        manifest = {}
+        stale_jobs = []
+        for job in jobs:
+            key = chart_key(job)
+            fingerprint = chart_fingerprint(job)
+            entry = previous.get(key, {})
+            if (
+                not force
+                and entry.get("fingerprint") == fingerprint
+                and os.path.exists(entry.get("path", ""))
+            ):
+                manifest[key] = {**entry, "regenerated": False}
+            else:
+                manifest[key] = {"fingerprint": fingerprint, "regenerated": True}
+                stale_jobs.append(job)
+
+        for job, path in zip(stale_jobs, self.render_jobs(stale_jobs, max_workers)):
+            manifest[chart_key(job)]["path"] = path
+
+        with open(manifest_path, "w") as file:
+            json.dump({**previous, **manifest}, file, indent=2)
+        return manifest
+
+    def render_jobs(
+        self, jobs: List[ChartJob], max_workers: Optional[int] = None
+    ) -> List[str]:
+        """Renders chart jobs across a bounded process pool and returns their paths."""
+        if max_workers is None:
+            max_workers = min(os.cpu_count() or 1, MAX_RENDER_WORKERS)
+        max_workers = max(1, min(max_workers, len(jobs)))
+
+        if max_workers == 1:
+            return [render_chart(job) for job in jobs]
+
+        # the workers' stages would never be reported, so they do not record any
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=PROFILER.disable
+        ) as executor:
+            return list(executor.map(render_chart, jobs))
+
+    def show_top10_batsman(self, all_performances: pd.DataFrame) -> str:
         # Create a new dataframe with the top 10 players based on total_runs
         top_10_players = all_performances.nlargest(10, "total_runs")
 
-        # Create the bar chart with different colors
-        bars = plt.bar(
+        # Create the bar chart with different colors on its own figure
+        fig, ax = new_figure()
+        bars = ax.bar(
             top_10_players["full_name"],
             top_10_players["total_runs"],
             color=[TEAM_COLOURS.get(team, "gray") for team in top_10_players["team"]],
@@ -37,49 +199,45 @@ class VisualizeInformation:
         ]
 
         # Create the legend
-        plt.legend(legend_handles, unique_teams, loc="upper right")
+        ax.legend(legend_handles, unique_teams, loc="upper right")
 
-        plt.xlabel("Player Name")
-        plt.ylabel("Total Runs")
-        plt.title("Top 10 Players by Total Runs")
+        ax.set_xlabel("Player Name")
+        ax.set_ylabel("Total Runs")
+        ax.set_title("Top 10 Players by Total Runs")
 
         # Rotate x-axis tick labels by 45 degrees
-        plt.xticks(rotation=45, ha="right")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
 
         # Adjust the layout to avoid overlapping labels
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the bar chart to a folder (change the path as per your requirement)
-        plt.savefig("result/batsman_graphs/top_10_batsmen.png")
+        return save_figure(fig, "result/batsman_graphs/top_10_batsmen.png")
 
-    def show_best_batsman_per_game(self, best_df: pd.DataFrame) -> None:
+    def show_best_batsman_per_game(self, best_df: pd.DataFrame) -> str:
         # Visualize the lowest_scores
-        plt.figure(figsize=(10, 6))
-        plt.bar(
+        fig, ax = new_figure(figsize=(10, 6))
+        ax.bar(
             best_df["match_id"] - 1343940,
             best_df["runs"],
         )
-        plt.xlabel("Game Number")
-        plt.ylabel("Runs")
-        plt.title("Most Runs per Game")
-
-        plt.xticks(
-            range(1, len(best_df) + 1),
-            range(1, len(best_df) + 1),
-            rotation=45,
-            ha="right",
-        )
+        ax.set_xlabel("Game Number")
+        ax.set_ylabel("Runs")
+        ax.set_title("Most Runs per Game")
+
+        ax.set_xticks(range(1, len(best_df) + 1))
+        ax.set_xticklabels(range(1, len(best_df) + 1), rotation=45, ha="right")
         # Adjust the layout to avoid overlapping labels
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the bar chart to a folder (change the path as per your requirement)
-        plt.savefig("result/batsman_graphs/best_batsman_per_game.png")
+        return save_figure(fig, "result/batsman_graphs/best_batsman_per_game.png")
 
     def show_best_home_away_batsmen(
         self,
         batsman_df: pd.DataFrame,
         home_or_away: str,
-    ) -> None:
+    ) -> str:
         runs_column = f"{str.lower(home_or_away)}_runs_scored"
         strike_rate_column = f"{str.lower(home_or_away)}_strike_rate"
         # Sort the dataframe by average home runs in descending order
@@ -95,8 +253,8 @@ class VisualizeInformation:
         indices = np.arange(len(top_batsmen))
 
         # Plot the average runs as a bar chart
-        plt.figure(figsize=(10, 6))
-        plt.bar(
+        fig, ax = new_figure(figsize=(10, 6))
+        ax.bar(
             indices,
             top_batsmen[runs_column],
             label="Average Runs",
@@ -104,7 +262,7 @@ class VisualizeInformation:
         )
 
         # Plot the average runs as a scatter plot with dots
-        plt.scatter(
+        ax.scatter(
             indices,
             top_batsmen[strike_rate_column],
             label="Average Strike Rate",
@@ -112,36 +270,33 @@ class VisualizeInformation:
         )
 
         # Set the x-axis ticks and labels
-        plt.xticks(
-            indices,
-            top_batsmen["batsman_name"],
-            rotation=45,
-            ha="right",
-        )
+        ax.set_xticks(indices)
+        ax.set_xticklabels(top_batsmen["batsman_name"], rotation=45, ha="right")
 
         # Set the y-axis label
-        plt.ylabel("Runs / Strike Rate")
+        ax.set_ylabel("Runs / Strike Rate")
 
         # Set the chart title
-        plt.title(f"Top 10 {home_or_away} Batsmen by Average Runs")
+        ax.set_title(f"Top 10 {home_or_away} Batsmen by Average Runs")
 
         # Add a legend
-        plt.legend()
+        ax.legend()
 
         # Adjust the layout
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the plot to a file
-        plt.savefig(f"result/batsman_graphs/best_{str.lower(home_or_away)}_batsmen.png")
-
-        # Show the plot
+        return save_figure(
+            fig, f"result/batsman_graphs/best_{str.lower(home_or_away)}_batsmen.png"
+        )
 
-    def show_most_boundaries(self, all_performances: pd.DataFrame):
+    def show_most_boundaries(self, all_performances: pd.DataFrame) -> str:
         # Create a new dataframe with the top 10 players based on total_runs
         top_10_players = all_performances.nlargest(10, "boundary_percentage")
 
-        # Create the bar chart with different colors
-        bars = plt.bar(
+        # Create the bar chart with different colors on its own figure
+        fig, ax = new_figure()
+        bars = ax.bar(
             top_10_players["full_name"],
             top_10_players["boundary_percentage"],
             color=[TEAM_COLOURS.get(team, "gray") for team in top_10_players["team"]],
@@ -157,27 +312,27 @@ class VisualizeInformation:
         ]
 
         # Create the legend
-        plt.legend(legend_handles, unique_teams, loc="upper right")
+        ax.legend(legend_handles, unique_teams, loc="upper right")
 
-        plt.xlabel("Player Name")
-        plt.ylabel("Boundary %")
-        plt.title("Top 10 Players by Boundary Percentage")
+        ax.set_xlabel("Player Name")
+        ax.set_ylabel("Boundary %")
+        ax.set_title("Top 10 Players by Boundary Percentage")
 
         # Rotate x-axis tick labels by 45 degrees
-        plt.xticks(rotation=45, ha="right")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
 
         # Adjust the layout to avoid overlapping labels
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the bar chart to a folder (change the path as per your requirement)
-        plt.savefig("result/batsman_graphs/top_10_boundary_percentage.png")
+        return save_figure(fig, "result/batsman_graphs/top_10_boundary_percentage.png")
 
-    def show_top10_bowlers(self, bowling_df: pd.DataFrame) -> None:
+    def show_top10_bowlers(self, bowling_df: pd.DataFrame) -> str:
         # Create a new dataframe with the top 10 players based on total_runs
         top_10_players = bowling_df.nlargest(10, "total_wickets")
 
         # Create the bar chart with different colors
-        fig, ax = plt.subplots()  # Create a figure and axis object
+        fig, ax = new_figure()  # Create a figure and axis object
 
         bars = ax.bar(
             top_10_players["full_name"],
@@ -197,54 +352,50 @@ class VisualizeInformation:
         # Create the legend
         ax.legend(legend_handles, unique_teams, loc="upper right")
 
-        plt.xlabel("Player Name")
-        plt.ylabel("Total Wickets")
-        plt.title("Top 10 Players by Total Wickets")
+        ax.set_xlabel("Player Name")
+        ax.set_ylabel("Total Wickets")
+        ax.set_title("Top 10 Players by Total Wickets")
 
         # Rotate x-axis tick labels by 45 degrees
-        plt.xticks(rotation=45, ha="right")
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
 
         # Adjust the layout to avoid overlapping labels
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the bar chart to a folder (change the path as per your requirement)
-        plt.savefig("result/bowler_graphs/top_10_bowlers.png")
+        return save_figure(fig, "result/bowler_graphs/top_10_bowlers.png")
 
-    def show_best_bowler_per_game(self, best_df: pd.DataFrame) -> None:
+    def show_best_bowler_per_game(self, best_df: pd.DataFrame) -> str:
         # Visualize the lowest_scores
-        plt.figure(figsize=(10, 6))
-        plt.bar(
+        fig, ax = new_figure(figsize=(10, 6))
+        ax.bar(
             best_df["match_id"] - 1343940,
             best_df["wickets"],
         )
         # Plot the average runs as a scatter plot with dots
-        plt.scatter(
+        ax.scatter(
             best_df["match_id"] - 1343940,
             best_df["economy_rate"],
             label="Economy Rate",
             color="red",
         )
-        plt.xlabel("Game Number")
-        plt.ylabel("Wickets/Economy Rate")
-        plt.title("Most Wickets/Economy Rate per Game")
-
-        plt.xticks(
-            range(1, len(best_df) + 1),
-            range(1, len(best_df) + 1),
-            rotation=45,
-            ha="right",
-        )
+        ax.set_xlabel("Game Number")
+        ax.set_ylabel("Wickets/Economy Rate")
+        ax.set_title("Most Wickets/Economy Rate per Game")
+
+        ax.set_xticks(range(1, len(best_df) + 1))
+        ax.set_xticklabels(range(1, len(best_df) + 1), rotation=45, ha="right")
         # Adjust the layout to avoid overlapping labels
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the bar chart to a folder (change the path as per your requirement)
-        plt.savefig("result/bowler_graphs/best_bowler_per_game.png")
+        return save_figure(fig, "result/bowler_graphs/best_bowler_per_game.png")
 
     def show_best_home_away_bowler(
         self,
         bowler_df: pd.DataFrame,
         home_or_away: str,
-    ) -> None:
+    ) -> str:
         wickets_column = f"{str.lower(home_or_away)}_wickets_taken"
         economy_rate_column = f"{str.lower(home_or_away)}_economy_rate"
         # Sort the dataframe by average home runs in descending order
@@ -260,8 +411,8 @@ class VisualizeInformation:
         indices = np.arange(len(top_bowler))
 
         # Plot the average runs as a bar chart
-        plt.figure(figsize=(10, 6))
-        plt.bar(
+        fig, ax = new_figure(figsize=(10, 6))
+        ax.bar(
             indices,
             top_bowler[wickets_column],
             label="Average Wickets",
@@ -269,7 +420,7 @@ class VisualizeInformation:
         )
 
         # Plot the average runs as a scatter plot with dots
-        plt.scatter(
+        ax.scatter(
             indices,
             top_bowler[economy_rate_column],
             label="Average Economy Rate",
@@ -277,60 +428,58 @@ class VisualizeInformation:
         )
 
         # Set the x-axis ticks and labels
-        plt.xticks(
-            indices,
-            top_bowler["bowler_name"],
-            rotation=45,
-            ha="right",
-        )
+        ax.set_xticks(indices)
+        ax.set_xticklabels(top_bowler["bowler_name"], rotation=45, ha="right")
 
         # Set the y-axis label
-        plt.ylabel("Wickets / Economy Rate")
+        ax.set_ylabel("Wickets / Economy Rate")
 
         # Set the chart title
-        plt.title(f"Top 10 {home_or_away} Bowler by Average Wickets")
+        ax.set_title(f"Top 10 {home_or_away} Bowler by Average Wickets")
 
         # Add a legend
-        plt.legend()
+        ax.legend()
 
         # Adjust the layout
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Save the plot to a file
-        plt.savefig(f"result/bowler_graphs/best_{str.lower(home_or_away)}_bowler.png")
-
-        # Show the plot
+        return save_figure(
+            fig, f"result/bowler_graphs/best_{str.lower(home_or_away)}_bowler.png"
+        )
 
-    def show_probability_six_per_over(self, prob_six_per_over: Dict) -> None:
-        plt.figure(figsize=(10, 6))
+    def show_probability_six_per_over(self, prob_six_per_over: Dict) -> str:
+        fig, ax = new_figure(figsize=(10, 6))
         x = list(prob_six_per_over.keys())
         y = list(prob_six_per_over.values())
 
-        plt.plot(x, y)
-        plt.xlabel("Over")
-        plt.ylabel("Probability of 6")
-        plt.title("Probability of 6 Per Over")
-        plt.xlim(1, 20)
+        ax.plot(x, y)
+        ax.set_xlabel("Over")
+        ax.set_ylabel("Probability of 6")
+        ax.set_title("Probability of 6 Per Over")
+        ax.set_xlim(1, 20)
         # Save the plot to a file
-        plt.savefig(f"result/details_graphs/probability_six_per_over.png")
+        return save_figure(fig, f"result/details_graphs/probability_six_per_over.png")
 
-    def show_total_sixes_per_over(self, total_sixes) -> None:
-        plt.figure(figsize=(10, 6))
-        plt.plot(total_sixes.index, total_sixes.values)
-        plt.xlabel("Over")
-        plt.ylabel("Total sixes")
-        plt.title("Total Sixes Per Over")
-        plt.xlim(1, 20)
-        plt.savefig("result/details_graphs/total_sixes_per_over.png")
+    def show_total_sixes_per_over(self, total_sixes) -> str:
+        fig, ax = new_figure(figsize=(10, 6))
+        ax.plot(total_sixes.index, total_sixes.values)
+        ax.set_xlabel("Over")
+        ax.set_ylabel("Total sixes")
+        ax.set_title("Total Sixes Per Over")
+        ax.set_xlim(1, 20)
+        return save_figure(fig, "result/details_graphs/total_sixes_per_over.png")
 
     def show_team_run_count(
         self, innings_density: pd.DataFrame, first_or_second: str
-    ) -> None:
+    ) -> str:
         teams = innings_density["current_innings"].unique()
         num_teams = len(teams)
         num_cols = 3
         num_rows = (num_teams + 1) // num_cols  # Calculate the number of rows required
-        fig, axs = plt.subplots(num_rows, num_cols, figsize=(12, 6 * num_rows))
+        fig = Figure(figsize=(12, 6 * num_rows))
+        FigureCanvasAgg(fig)
+        axs = fig.subplots(num_rows, num_cols)
 
         for i, team in enumerate(teams):
             team_data = innings_density[innings_density["current_innings"] == team]
@@ -346,35 +495,41 @@ class VisualizeInformation:
             ax.set_ylabel("Count")
             ax.set_title(f"{first_or_second} Innings - Count by Run Type - {team}")
 
-        plt.tight_layout()  # Adjust spacing between subplots
-        plt.savefig(f"result/details_graphs/team_run_count_{first_or_second}.png")
+        fig.tight_layout()  # Adjust spacing between subplots
+        return save_figure(
+            fig, f"result/details_graphs/team_run_count_{first_or_second}.png"
+        )
 
-    def show_game_break_wins(self, summary_df: pd.DataFrame) -> None:
-        plt.figure(figsize=(4, 6))
-        # Plot the heatmap
-        plt.imshow(summary_df.iloc[:, 2:], cmap="hot", interpolation="nearest")
-        plt.colorbar(label="Probability")
-        plt.xticks(
-            range(len(summary_df.columns[2:])), summary_df.columns[2:], rotation=45
+    def show_game_break_wins(self, result_by_days: pd.DataFrame) -> str:
+        fig, ax = new_figure(figsize=(4, 6))
+        # Plot the heatmap, rest days a team never had before a decided game are grey
+        cmap = colormaps["hot"].copy()
+        cmap.set_bad("lightgrey")
+        image = ax.imshow(
+            result_by_days.astype("float64"), cmap=cmap, interpolation="nearest"
         )
-        plt.yticks(range(len(summary_df.index)), summary_df.index)
-        plt.xlabel("Winning Team")
-        plt.ylabel("Days Between Games")
-        plt.title("Probability Heatmap")
-        plt.tight_layout()
-        plt.savefig("result/summary_graphs/game_break_wins.png")
-
-    def toss_decisions(self, toss_decisions: Dict[str, int]) -> None:
+        fig.colorbar(image, ax=ax, label="Win Rate")
+        ax.set_xticks(range(len(result_by_days.columns)))
+        ax.set_xticklabels(result_by_days.columns, rotation=45)
+        ax.set_yticks(range(len(result_by_days.index)))
+        ax.set_yticklabels(result_by_days.index)
+        ax.set_xlabel("Team")
+        ax.set_ylabel("Rest Days Before Game")
+        ax.set_title("Win Rate by Rest Days")
+        fig.tight_layout()
+        return save_figure(fig, "result/summary_graphs/game_break_wins.png")
+
+    def toss_decisions(self, toss_decisions: Dict[str, int]) -> str:
         labels = list(toss_decisions.keys())
         values = list(toss_decisions.values())
-        plt.figure(figsize=(4, 6))
-        plt.bar(labels, values)
-        plt.xlabel("Decision Made")
-        plt.ylabel("Amount of Times Chosen")
-        plt.title("Toss Won Decision")
-        plt.savefig("result/summary_graphs/toss_decisions.png")
-
-    def show_lowest_scores(self, lowest_scores: Dict[str, Dict[str, int]]) -> None:
+        fig, ax = new_figure(figsize=(4, 6))
+        ax.bar(labels, values)
+        ax.set_xlabel("Decision Made")
+        ax.set_ylabel("Amount of Times Chosen")
+        ax.set_title("Toss Won Decision")
+        return save_figure(fig, "result/summary_graphs/toss_decisions.png")
+
+    def show_lowest_scores(self, lowest_scores: Dict[str, Dict[str, int]]) -> str:
         # Set the width of the bars
         bar_width = 0.8
         innings = list(lowest_scores.keys())
@@ -394,21 +549,21 @@ class VisualizeInformation:
                 lowest_scores["2nd Inning"]["Team"],
             ]
         ]
-        plt.figure(figsize=(10, 6))
+        fig, ax = new_figure(figsize=(10, 6))
         # Create the legend
-        plt.legend(
+        ax.legend(
             legend_handles,
             [lowest_scores["1st Inning"]["Team"], lowest_scores["2nd Inning"]["Team"]],
             loc="upper right",
         )
 
-        plt.bar(innings, scores, color=colors, width=bar_width)
-        plt.xlabel("Inning")
-        plt.ylabel("Score")
-        plt.title("Lowest Team Scores by Inning")
-        plt.savefig("result/details_graphs/lowest_score_by_inning.png")
+        ax.bar(innings, scores, color=colors, width=bar_width)
+        ax.set_xlabel("Inning")
+        ax.set_ylabel("Score")
+        ax.set_title("Lowest Team Scores by Inning")
+        return save_figure(fig, "result/details_graphs/lowest_score_by_inning.png")
 
-    def show_highest_scores(self, highest_scores: Dict[str, Dict[str, int]]) -> None:
+    def show_highest_scores(self, highest_scores: Dict[str, Dict[str, int]]) -> str:
         # Set the width of the bars
         bar_width = 0.8
         innings = list(highest_scores.keys())
@@ -420,7 +575,7 @@ class VisualizeInformation:
             TEAM_COLOURS[highest_scores["1st Inning"]["Team"]],
             TEAM_COLOURS[highest_scores["2nd Inning"]["Team"]],
         ]
-        plt.figure(figsize=(10, 6))
+        fig, ax = new_figure(figsize=(10, 6))
         # Create a list of legend handles
         legend_handles = [
             Patch(facecolor=TEAM_COLOURS.get(team, "gray"), edgecolor="black")
@@ -430,7 +585,7 @@ class VisualizeInformation:
             ]
         ]
         # Create the legend
-        plt.legend(
+        ax.legend(
             legend_handles,
             [
                 highest_scores["1st Inning"]["Team"],
@@ -439,8 +594,55 @@ class VisualizeInformation:
             loc="upper right",
         )
 
-        plt.bar(innings, scores, color=colors, width=bar_width)
-        plt.xlabel("Inning")
-        plt.ylabel("Score")
-        plt.title("Highest Team Scores by Inning")
-        plt.savefig("result/details_graphs/highest_score_by_inning.png")
+        ax.bar(innings, scores, color=colors, width=bar_width)
+        ax.set_xlabel("Inning")
+        ax.set_ylabel("Score")
+        ax.set_title("Highest Team Scores by Inning")
+        return save_figure(fig, "result/details_graphs/highest_score_by_inning.png")
+
+    def show_win_probability_worms(self, worms: pd.DataFrame) -> str:
+        # one small worm per match, the line is the chance of the side batting first
+        matches = list(worms.groupby("match_id", sort=False))
+        num_cols = 4
+        num_rows = max(1, -(-len(matches) // num_cols))
+        fig = Figure(figsize=(16, 3 * num_rows))
+        FigureCanvasAgg(fig)
+        axs = np.atleast_1d(fig.subplots(num_rows, num_cols, squeeze=False).ravel())
+
+        for ax, (match_id, worm) in zip(axs, matches):
+            first_team = worm["first_team"].iloc[0]
+            second_team = worm["second_team"].iloc[0]
+            delivery = worm["delivery"].to_numpy()
+            probability = worm["first_team_win_probability"].to_numpy()
+            ax.plot(delivery, probability, color="black", linewidth=1)
+            ax.fill_between(
+                delivery,
+                probability,
+                0.5,
+                where=probability >= 0.5,
+                color=TEAM_COLOURS.get(first_team, "gray"),
+                alpha=0.5,
+                interpolate=True,
+            )
+            ax.fill_between(
+                delivery,
+                probability,
+                0.5,
+                where=probability < 0.5,
+                color=TEAM_COLOURS.get(second_team, "gray"),
+                alpha=0.5,
+                interpolate=True,
+            )
+            second_innings = delivery[worm["innings_id"].to_numpy() == 2]
+            if len(second_innings):
+                ax.axvline(second_innings[0], color="gray", linestyle="--")
+            ax.set_ylim(0, 1)
+            ax.set_title(f"{first_team} v {second_team} ({match_id})", fontsize=9)
+            ax.set_ylabel(f"P({first_team} wins)", fontsize=8)
+
+        # hide the axes left over in the last row
+        for ax in axs[len(matches) :]:
+            ax.set_visible(False)
+
+        fig.tight_layout()
+        return save_figure(fig, "result/details_graphs/win_probability_worms.png")
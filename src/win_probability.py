@@ -0,0 +1,276 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.delivery_store import DeliveryStore
+
+# legal balls of a full T20 innings
+MAX_BALLS: int = 120
+
+# balls remaining are bucketed by over, from 0 to 20 overs left
+BALLS_PER_BUCKET: int = 6
+
+# runs per over bucketing the current run rate of the first innings and the required
+# run rate of the second, the last bucket holds every rate above the last edge
+RATE_EDGES: Tuple[float, ...] = (5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20)
+
+# deliveries of evidence a cell needs before its own win rate outweighs the smoothed
+# win rate of the coarser cell it is part of
+SMOOTHING: float = 20.0
+
+# number of buckets along every axis of the table: innings, balls remaining, wickets
+# lost and run rate
+TABLE_SHAPE: Tuple[int, int, int, int] = (
+    2,
+    MAX_BALLS // BALLS_PER_BUCKET + 1,
+    11,
+    len(RATE_EDGES) + 1,
+)
+
+
+def running_total(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Sums values up to and including every row, starting afresh wherever starts is
+    True."""
+    running = np.cumsum(values)
+    first = np.flatnonzero(starts)
+    offsets = (running[first] - values[first])[np.cumsum(starts) - 1]
+    return running - offsets
+
+
+def delivery_states(store: DeliveryStore, scorecards: pd.DataFrame) -> pd.DataFrame:
+    """Lays out the state of every match after every delivery in a single vectorized
+    pass over the store.
+
+    Deliveries are ordered by match, innings, over and ball, with wides and no balls
+    before the legal ball sharing their number. The target of the second innings is
+    the revised target of the scorecard when there is one.
+
+    Args:
+        store (DeliveryStore): the deliveries
+        scorecards (pd.DataFrame): the parsed scores indexed by match_id, see
+        explore_summary.parse_scorecards
+
+    Returns:
+        pd.DataFrame: match_id, innings_id, team (batting), over, ball, score, wickets,
+        balls_remaining, target and runs_required (missing in the first innings), rate
+        (current run rate in the first innings, required run rate in the second) and
+        won (1 when the batting team won the match, 0 when it lost, missing without a
+        result)
+    """
+    legal = ~(np.asarray(store["is_wide"]) | np.asarray(store["is_noball"]))
+    order = np.lexsort(
+        (legal, store["ball"], store["over"], store["innings_id"], store["match_id"])
+    )
+    match_id = np.asarray(store["match_id"])[order].astype("int64")
+    innings_id = np.asarray(store["innings_id"])[order].astype("int64")
+    legal = legal[order]
+
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (match_id[1:] != match_id[:-1]) | (innings_id[1:] != innings_id[:-1])
+    balls = running_total(legal.astype("int64"), starts)
+    score = running_total(np.asarray(store["runs"])[order].astype("int64"), starts)
+    wickets = np.minimum(
+        running_total(np.asarray(store["is_wicket"])[order].astype("int64"), starts),
+        10,
+    )
+    balls_remaining = np.maximum(MAX_BALLS - balls, 0)
+    team = np.asarray(store.teams, dtype=object)[np.asarray(store["team"])[order]]
+
+    cards = scorecards.reindex(match_id)
+    second_target = np.where(
+        cards["second_team"] == cards["home_team"],
+        cards["home_target"].to_numpy("float64", na_value=np.nan),
+        cards["away_target"].to_numpy("float64", na_value=np.nan),
+    )
+    first_runs = cards["first_runs"].to_numpy("float64", na_value=np.nan)
+    target = np.where(
+        innings_id == 2,
+        np.where(np.isnan(second_target), first_runs + 1, second_target),
+        np.nan,
+    )
+    runs_required = target - score
+    rate = np.where(
+        innings_id == 2,
+        runs_required / np.maximum(balls_remaining, 1) * 6,
+        score / np.maximum(balls, 1) * 6,
+    )
+
+    winner = cards["winner"].to_numpy(object)
+    decided = (winner == cards["first_team"].to_numpy(object)) | (
+        winner == cards["second_team"].to_numpy(object)
+    )
+    won = np.where(decided, (winner == team).astype("float64"), np.nan)
+
+    return pd.DataFrame(
+        {
+            "match_id": match_id,
+            "innings_id": innings_id,
+            "team": team,
+            "over": np.asarray(store["over"])[order],
+            "ball": np.asarray(store["ball"])[order],
+            "score": score,
+            "wickets": wickets,
+            "balls_remaining": balls_remaining,
+            "target": target,
+            "runs_required": runs_required,
+            "rate": rate,
+            "won": won,
+        }
+    )
+
+
+def state_cells(states: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+    """Returns the innings, balls remaining, wickets and rate bucket of every state,
+    the indices of its cell in a table of TABLE_SHAPE."""
+    return (
+        np.clip(states["innings_id"].to_numpy("int64") - 1, 0, 1),
+        states["balls_remaining"].to_numpy("int64") // BALLS_PER_BUCKET,
+        states["wickets"].to_numpy("int64"),
+        np.digitize(np.nan_to_num(states["rate"].to_numpy("float64")), RATE_EDGES),
+    )
+
+
+class WinProbabilityTable:
+    """Empirical chance of the batting team winning from every bucketed match state.
+
+    Every cell is the win rate of the historical deliveries that left a match in that
+    state, smoothed towards the win rate of ever coarser cells: a cell of (innings,
+    balls remaining, wickets, rate) shrinks towards (innings, balls remaining, rate),
+    which shrinks towards (innings, rate) and then the innings. Cells without any
+    deliveries take the smoothed rate of their coarser cell.
+
+    Attributes:
+        wins (np.ndarray): deliveries after which the batting team went on to win, per cell
+        deliveries (np.ndarray): deliveries of decided matches, per cell
+        probabilities (np.ndarray): the smoothed chance of winning, per cell
+    """
+
+    def __init__(self, wins: np.ndarray, deliveries: np.ndarray):
+        self.wins = wins
+        self.deliveries = deliveries
+        self.probabilities = self.smooth(wins, deliveries)
+
+    @classmethod
+    def fit(cls, states: pd.DataFrame) -> "WinProbabilityTable":
+        """Counts the deliveries and wins of every cell over the decided states."""
+        decided = states[states["won"].notna()]
+        cells = np.ravel_multi_index(state_cells(decided), TABLE_SHAPE)
+        size = int(np.prod(TABLE_SHAPE))
+        wins = np.bincount(cells, weights=decided["won"], minlength=size)
+        deliveries = np.bincount(cells, minlength=size)
+        return cls(wins.reshape(TABLE_SHAPE), deliveries.reshape(TABLE_SHAPE))
+
+    @staticmethod
+    def smooth(wins: np.ndarray, deliveries: np.ndarray) -> np.ndarray:
+        """Smooths the win rate of every cell towards its coarser cells, see the class."""
+        # overall rate, then the axes kept at every level: innings; innings and rate;
+        # innings, balls and rate; every axis
+        prior = np.full((1, 1, 1, 1), 0.5)
+        for summed_axes in [(0, 1, 2, 3), (1, 2, 3), (1, 2), (2,), ()]:
+            level_wins = wins.sum(axis=summed_axes, keepdims=True)
+            level_deliveries = deliveries.sum(axis=summed_axes, keepdims=True)
+            prior = (level_wins + SMOOTHING * prior) / (level_deliveries + SMOOTHING)
+        return prior
+
+    def score(self, states: pd.DataFrame) -> np.ndarray:
+        """Returns the chance of the batting team winning after every state, in a single
+        batched lookup. A chase that got to its target is won, and one that ran out of
+        balls or wickets short of it is lost."""
+        probabilities = self.probabilities[state_cells(states)]
+        runs_required = states["runs_required"].to_numpy("float64")
+        out = (states["balls_remaining"].to_numpy() == 0) | (
+            states["wickets"].to_numpy() == 10
+        )
+        probabilities = np.where(runs_required <= 0, 1.0, probabilities)
+        return np.where((runs_required > 0) & out, 0.0, probabilities)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns every cell that had deliveries, with its counts and probability."""
+        cells = np.nonzero(self.deliveries)
+        innings, balls, wickets, rate = cells
+        edges = np.array((0,) + RATE_EDGES, dtype="float64")
+        return pd.DataFrame(
+            {
+                "innings_id": innings + 1,
+                "overs_remaining": balls,
+                "wickets": wickets,
+                "rate_from": edges[rate],
+                "deliveries": self.deliveries[cells],
+                "wins": self.wins[cells].astype("int64"),
+                "win_probability": self.probabilities[cells],
+            }
+        )
+
+
+class WinProbability:
+    """The chance of either side winning after every delivery of every match.
+
+    Attributes:
+        states (pd.DataFrame): the state after every delivery, see delivery_states
+        table (WinProbabilityTable): the lookup table fitted on states
+    """
+
+    def __init__(self, states: pd.DataFrame, table: WinProbabilityTable):
+        self.states = states
+        self.table = table
+        self._worms = None
+
+    @classmethod
+    def build(cls, store: DeliveryStore, scorecards: pd.DataFrame) -> "WinProbability":
+        """Fits the lookup table on every delivery of store."""
+        states = delivery_states(store, scorecards)
+        return cls(states, WinProbabilityTable.fit(states))
+
+    def worms(self) -> pd.DataFrame:
+        """Returns the win probability of the side batting first after every delivery.
+
+        Returns:
+            pd.DataFrame: match_id, first_team, second_team, delivery (numbered from 1
+            across both innings), innings_id, over, ball, score, wickets and
+            first_team_win_probability
+        """
+        if self._worms is None:
+            states = self.states
+            probabilities = self.table.score(states)
+            first_innings = states["innings_id"].to_numpy() == 1
+            new_match = np.ones(len(states), dtype=bool)
+            new_match[1:] = states["match_id"].to_numpy()[1:] != (
+                states["match_id"].to_numpy()[:-1]
+            )
+            self._worms = pd.DataFrame(
+                {
+                    "match_id": states["match_id"],
+                    "first_team": states["team"]
+                    .where(first_innings)
+                    .groupby(states["match_id"])
+                    .transform("first"),
+                    "second_team": states["team"]
+                    .where(~first_innings)
+                    .groupby(states["match_id"])
+                    .transform("first"),
+                    "delivery": running_total(
+                        np.ones(len(states), dtype="int64"), new_match
+                    ),
+                    "innings_id": states["innings_id"],
+                    "over": states["over"],
+                    "ball": states["ball"],
+                    "score": states["score"],
+                    "wickets": states["wickets"],
+                    "first_team_win_probability": np.where(
+                        first_innings, probabilities, 1 - probabilities
+                    ),
+                }
+            )
+        return self._worms
+
+    def match_worm(self, match_id: int) -> pd.DataFrame:
+        """Returns the worm of a single match, raising KeyError if it has no deliveries."""
+        worms = self.worms()
+        worm = worms[worms["match_id"] == match_id]
+        if worm.empty:
+            raise KeyError(match_id)
+        return worm.reset_index(drop=True)
+
+    def lookup_table(self) -> pd.DataFrame:
+        return self.table.to_frame()
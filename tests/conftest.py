@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from src.process_dataset import DatasetCleaner
+
+# the tests pin the results of the analyses on the shipped 2023 season in input/
+
+
+@pytest.fixture(scope="session")
+def cleaner() -> DatasetCleaner:
+    return DatasetCleaner()
+
+
+@pytest.fixture(scope="session")
+def batting_df(cleaner: DatasetCleaner) -> pd.DataFrame:
+    return cleaner.load_table("batting_card")
+
+
+@pytest.fixture(scope="session")
+def bowling_df(cleaner: DatasetCleaner) -> pd.DataFrame:
+    return cleaner.load_table("bowling_card")
+
+
+@pytest.fixture(scope="session")
+def summary_df(cleaner: DatasetCleaner) -> pd.DataFrame:
+    return cleaner.load_table("summary")
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src.explore_batting import BattingData
+
+FINAL: int = 1343970
+
+
+def test_best_batsman_of_every_game(batting_df: pd.DataFrame):
+    best = BattingData(batting_df).best_batsman_per_game()
+
+    assert len(best) == batting_df["match_id"].nunique()
+    assert best["match_id"].is_unique
+    # matches keep the order in which they first appear in the card
+    assert best["match_id"].tolist() == batting_df["match_id"].unique().tolist()
+    assert best.iloc[0].tolist() == [FINAL, "Kusal Mendis", 80]
+
+
+def test_top_k_batsmen_per_game(batting_df: pd.DataFrame):
+    best = BattingData(batting_df).best_batsman_per_game(top_k=3)
+    final = best[best["match_id"] == FINAL]
+
+    assert final["full_name"].tolist() == [
+        "Kusal Mendis",
+        "Jos Buttler",
+        "Colin Ingram",
+    ]
+    assert final["runs"].tolist() == [80, 70, 41]
+    assert best.groupby("match_id").size().le(3).all()
+
+
+def test_tied_batsmen_are_ranked_alphabetically(batting_df: pd.DataFrame):
+    tied = batting_df.assign(
+        runs=batting_df["runs"].mask(
+            (batting_df["match_id"] == FINAL)
+            & (batting_df["full_name"] == "Jos Buttler"),
+            80,
+        )
+    )
+    best = BattingData(tied).best_batsman_per_game(top_k=2)
+
+    assert best[best["match_id"] == FINAL]["full_name"].tolist() == [
+        "Jos Buttler",
+        "Kusal Mendis",
+    ]
+
+
+def test_top_k_must_be_positive(batting_df: pd.DataFrame):
+    with pytest.raises(ValueError):
+        BattingData(batting_df).best_batsman_per_game(top_k=0)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.explore_bowling import BowlingData, overs_to_balls
+
+
+@pytest.fixture(scope="module")
+def performances(bowling_df: pd.DataFrame) -> pd.DataFrame:
+    return BowlingData(bowling_df).get_all_performances().set_index("full_name")
+
+
+def test_partial_overs_are_added_as_balls(bowling_df: pd.DataFrame):
+    spells = pd.DataFrame({"overs": [3.4, 2.4]})
+
+    assert overs_to_balls(spells["overs"]).tolist() == [22, 16]
+    # 6.2 overs, not 5.8
+    assert BowlingData(bowling_df).calculate_balls(spells) == 38
+
+
+def test_total_overs_use_overs_notation(performances: pd.DataFrame):
+    # Keemo Paul bowled 0.5, 0.2 and 2.0 overs: 19 balls, or 3.1 overs, not 2.7
+    keemo_paul = performances.loc["Keemo Paul"]
+    assert keemo_paul["balls_bowled"] == 19
+    assert keemo_paul["total_overs"] == pytest.approx(3.1)
+    assert keemo_paul["economy_rate"] == pytest.approx(42 / 19 * 6)
+
+    gerald_coetzee = performances.loc["Gerald Coetzee"]
+    assert gerald_coetzee["balls_bowled"] == 147
+    assert gerald_coetzee["total_overs"] == pytest.approx(24.3)
+
+
+def test_fours_and_sixes_add_up_over_all_spells(
+    bowling_df: pd.DataFrame, performances: pd.DataFrame
+):
+    spells = bowling_df.groupby(bowling_df["full_name"].astype(object))
+    pd.testing.assert_series_equal(
+        performances["fours_conceded"],
+        spells["fours_conceded"].sum().reindex(performances.index),
+        check_dtype=False,
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        performances["sixes_conceded"],
+        spells["sixes_conceded"].sum().reindex(performances.index),
+        check_dtype=False,
+        check_names=False,
+    )
+    assert performances.loc[
+        "Keemo Paul", ["fours_conceded", "sixes_conceded"]
+    ].tolist() == [5, 2]
+
+
+def test_economy_rate_is_missing_without_legal_balls(bowling_df: pd.DataFrame):
+    spell = bowling_df.iloc[[0]].assign(
+        full_name="Only Wides", overs=0.0, conceded=4, wickets=0, wides=4
+    )
+    # without player_id the card is keyed to a players dimension of its own names
+    card = pd.concat([bowling_df, spell], ignore_index=True).drop(columns="player_id")
+    performances = BowlingData(card)
+    only_wides = (
+        performances.get_all_performances().set_index("full_name").loc["Only Wides"]
+    )
+
+    assert only_wides["balls_bowled"] == 0
+    assert np.isnan(only_wides["economy_rate"])
+    assert np.isnan(only_wides["average"])
+    assert np.isnan(only_wides["strike_rate"])
+
+
+def test_best_bowler_is_ranked_on_wickets_then_runs_conceded(bowling_df: pd.DataFrame):
+    best = BowlingData(bowling_df).best_bowler_per_game().set_index("match_id")
+
+    assert best.index.is_unique
+    assert len(best) == bowling_df["match_id"].nunique()
+    # three wickets each, fewer runs beats a lower economy rate
+    assert best.loc[1343969, "full_name"] == "Kyle Simmonds"
+    assert best.loc[1343969, ["wickets", "conceded"]].tolist() == [3, 23]
+    # one wicket each for four bowlers, the cheapest wins
+    assert best.loc[1343964, "full_name"] == "Donovan Ferreira"
+    assert best.loc[1343962, "full_name"] == "Gerald Coetzee"
+
+
+def test_best_bowler_keeps_numeric_columns(bowling_df: pd.DataFrame):
+    best = BowlingData(bowling_df).best_bowler_per_game()
+
+    assert best["full_name"].dtype == object
+    for column in ["overs", "maidens", "conceded", "wickets", "economy_rate"]:
+        assert pd.api.types.is_numeric_dtype(best[column]), column
+
+
+def test_best_bowler_with_a_custom_ranking(bowling_df: pd.DataFrame):
+    best = BowlingData(bowling_df).best_bowler_per_game(
+        ranking=[("economy_rate", True)]
+    )
+    lowest = bowling_df.groupby("match_id")["economy_rate"].min()
+
+    assert best["economy_rate"].tolist() == lowest[best["match_id"]].tolist()
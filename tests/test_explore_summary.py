@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from src.explore_summary import SummaryData, parse_scores
+
+
+def test_scores_are_parsed_into_typed_columns():
+    scores = parse_scores(
+        pd.Series(
+            ["226/5", "113", "167/9 (20 ov, target 227)", "53/3 (5.2/20 ov)", None]
+        )
+    )
+
+    assert scores["runs"].tolist()[:4] == [226, 113, 167, 53]
+    # a score without wickets is all out
+    assert scores["wickets"].tolist()[:4] == [5, 10, 9, 3]
+    assert scores["overs"].tolist()[2:4] == [20.0, 5.2]
+    assert scores["target"].tolist()[2] == 227
+    assert scores.iloc[4].isna().all()
+
+
+def test_highest_and_lowest_scores(summary_df: pd.DataFrame):
+    summary = SummaryData(summary_df)
+
+    assert summary.get_highest_scores() == {
+        "1st Inning": {"Team": "DSG", "Score": 254},
+        "2nd Inning": {"Team": "PR", "Score": 189},
+    }
+    assert summary.get_lowest_scores() == {
+        "1st Inning": {"Team": "DSG", "Score": 80},
+        "2nd Inning": {"Team": "PR", "Score": 82},
+    }
+
+
+def test_match_score_lookup(summary_df: pd.DataFrame):
+    score = SummaryData(summary_df).get_match_score(1343970)
+
+    assert (score["first_team"], score["first_runs"], score["first_wickets"]) == (
+        "PC",
+        226,
+        5,
+    )
+    assert (score["second_team"], score["second_runs"], score["away_target"]) == (
+        "PR",
+        167,
+        227,
+    )
+
+
+def test_scores_leave_the_summary_untouched(summary_df: pd.DataFrame):
+    before = summary_df.copy()
+    summary = SummaryData(summary_df)
+    summary.get_highest_scores()
+    summary.get_lowest_scores()
+
+    pd.testing.assert_frame_equal(summary_df, before)
+
+
+def test_extremes_need_a_completed_innings(summary_df: pd.DataFrame):
+    unfinished = SummaryData(summary_df[summary_df["home_score"].isna()])
+
+    with pytest.raises(ValueError, match="no completed innings"):
+        unfinished.get_highest_scores()
+
+
+def test_rest_days_are_counted_between_consecutive_fixtures(summary_df: pd.DataFrame):
+    timeline = SummaryData(summary_df).get_team_timeline("PC")
+    # calendar days, a 11:30 fixture two days after a 15:30 one is 2 rest days
+    days = timeline["start_date"].dt.normalize().diff().dt.days
+
+    assert timeline["start_date"].is_monotonic_increasing
+    # lost games count as fixtures too, not only the wins
+    assert "lost" in timeline["outcome"].tolist()
+    pd.testing.assert_series_equal(
+        timeline["rest_days"].iloc[1:].astype("float64"),
+        days.iloc[1:],
+        check_names=False,
+    )
+    assert pd.isna(timeline["rest_days"].iloc[0])
+
+
+def test_win_rate_by_rest_days(summary_df: pd.DataFrame):
+    before = summary_df.copy()
+    result = SummaryData(summary_df).analyze_result_vs_days()
+
+    assert result.index.tolist() == [1, 2, 3, 4, 9, 10, 12]
+    assert result.columns.tolist() == ["DSG", "JSK", "MICT", "PC", "PR", "SEC"]
+    # Pretoria Capitals won 3 of their 4 decided games after two rest days
+    assert result.loc[2, "PC"] == 0.75
+    assert result.loc[2, "JSK"] == 0.5
+    assert result.loc[3, "DSG"] == 0.0
+    # Durban's Super Giants never played a decided game a day after the previous one
+    assert pd.isna(result.loc[1, "DSG"])
+    assert ((result >= 0) & (result <= 1) | result.isna()).all().all()
+    pd.testing.assert_frame_equal(summary_df, before)
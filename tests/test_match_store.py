@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from src.dimensions import Dimensions
+from src.explore_batting import BattingData
+from src.explore_bowling import BowlingData
+from src.explore_summary import SummaryData
+from src.match_store import AGGREGATORS, MatchStore
+from src.process_dataset import CLEANING_VERSION, TABLES
+
+CHANGED_MATCH: int = 1343970
+
+
+@pytest.fixture
+def store(cleaner, tmp_path) -> MatchStore:
+    """A store holding the shipped season, then a rescored final with a spell less."""
+    raw_tables = dict(zip(TABLES, cleaner.read_dataset()))
+    store = MatchStore(str(tmp_path / "match_store"))
+    store.ingest(raw_tables, cleaner.table_cleaners(), CLEANING_VERSION)
+
+    batting = raw_tables["batting_card"]
+    raw_tables["batting_card"] = batting.assign(
+        runs=batting["runs"].mask(batting["match_id"] == CHANGED_MATCH, 0)
+    )
+    bowling = raw_tables["bowling_card"]
+    raw_tables["bowling_card"] = bowling.drop(
+        bowling.index[bowling["match_id"] == CHANGED_MATCH][:1]
+    )
+    store.ingest(raw_tables, cleaner.table_cleaners(), CLEANING_VERSION)
+    return store
+
+
+def test_totals_are_updated_by_the_changed_match(store: MatchStore):
+    for table, (name, aggregate) in AGGREGATORS.items():
+        rebuilt = aggregate(store.load(table))
+        rebuilt = rebuilt[rebuilt.iloc[:, 0] > 0]
+        pd.testing.assert_frame_equal(
+            store.aggregates[name].sort_index(), rebuilt.sort_index(), check_dtype=False
+        )
+
+
+def test_performances_from_the_totals_match_the_rows(store: MatchStore):
+    stored = [store.load(table) for table in TABLES]
+    batting_df, bowling_df, _, summary_df = Dimensions.build(*stored).key_tables(
+        *stored
+    )
+
+    pd.testing.assert_frame_equal(
+        BattingData(
+            batting_df, totals=store.aggregates["batting_totals"]
+        ).get_all_performances(),
+        BattingData(batting_df).get_all_performances(),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        BowlingData(
+            bowling_df, totals=store.aggregates["bowling_totals"]
+        ).get_all_performances(),
+        BowlingData(bowling_df).get_all_performances(),
+        check_dtype=False,
+    )
+    for team in ["PC", "PR", "SEC"]:
+        assert SummaryData(
+            summary_df, totals=store.aggregates["team_totals"]
+        ).get_team_wins(team) == SummaryData(summary_df).get_team_wins(team)
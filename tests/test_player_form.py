@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from src.player_form import BattingForm, BowlingForm, Window
+
+
+@pytest.fixture(scope="module")
+def players(cleaner) -> pd.DataFrame:
+    return cleaner.load_dimensions().players
+
+
+def split_by_date(card_df: pd.DataFrame, summary_df: pd.DataFrame, matches: int):
+    """Splits a card into its first matches by start date and the later ones."""
+    first = summary_df.sort_values("start_date")["id"].iloc[:matches]
+    is_first = card_df["match_id"].isin(first)
+    return card_df[is_first], card_df[~is_first]
+
+
+@pytest.mark.parametrize(
+    "engine, card", [(BattingForm, "batting_df"), (BowlingForm, "bowling_df")]
+)
+def test_appended_form_equals_a_full_rebuild(
+    engine, card, request, summary_df: pd.DataFrame, players: pd.DataFrame
+):
+    card_df = request.getfixturevalue(card)
+    earlier, later = split_by_date(card_df, summary_df, 20)
+
+    appended = engine.from_card(earlier, summary_df, players)
+    appended.append(later, summary_df)
+    rebuilt = engine.from_card(card_df, summary_df, players)
+
+    pd.testing.assert_frame_equal(appended.form, rebuilt.form)
+    pd.testing.assert_frame_equal(appended.current_form(), rebuilt.current_form())
+
+
+def test_innings_window_sums_the_latest_innings(
+    batting_df: pd.DataFrame, summary_df: pd.DataFrame, players: pd.DataFrame
+):
+    form = BattingForm.from_card(batting_df, summary_df, players).player_form(
+        "Jos Buttler"
+    )
+    runs = form["runs"].astype("int64")
+
+    assert form["start_date"].is_monotonic_increasing
+    assert (
+        form["runs_last_5_innings"].tolist()
+        == runs.rolling(5, min_periods=1).sum().astype("int64").tolist()
+    )
+    assert form["innings_last_5_innings"].max() == 5
+
+
+def test_matches_must_be_appended_in_date_order(
+    batting_df: pd.DataFrame, summary_df: pd.DataFrame, players: pd.DataFrame
+):
+    earlier, later = split_by_date(batting_df, summary_df, 20)
+    form = BattingForm.from_card(later, summary_df, players)
+
+    with pytest.raises(ValueError):
+        form.append(earlier, summary_df)
+
+
+def test_windows_must_span_at_least_one_innings():
+    with pytest.raises(ValueError):
+        Window(0)
+    with pytest.raises(ValueError):
+        Window(5, "weeks")